@@ -19,7 +19,7 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from ..config import get_facilities
-from ..email.format import render_email_template
+from ..email.format import prepare_email_template, render_email_template
 from ..error import ConsistencyError, FormattedError, NoSuchRecord, UserError
 from ..stats.quartile import label_quartiles
 from ..type.enum import CallState, FormatType, MessageThreadType, \
@@ -318,6 +318,12 @@ def send_call_proposal_feedback(db, call_id, proposals, dry_run=False):
             continuation=True, resolved=True,
             with_publications=False)
 
+    # Prepare the email templates once for all proposals.
+    render_feedback = prepare_email_template(
+        'proposal_feedback.txt', facility=facility)
+    render_reviewed_notification = prepare_email_template(
+        'proposal_reviewed_notification.txt', facility=facility)
+
     # Iterate over proposals and send feedback.
     n_processed = 0
 
@@ -395,8 +401,7 @@ def send_call_proposal_feedback(db, call_id, proposals, dry_run=False):
                 'continuation_code': continuation_code,
             }
             email_ctx.update(facility.get_feedback_extra(db, proposal))
-            email_body = render_email_template(
-                'proposal_feedback.txt', email_ctx, facility=facility)
+            email_body = render_feedback(email_ctx)
 
             # Change the proposal state.
             new_state = (
@@ -450,9 +455,7 @@ def send_call_proposal_feedback(db, call_id, proposals, dry_run=False):
                 if not dry_run:
                     db.add_message(
                         email_subject + ' in immediate review',
-                        render_email_template(
-                            'proposal_reviewed_notification.txt',
-                            email_ctx, facility=facility),
+                        render_reviewed_notification(email_ctx),
                         [x.id for x in site_administrators.values()],
                         thread_type=MessageThreadType.PROPOSAL_REVIEW,
                         thread_id=proposal.id)
@@ -41,6 +41,11 @@ class CSVDialectCatalog(CSVDialect):
 def parse_source_list(source_list, number_from=1, as_object_list=False):
     """
     Parse a plain text source list and return a TargetCollection.
+
+    The whole list is read before coordinates are parsed, so that they
+    can be converted together.  If any entries can not be parsed,
+    a `UserError` is raised listing the problem with each of them,
+    by line number.
     """
 
     # Ensure the source_list CSV is in the format expected by the csv module.
@@ -52,6 +57,8 @@ def parse_source_list(source_list, number_from=1, as_object_list=False):
         for (system, system_name) in CoordSystem.get_options().items()}
 
     ans = TargetCollection()
+    line_numbers = {}
+    errors = {}
 
     # Remove trailing (and leading) whitespace from each line.
     # (Otherwise trailing tabs, for example, can end up in the "system"
@@ -69,47 +76,74 @@ def parse_source_list(source_list, number_from=1, as_object_list=False):
         # a delimiter (as it can be used in coordinates).
         dialect = csv.Sniffer().sniff(lines[0], delimiters=' \t,;')
 
-        for target in csv.DictReader(
-                lines,
-                fieldnames=[
-                    'name', 'x', 'y', 'system', 'time', 'priority', 'note'],
-                dialect=dialect, restkey=None, restval=None):
+        reader = csv.DictReader(
+            lines,
+            fieldnames=[
+                'name', 'x', 'y', 'system', 'time', 'priority', 'note'],
+            dialect=dialect, restkey=None, restval=None)
+
+        for target in reader:
+            try:
+                ans[target_id] = _parse_source_list_entry(
+                    target, target_id, systems)
 
-            # Drop any trailing values and decode UTF-8.
-            target = {
-                k: decode_value(v)
-                for (k, v) in target.items() if k is not None}
+            except UserError as e:
+                errors[reader.line_num] = e
 
-            # Extract target name and system.
-            target_name = target['name']
-            if target_name is None:
-                raise UserError('Each target object should have a name.')
+            line_numbers[target_id] = reader.line_num
+            target_id += 1
 
-            system_name = target.pop('system')
-            if system_name is None:
-                raise UserError(
-                    'No coordinate system given for "{}".',
-                    target_name)
+    except csv.Error:
+        raise UserError('Could not interpret target list file structure.')
 
-            system = systems.get(system_name.upper(), None)
+    target_errors = {}
+    ans = TargetCollection.from_formatted_collection(
+        ans, as_object_list=as_object_list, errors=target_errors)
 
-            if system is None:
-                raise UserError(
-                    'Did not recognise coordinate system '
-                    '"{}" for target "{}".',
-                    system_name, target_name)
+    for (target_id, e) in target_errors.items():
+        errors[line_numbers[target_id]] = e
 
-            # Add Target object to the collection.
-            ans[target_id] = null_tuple(Target)._replace(
-                id=target_id, system=system, **target)
+    if errors:
+        raise UserError(
+            'The target list could not be read: {}',
+            ' '.join(
+                'Line {}: {}'.format(line_number, errors[line_number].message)
+                for line_number in sorted(errors.keys())))
 
-            target_id += 1
+    return ans
 
-    except csv.Error:
-        raise UserError('Could not interpret target list file structure.')
 
-    return TargetCollection.from_formatted_collection(
-        ans, as_object_list=as_object_list)
+def _parse_source_list_entry(target, target_id, systems):
+    """
+    Convert an entry read from a source list to a (formatted) `Target`.
+    """
+
+    # Drop any trailing values and decode UTF-8.
+    target = {
+        k: decode_value(v)
+        for (k, v) in target.items() if k is not None}
+
+    # Extract target name and system.
+    target_name = target['name']
+    if target_name is None:
+        raise UserError('Each target object should have a name.')
+
+    system_name = target.pop('system')
+    if system_name is None:
+        raise UserError(
+            'No coordinate system given for "{}".',
+            target_name)
+
+    system = systems.get(system_name.upper(), None)
+
+    if system is None:
+        raise UserError(
+            'Did not recognise coordinate system '
+            '"{}" for target "{}".',
+            system_name, target_name)
+
+    return null_tuple(Target)._replace(
+        id=target_id, system=system, **target)
 
 
 def write_source_list(catalog):
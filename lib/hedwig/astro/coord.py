@@ -18,11 +18,15 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
-from collections import OrderedDict, namedtuple
+from collections import OrderedDict, defaultdict, namedtuple
+import re
 
 from astropy import coordinates
-from astropy.units import degree, hourangle, meter, UnitsError
+from astropy.time import Time
+from astropy.units import degree, hourangle, meter, Quantity, UnitsError
 from astropy.utils.iers import conf as astropy_iers_conf
+from numpy import absolute, arcsin, asarray, copysign, cos, degrees, empty, \
+    fmod, newaxis, pi, sin, unique
 
 from ..error import UserError
 
@@ -30,8 +34,16 @@ from ..error import UserError
 # Prevent Astropy from automatically downloading IERS data.
 astropy_iers_conf.auto_download = False
 
+CoordList = namedtuple('CoordList', ('x_deg', 'y_deg', 'coord', 'error'))
+
 CoordWithFmt = namedtuple('CoordWithFmt', ('x', 'y', 'x_deg', 'y_deg'))
 
+# Pattern matching colon-separated sexagesimal values, following the
+# syntax accepted by the Astropy angle parser.
+sexagesimal_pattern = re.compile(
+    r'^([-+]?)(\d+):(\d+):'
+    r'((?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|\d+)$')
+
 
 class CoordSystem(object):
     """
@@ -141,6 +153,152 @@ def parse_coord(system, x, y, name):
             name, e)
 
 
+def parse_coord_list(system, x, y, name, with_coord=False):
+    """
+    Parse lists of coordinate information (strings) as entered by a user.
+
+    This is equivalent to applying `parse_coord` to each entry, but
+    is intended for long lists of targets.  Positions given as decimal
+    degrees or colon-separated sexagesimal values are converted
+    together, constructing one coordinate object for each combination of
+    coordinate system and value formats.  Any other entries, or any group
+    of entries which can not be converted together, are passed to
+    `parse_coord` individually.
+
+    :param system: list of coordinate systems
+    :param x: list of x coordinate strings
+    :param y: list of y coordinate strings
+    :param name: list of target names, for use in error messages
+    :param with_coord: if true, also return a coordinate object
+        for each entry
+
+    :return: a `CoordList` tuple containing lists of the `x` and `y`
+        positions in decimal degrees, a list of coordinate objects
+        (or `None` if `with_coord` was not specified) and a dictionary of
+        `UserError` exceptions by index for entries which could not
+        be parsed
+    """
+
+    n_entry = len(name)
+    ans = CoordList(
+        x_deg=([None] * n_entry), y_deg=([None] * n_entry),
+        coord=(([None] * n_entry) if with_coord else None), error={})
+
+    groups = defaultdict(list)
+    individual = []
+
+    for (i, (system_i, x_i, y_i)) in enumerate(zip(system, x, y)):
+        if not CoordSystem.is_valid(system_i):
+            individual.append(i)
+            continue
+
+        info = CoordSystem._get_info(system_i)
+
+        x_value = _parse_coord_value(x_i, info.unit[0])
+        y_value = _parse_coord_value(y_i, info.unit[1])
+
+        if x_value is None or y_value is None:
+            individual.append(i)
+            continue
+
+        groups[(
+            system_i, isinstance(x_value, tuple), isinstance(y_value, tuple)
+        )].append((i, x_value, y_value))
+
+    for ((system_i, x_sexagesimal, y_sexagesimal), entries) in groups.items():
+        info = CoordSystem._get_info(system_i)
+        (indices, x_values, y_values) = zip(*entries)
+
+        try:
+            coord = coordinates.SkyCoord(
+                _coord_value_array(x_values, x_sexagesimal, info.unit[0]),
+                _coord_value_array(y_values, y_sexagesimal, info.unit[1]),
+                unit=info.unit, frame=info.frame)
+
+        except Exception:
+            # Parse these entries individually so that the problem is
+            # reported for the relevant target.
+            individual.extend(indices)
+            continue
+
+        (x_deg, y_deg) = coord_to_dec_deg(coord)
+
+        for (j, i) in enumerate(indices):
+            ans.x_deg[i] = x_deg[j]
+            ans.y_deg[i] = y_deg[j]
+
+            if with_coord:
+                ans.coord[i] = coord[j]
+
+    for i in sorted(individual):
+        try:
+            coord = parse_coord(system[i], x[i], y[i], name[i])
+
+        except UserError as e:
+            ans.error[i] = e
+            continue
+
+        (ans.x_deg[i], ans.y_deg[i]) = coord_to_dec_deg(coord)
+
+        if with_coord:
+            ans.coord[i] = coord
+
+    return ans
+
+
+def _parse_coord_value(value, unit):
+    """
+    Attempt to parse a coordinate value for `parse_coord_list`.
+
+    Values which look like plain floating point numbers are considered
+    to be degrees, as in `parse_coord`.  Colon-separated sexagesimal
+    values are returned as a tuple of their components, in the given
+    unit, if within the ranges for which the Astropy angle parser
+    would not issue a warning.
+
+    :return: the parsed value, or `None` if the value
+        should be parsed individually
+    """
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    match = sexagesimal_pattern.match(value)
+    if not match:
+        return None
+
+    (sign, d, m, s) = match.groups()
+    d = (-1.0 if sign == '-' else 1.0) * int(d)
+    m = int(m)
+    s = float(s)
+
+    if (unit is hourangle and not (-24.0 < d < 24.0)) \
+            or not (0 <= m < 60) or not (0.0 <= s < 60.0):
+        return None
+
+    return (d, m, s)
+
+
+def _coord_value_array(values, sexagesimal, unit):
+    """
+    Convert a sequence of values returned by `_parse_coord_value`
+    to a `Quantity` array.
+
+    Sexagesimal values, in the given unit, are combined using the
+    same operations as the Astropy angle parser.  Otherwise the
+    values are in degrees.
+    """
+
+    if not sexagesimal:
+        return Quantity(values, degree)
+
+    (d, m, s) = (asarray(x, dtype=float) for x in zip(*values))
+
+    return Quantity(copysign(absolute(d) + m / 60.0 + s / 3600.0, d), unit)
+
+
 def format_coord(system, coord, fixed_precision=False):
     """
     Format coordinates for display.
@@ -232,6 +390,46 @@ def coord_from_dec_deg(system, x_deg, y_deg):
     return coordinates.SkyCoord(x_deg, y_deg, unit=degree, frame=info.frame)
 
 
+def coord_from_dec_deg_array(system, x_deg, y_deg):
+    """
+    Convert sequences of numbers in degrees, with a corresponding sequence
+    of coordinate systems, to a single array-valued coordinate object
+    in the ICRS frame.
+
+    One coordinate object is constructed (and transformed) for each
+    coordinate system present, rather than one for each position.
+    """
+
+    system = asarray(system)
+    x_deg = asarray(x_deg, dtype=float)
+    y_deg = asarray(y_deg, dtype=float)
+
+    ra = empty(x_deg.shape)
+    dec = empty(y_deg.shape)
+
+    for system_value in unique(system):
+        selection = (system == system_value)
+
+        coord = coord_from_dec_deg(
+            int(system_value), x_deg[selection], y_deg[selection]).icrs
+
+        ra[selection] = coord.ra.degree
+        dec[selection] = coord.dec.degree
+
+    return coordinates.SkyCoord(ra, dec, unit=degree, frame=coordinates.ICRS)
+
+
+def ra_hour_bin(coord):
+    """
+    Determine the nearest whole hour of right ascension for each position
+    of an array-valued (ICRS) coordinate object.
+
+    :return: array of integers in the range 0 - 23
+    """
+
+    return coord.ra.hour.round().astype(int) % 24
+
+
 def concatenate_coord_objects(objects):
     """
     Convert a list of `TargetObject` instances to a single coordinate object.
@@ -260,3 +458,48 @@ def get_earth_location(obs_info):
     return coordinates.EarthLocation.from_geocentric(
         obs_info.geo_x, obs_info.geo_y, obs_info.geo_z,
         meter)
+
+
+def calculate_altitude_analytic(location, coord, time):
+    """
+    Calculate approximate altitudes of a set of coordinates
+    using the hour angle derived from the Earth rotation angle.
+
+    The coordinates are converted to CIRS once, at the middle of the
+    given times, so that precession, nutation and annual aberration
+    are included but treated as constant over the time range.
+    Polar motion, UT1-UTC and atmospheric refraction are neglected.
+    For ranges of up to a year the result should agree with
+    a full Astropy `AltAz` transformation to within about 0.02 degrees.
+
+    :param location: Astropy `EarthLocation` object
+    :param coord: Astropy `SkyCoord` object (1-dimensional)
+    :param time: Astropy `Time` object (of any shape)
+
+    :return: numpy array of altitudes (in degrees) with
+        the shape of `time` followed by that of `coord`
+    """
+
+    utc = time.utc
+    time_ref = Time(
+        (utc.jd1.min() + utc.jd2.min() + utc.jd1.max() + utc.jd2.max()) / 2,
+        format='jd', scale='utc')
+
+    cirs = coord.transform_to(coordinates.CIRS(obstime=time_ref))
+    ra = cirs.ra.radian
+    dec = cirs.dec.radian
+
+    # Compute the Earth rotation angle (IERS Conventions 2010 eq. 5.15),
+    # keeping the integral part of the Julian dates separate to
+    # preserve precision.
+    era = 2.0 * pi * fmod(
+        0.7790572732640
+        + 0.00273781191135448 * (utc.jd1 - 2451545.0 + utc.jd2)
+        + fmod(utc.jd1, 1.0) + fmod(utc.jd2, 1.0), 1.0)
+
+    hour_angle = (era + location.lon.radian)[..., newaxis] - ra
+
+    lat = location.lat.radian
+
+    return degrees(arcsin(
+        sin(lat) * sin(dec) + cos(lat) * cos(dec) * cos(hour_angle)))
@@ -20,16 +20,87 @@ from __future__ import absolute_import, division, print_function, \
 
 from binascii import hexlify, unhexlify
 from codecs import ascii_decode, utf_8_encode
+from contextlib import contextmanager
 try:
     from hashlib import pbkdf2_hmac
 except ImportError:
     from backports.pbkdf2 import pbkdf2_hmac
 from os import urandom
+from threading import Condition
+
+from .error import UserError
 
 _rounds = 1000000
 
-# Time to sleep as a delay which simulates hashing the password.
-password_hash_delay = 10
+# Maximum number of password hashes to compute simultaneously, and the
+# number of further requests which may wait for their turn.  Beyond
+# this, requests are rejected immediately rather than tying up more
+# web server threads.
+password_hash_concurrency = 2
+password_hash_queue_limit = 8
+
+
+class _HashLimiter(object):
+    """
+    Class to limit the number of concurrent password hash computations.
+    """
+
+    def __init__(self):
+        self.condition = Condition()
+        self.active = 0
+        self.waiting = 0
+
+    @contextmanager
+    def __call__(self):
+        with self.condition:
+            if self.active >= password_hash_concurrency:
+                if self.waiting >= password_hash_queue_limit:
+                    raise UserError(
+                        'The system is currently busy processing '
+                        'log in requests.  Please try again later.')
+
+                self.waiting += 1
+                try:
+                    while self.active >= password_hash_concurrency:
+                        self.condition.wait()
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+
+        try:
+            yield
+
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify()
+
+
+_hash_limiter = _HashLimiter()
+
+
+def _hash_password(password_raw, password_salt):
+    """
+    Compute the PBKDF2 hash of the given password and (binary) salt.
+    """
+
+    return pbkdf2_hmac(
+        'sha256', utf_8_encode(password_raw)[0], password_salt, _rounds)
+
+
+def _hash_password_limited(password_raw, password_salt):
+    """
+    Compute a password hash for a log in attempt, via the limiter.
+
+    Only the log in path is limited, since it is the one which can be
+    flooded by unauthenticated requests.
+
+    :raises UserError: if too many hashes are already being computed
+    """
+
+    with _hash_limiter():
+        return _hash_password(password_raw, password_salt)
 
 
 def create_password_hash(password_raw):
@@ -41,8 +112,7 @@ def create_password_hash(password_raw):
     """
 
     password_salt = urandom(32)
-    password_hash = pbkdf2_hmac(
-        'sha256', utf_8_encode(password_raw)[0], password_salt, _rounds)
+    password_hash = _hash_password(password_raw, password_salt)
 
     return (ascii_decode(hexlify(password_hash))[0],
             ascii_decode(hexlify(password_salt))[0])
@@ -57,9 +127,20 @@ def check_password_hash(password_raw, password_hash, password_salt):
     using the salt.
     """
 
-    return password_hash == ascii_decode(hexlify(pbkdf2_hmac(
-        'sha256', utf_8_encode(password_raw)[0], unhexlify(password_salt),
-        _rounds)))[0]
+    return password_hash == ascii_decode(hexlify(_hash_password_limited(
+        password_raw, unhexlify(password_salt))))[0]
+
+
+def simulate_password_hash(password_raw):
+    """
+    Hash the given password with a random salt, discarding the result.
+
+    This can be used when the user is not recognized, to take the same
+    time as checking a password, so that it is not apparent that the user
+    name does not exist.
+    """
+
+    _hash_password_limited(password_raw, urandom(32))
 
 
 def generate_token(n=16):
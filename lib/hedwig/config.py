@@ -24,10 +24,13 @@ from importlib import import_module
 from itertools import count
 import json
 import os
+from threading import Lock
+from time import time
 
-from .compat import make_type, python_version
+from .compat import make_type, move_to_end, python_version
 from .error import FormattedError
 from .db.engine import get_engine
+from .db.util import retry_on_disconnect
 from .type.simple import CalculatorInfo, TargetToolInfo
 
 if python_version < 3:
@@ -64,27 +67,114 @@ dummy_id = count(9000000)
 
 
 class MemoCache(object):
+    """
+    Memoization decorator.
+
+    Caches the return value of the decorated function, keyed by its
+    (positional) arguments.  Arguments with a `_mem_id` attribute,
+    such as database objects, are represented by that value.
+
+    By default the cache is unbounded and entries do not expire,
+    which is appropriate for "singleton" objects such as the
+    configuration.  For other data, limits can be set:
+
+    :param max_size: maximum number of entries, after which the
+        least recently used entry is discarded
+    :param ttl: time (in seconds) for which entries are valid
+
+    The decorated function is given an `invalidate` attribute which
+    can be called with the same arguments to remove a single entry,
+    and a `memo_cache` attribute referring to this object.
+    """
+
     instances = []
 
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.cache = OrderedDict()
+        self._expiry = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
         self.instances.append(self)
 
     def __call__(self, func):
         @wraps(func)
         def decorated(*args):
-            key = tuple((getattr(arg, '_mem_id', arg) for arg in args))
-            if key in self.cache:
-                return self.cache[key]
+            key = self._make_key(args)
+
+            with self._lock:
+                if key in self.cache:
+                    if (self.ttl is None) or (self._expiry[key] > time()):
+                        self._hits += 1
+                        if self.max_size is not None:
+                            move_to_end(self.cache, key)
+                        return self.cache[key]
+
+                self._misses += 1
+
             value = func(*args)
-            self.cache[key] = value
+
+            with self._lock:
+                self.cache[key] = value
+
+                if self.ttl is not None:
+                    self._expiry[key] = time() + self.ttl
+
+                if self.max_size is not None:
+                    move_to_end(self.cache, key)
+
+                    while len(self.cache) > self.max_size:
+                        key_discarded = self.cache.popitem(last=False)[0]
+                        self._expiry.pop(key_discarded, None)
+
             return value
+
+        decorated.invalidate = lambda *args: self.invalidate(*args)
+        decorated.memo_cache = self
+
         return decorated
 
+    def _make_key(self, args):
+        return tuple((getattr(arg, '_mem_id', arg) for arg in args))
+
+    def invalidate(self, *args):
+        """
+        Remove the entry for the given arguments, if present.
+        """
+
+        key = self._make_key(args)
+
+        with self._lock:
+            self.cache.pop(key, None)
+            self._expiry.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+
+        with self._lock:
+            self.cache.clear()
+            self._expiry.clear()
+
+    def get_stats(self):
+        """
+        Get the numbers of cache hits and misses.
+
+        :return: a (hits, misses) tuple
+        """
+
+        with self._lock:
+            return (self._hits, self._misses)
+
     @classmethod
     def clear_all(cls):
         for instance in cls.instances:
-            instance.cache.clear()
+            instance.clear()
 
 
 @MemoCache()
@@ -170,6 +260,10 @@ def _get_database(database_url, facility_spec):
             engine_options['max_overflow'] = int(config.get(
                 'database', 'pool_overflow'))
 
+    if config.get('database', 'ping_idle_time'):
+        engine_options['ping_idle_time'] = float(config.get(
+            'database', 'ping_idle_time'))
+
     CombinedDatabase = _get_db_class(facility_spec)
 
     return CombinedDatabase(get_engine(database_url, **engine_options))
@@ -220,7 +314,15 @@ def _get_db_class(facility_spec):
     # any facility-specific classes.  Put the base class last so that
     # facilities can override methods if necessary.
     db_parts.append(Database)
-    return make_type('CombinedDatabase', tuple(db_parts), {})
+    db_class = make_type('CombinedDatabase', tuple(db_parts), {})
+
+    # Allow read-only methods to be retried if the connection was lost.
+    for name in dir(db_class):
+        if name.split('_', 1)[0] in ('get', 'search'):
+            setattr(db_class, name, retry_on_disconnect(
+                getattr(db_class, name)))
+
+    return db_class
 
 
 def get_facilities(db=None, facility_spec=None):
@@ -351,7 +453,8 @@ def _get_pdf_writer(db, app):
     return class_(
         db=db, app=app,
         base_url=config.get('application', 'base_url'),
-        page_size=config.get('pdf_write', 'page_size'))
+        page_size=config.get('pdf_write', 'page_size'),
+        cache_dir=(config.get('pdf_write', 'cache_dir') or None))
 
 
 def _import_class(class_name, module_pattern, class_pattern=None):
@@ -22,6 +22,7 @@ from collections import deque, namedtuple
 from contextlib import contextmanager
 from itertools import count as itertools_count
 from threading import Lock
+from timeit import default_timer
 
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.sql.expression import and_
@@ -32,6 +33,7 @@ from ..error import ConsistencyError, Error, \
 from ..type.collection import ResultCollection
 from ..util import is_list_like, list_in_blocks
 from .compat import select
+from .instrument import get_query_stats
 from .part.calculator import CalculatorPart
 from .part.message import MessagePart
 from .part.people import PeoplePart
@@ -59,6 +61,12 @@ class Database(
         self._lock = Lock()
         self._mem_id = next(self._mem_ctr)
 
+        self._directory_version_ctr = itertools_count(1)
+        self._directory_version = 0
+
+        self._review_version_ctr = itertools_count(1)
+        self._review_version = 0
+
         self.query_block_size = query_block_size
 
     @contextmanager
@@ -79,8 +87,15 @@ class Database(
             yield _conn
             return
 
+        stats = get_query_stats()
+        if stats is not None:
+            lock_start = default_timer()
+
         try:
             with self._lock:
+                if stats is not None:
+                    stats.record_lock_wait(default_timer() - lock_start)
+
                 with self._engine.begin() as conn:
                     yield conn
         except IntegrityError as e:
@@ -19,6 +19,7 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from os import getpid
+from timeit import default_timer
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
@@ -60,35 +61,70 @@ def engine_checkout(dbapi_connection, connection_record, connection_proxy):
         raise DisconnectionError('Connection belongs to another PID')
 
 
-@event.listens_for(Pool, 'checkout')
-def pool_checkout(dbapi_connection, connection_record, connection_proxy):
+@event.listens_for(Pool, 'checkin')
+def pool_checkin(dbapi_connection, connection_record):
     """
-    Listener for pool check-outs.
+    Listener for pool check-ins.
 
-    * Checks that the connection is alive.
+    * Records the time at which the connection was returned to the pool.
+    """
+
+    connection_record.info['checkin_time'] = default_timer()
+
+
+def make_pool_checkout(ping_idle_time):
+    """
+    Create a listener for pool check-outs.
+
+    The listener checks that the connection is alive, but only if it has
+    been idle in the pool for at least `ping_idle_time` seconds.
+    Connections used more recently are assumed still to be alive --
+    if one is not, the resulting disconnection error causes the pool to
+    be invalidated, and read-only database methods are retried
+    (see :func:`hedwig.db.util.retry_on_disconnect`).
 
     (Based on the pessimistic example in the "Connection Pooling" section
     of the SQLAlchemy documentation.)
     """
 
-    cursor = dbapi_connection.cursor()
+    def pool_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkin_time = connection_record.info.get('checkin_time')
 
-    try:
-        cursor.execute('SELECT 1')
+        # Skip the check for new connections and recently used connections.
+        if checkin_time is None or (
+                (default_timer() - checkin_time) < ping_idle_time):
+            return
 
-    except:
-        raise DisconnectionError('Connection not responding')
+        cursor = dbapi_connection.cursor()
 
-    finally:
         try:
-            cursor.close()
+            cursor.execute('SELECT 1')
+
         except:
-            pass
+            raise DisconnectionError('Connection not responding')
 
+        finally:
+            try:
+                cursor.close()
+            except:
+                pass
 
-def get_engine(url, **kwargs):
-    """Creates an SQLAchemmy database engine object for the given URL."""
+    return pool_checkout
 
-    return create_engine(
+
+def get_engine(url, ping_idle_time=60.0, **kwargs):
+    """
+    Creates an SQLAchemmy database engine object for the given URL.
+
+    :param url: database URL
+    :param ping_idle_time: time (seconds) for which a connection must have
+        been idle before it is checked when taken from the pool
+    """
+
+    engine = create_engine(
         url, pool_recycle=3600,
         echo=False, **kwargs)
+
+    event.listen(engine.pool, 'checkout', make_pool_checkout(ping_idle_time))
+
+    return engine
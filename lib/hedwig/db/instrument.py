@@ -0,0 +1,176 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+Optional instrumentation of database queries.
+
+Statistics are only collected while a :class:`QueryStats` object is active
+in the current thread, as managed by :func:`start_query_stats` and
+:func:`stop_query_stats`.  (For example, the web application
+does this for each request when the `[query_stats]` configuration
+section enables it.)
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from collections import namedtuple
+from heapq import heappush, heappushpop
+from threading import local
+from timeit import default_timer
+
+from sqlalchemy import event
+
+SlowQuery = namedtuple('SlowQuery', ('duration', 'statement'))
+
+_state = local()
+
+_conn_info_key = 'hedwig_query_start'
+
+
+class QueryStats(object):
+    """
+    Class for accumulating query statistics.
+
+    :param n_slowest: number of slowest statements to retain.
+    """
+
+    def __init__(self, n_slowest=5):
+        self.n_slowest = n_slowest
+        self.count = 0
+        self.time = 0.0
+        self.lock_time = 0.0
+        self._slowest = []
+        self._sequence = 0
+
+    def record_query(self, statement, duration):
+        self.count += 1
+        self.time += duration
+
+        if self.n_slowest > 0:
+            # Include a sequence number so that statements themselves
+            # are never compared.
+            self._sequence += 1
+            entry = (duration, self._sequence, statement)
+
+            if len(self._slowest) < self.n_slowest:
+                heappush(self._slowest, entry)
+            else:
+                heappushpop(self._slowest, entry)
+
+    def record_lock_wait(self, duration):
+        self.lock_time += duration
+
+    @property
+    def slowest(self):
+        """
+        List of the slowest statements, as `SlowQuery` tuples,
+        slowest first.
+        """
+
+        return [
+            SlowQuery(duration, statement)
+            for (duration, sequence, statement)
+            in sorted(self._slowest, reverse=True)]
+
+    def format_header(self):
+        """
+        Format the statistics for use as an HTTP header value.
+        """
+
+        return 'count={}; db={:.1f}ms; lock={:.1f}ms'.format(
+            self.count, 1000.0 * self.time, 1000.0 * self.lock_time)
+
+
+def instrument_engine(engine):
+    """
+    Attach query timing event listeners to the given engine.
+
+    This can safely be called more than once for the same engine.
+    """
+
+    if event.contains(engine, 'before_cursor_execute', _before_execute):
+        return
+
+    event.listen(engine, 'before_cursor_execute', _before_execute)
+    event.listen(engine, 'after_cursor_execute', _after_execute)
+
+
+def start_query_stats(n_slowest=5):
+    """
+    Begin collecting query statistics in the current thread.
+
+    If statistics are already being collected, the existing object
+    is put aside until the matching call to :func:`stop_query_stats`.
+
+    :return: a new :class:`QueryStats` object.
+    """
+
+    stack = getattr(_state, 'stack', None)
+    if stack is None:
+        stack = _state.stack = []
+
+    stats = QueryStats(n_slowest=n_slowest)
+    stack.append(stats)
+    return stats
+
+
+def stop_query_stats():
+    """
+    Stop collecting query statistics in the current thread.
+
+    :return: the :class:`QueryStats` object, or `None` if statistics
+        were not being collected.
+    """
+
+    stack = getattr(_state, 'stack', None)
+    if not stack:
+        return None
+
+    return stack.pop()
+
+
+def get_query_stats():
+    """
+    Get the active :class:`QueryStats` object for the current thread,
+    if any.
+    """
+
+    stack = getattr(_state, 'stack', None)
+    if not stack:
+        return None
+
+    return stack[-1]
+
+
+def _before_execute(
+        conn, cursor, statement, parameters, context, executemany):
+    if get_query_stats() is not None:
+        conn.info.setdefault(_conn_info_key, []).append(default_timer())
+
+
+def _after_execute(
+        conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get(_conn_info_key)
+    if not start_times:
+        return
+
+    duration = default_timer() - start_times.pop()
+
+    stats = get_query_stats()
+    if stats is not None:
+        stats.record_query(statement, duration)
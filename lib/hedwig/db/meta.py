@@ -92,6 +92,14 @@ auth_failure = Table(
     Column('expiry', DateTime(), nullable=False, index=True),
     **table_opts)
 
+auth_failure_addr = Table(
+    'auth_failure_addr',
+    metadata,
+    Column('remote_addr', Unicode(50), primary_key=True, nullable=False),
+    Column('attempts', Integer, nullable=False),
+    Column('expiry', DateTime(), nullable=False, index=True),
+    **table_opts)
+
 auth_token = Table(
     'auth_token',
     metadata,
@@ -364,7 +372,7 @@ message = Table(
     'message',
     metadata,
     Column('id', Integer, primary_key=True),
-    Column('date', DateTime(), nullable=False),
+    Column('date', DateTime(), nullable=False, index=True),
     Column('subject', Unicode(255), nullable=False),
     Column('body', UnicodeText, nullable=False),
     Column('timestamp_send', DateTime(), default=None, index=True),
@@ -742,6 +750,16 @@ def _request_cols():
     ]
 
 
+request_call_pdf = Table(
+    'request_call_pdf',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('call_id', None,
+           ForeignKey('call.id', onupdate='RESTRICT', ondelete='RESTRICT'),
+           nullable=False),
+    *_request_cols(),
+    **table_opts)
+
 request_prop_copy = Table(
     'request_prop_copy',
     metadata,
@@ -928,6 +946,16 @@ semester = Table(
     UniqueConstraint('facility_id', 'code'),
     **table_opts)
 
+semester_ra_inaccessible = Table(
+    'semester_ra_inaccessible',
+    metadata,
+    Column('semester_id', None,
+           ForeignKey('semester.id', onupdate='RESTRICT', ondelete='RESTRICT'),
+           primary_key=True, nullable=False),
+    Column('el_min', Float, primary_key=True, nullable=False),
+    Column('ra_inaccessible', JSONEncoded, nullable=False),
+    **table_opts)
+
 site_group_member = Table(
     'site_group_member',
     metadata,
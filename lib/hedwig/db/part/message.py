@@ -26,7 +26,7 @@ except ImportError:
     from itertools import izip_longest as zip_longest
 
 from sqlalchemy.sql.expression import and_, column, not_
-from sqlalchemy.sql.functions import coalesce
+from sqlalchemy.sql.functions import coalesce, count
 
 from ...email.util import is_valid_email
 from ...error import ConsistencyError, Error, FormattedError, \
@@ -44,7 +44,7 @@ class MessagePart(object):
             self, subject, body, person_ids, email_addresses=[],
             thread_type=None, thread_id=None,
             format_type=MessageFormatType.PLAIN,
-            _test_skip_check=False):
+            _test_skip_check=False, _conn=None):
         """
         Add a message to the database.
 
@@ -76,7 +76,7 @@ class MessagePart(object):
                     (len(person_ids) != len(set(person_ids)))):
                 raise Error('duplicate person_id for new message')
 
-        with self._transaction() as conn:
+        with self._transaction(_conn=_conn) as conn:
             result = conn.execute(message.insert().values({
                 message.c.date: datetime.utcnow(),
                 message.c.subject: subject,
@@ -89,16 +89,34 @@ class MessagePart(object):
 
             message_id = result.inserted_primary_key[0]
 
-            for (person_id, email_address) in zip_longest(
-                    person_ids, email_addresses):
-                conn.execute(message_recipient.insert().values({
-                    message_recipient.c.message_id: message_id,
-                    message_recipient.c.person_id: person_id,
-                    message_recipient.c.email_address: email_address,
-                }))
+            recipients = [
+                {
+                    message_recipient.c.message_id.name: message_id,
+                    message_recipient.c.person_id.name: person_id,
+                    message_recipient.c.email_address.name: email_address,
+                } for (person_id, email_address) in zip_longest(
+                    person_ids, email_addresses)]
+
+            if recipients:
+                conn.execute(message_recipient.insert(), recipients)
 
         return message_id
 
+    def add_messages(self, messages, _conn=None):
+        """
+        Add multiple messages to the database in a single transaction.
+
+        :param messages: list of kwargs dictionaries to be passed
+            to :meth:`add_message`
+
+        :return: list of message identifiers
+        """
+
+        with self._transaction(_conn=_conn) as conn:
+            return [
+                self.add_message(_conn=conn, **kwargs)
+                for kwargs in messages]
+
     def get_message(self, message_id):
         """
         Retrieve a message from the database.
@@ -110,7 +128,8 @@ class MessagePart(object):
 
     def search_message(
             self, person_id=None, state=None,
-            message_id=None, message_id_lt=None,
+            message_id=None, message_id_lt=None, message_id_gt=None,
+            date_before=None, date_after=None,
             thread_type=None, thread_id=None,
             limit=None, oldest_first=False,
             with_body=False, with_thread_identifiers=False,
@@ -120,7 +139,9 @@ class MessagePart(object):
         Searches for messages.
 
         The selection of messages to be returned can be controlled with the
-        optional keyword arguments.
+        optional keyword arguments.  The `message_id_lt` and `message_id_gt`
+        arguments can be used with `limit` to page through the results,
+        but see also :meth:`search_message_iter`.
         """
 
         default = {
@@ -134,16 +155,9 @@ class MessagePart(object):
             fields = [x for x in message.columns if x.name != 'body']
             default['body'] = None
 
-        stmt = select(fields)
-
-        if person_id is not None:
-            stmt = stmt.select_from(
-                message.join(message_recipient)
-            ).where(
-                message_recipient.c.person_id == person_id)
-
-        if state is not None:
-            stmt = stmt.where(message.c.state == state)
+        stmt = self._search_message_filter(
+            select(fields), person_id=person_id, state=state,
+            date_before=date_before, date_after=date_after)
 
         if message_id is not None:
             stmt = stmt.where(message.c.id == message_id)
@@ -154,6 +168,12 @@ class MessagePart(object):
 
             stmt = stmt.where(message.c.id < message_id_lt)
 
+        if message_id_gt is not None:
+            if message_id is not None:
+                raise Error('message_id and message_id_gt both specified')
+
+            stmt = stmt.where(message.c.id > message_id_gt)
+
         if thread_type is not None:
             stmt = stmt.where(message.c.thread_type == thread_type)
 
@@ -216,6 +236,78 @@ class MessagePart(object):
 
         return ans
 
+    def search_message_count(
+            self, person_id=None, state=None,
+            date_before=None, date_after=None):
+        """
+        Count the messages matching the given criteria.
+
+        This requires a full count of the matching rows, so for large
+        numbers of messages the result should be cached where possible.
+        """
+
+        stmt = self._search_message_filter(
+            select([count(message.c.id)]), person_id=person_id, state=state,
+            date_before=date_before, date_after=date_after)
+
+        with self._transaction() as conn:
+            return conn.execute(stmt).scalar()
+
+    def search_message_iter(
+            self, block_size=1000, oldest_first=False,
+            message_id_lt=None, message_id_gt=None, **kwargs):
+        """
+        Iterate over messages, retrieving them in blocks.
+
+        Each block is fetched with a separate call to :meth:`search_message`,
+        continuing from the last message identifier of the previous block,
+        so that long lists can be processed without using offsets or
+        holding every message in memory.  Other keyword arguments
+        are passed to :meth:`search_message`.
+
+        :return: a generator of `Message` tuples
+        """
+
+        while True:
+            messages = self.search_message(
+                limit=block_size, oldest_first=oldest_first,
+                message_id_lt=message_id_lt, message_id_gt=message_id_gt,
+                **kwargs)
+
+            for message_ in messages.values():
+                yield message_
+
+            if len(messages) < block_size:
+                break
+
+            if oldest_first:
+                message_id_gt = max(messages.keys())
+            else:
+                message_id_lt = min(messages.keys())
+
+    def _search_message_filter(
+            self, stmt, person_id, state, date_before, date_after):
+        """
+        Apply common message search criteria to a statement.
+        """
+
+        if person_id is not None:
+            stmt = stmt.select_from(
+                message.join(message_recipient)
+            ).where(
+                message_recipient.c.person_id == person_id)
+
+        if state is not None:
+            stmt = stmt.where(message.c.state == state)
+
+        if date_before is not None:
+            stmt = stmt.where(message.c.date < date_before)
+
+        if date_after is not None:
+            stmt = stmt.where(message.c.date >= date_after)
+
+        return stmt
+
     def search_message_recipient(
             self, message_id=None, with_resolved_email=False,
             _conn=None):
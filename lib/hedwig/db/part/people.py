@@ -19,13 +19,12 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from datetime import datetime, timedelta
-from time import sleep
 
 from sqlalchemy.sql.expression import and_, exists, not_
 from sqlalchemy.sql.functions import count
 
-from ... import auth
-from ...auth import check_password_hash, create_password_hash, generate_token
+from ...auth import check_password_hash, create_password_hash, \
+    generate_token, simulate_password_hash
 from ...config import get_countries
 from ...email.util import is_valid_email
 from ...error import ConsistencyError, DatabaseIntegrityError, \
@@ -39,15 +38,16 @@ from ...type.simple import AuthTokenInfo, Email, \
     Person, PersonInfo, PersonLog, SiteGroupMember, UserInfo, UserLog
 from ...util import is_list_like
 from ..compat import row_as_mapping, select
-from ..meta import auth_failure, auth_token, email, group_member, \
+from ..meta import auth_failure, auth_failure_addr, auth_token, \
+    email, group_member, \
     institution, institution_log, \
     invitation, member, message_recipient, \
     oauth_code, oauth_token, person, person_log, \
     proposal_fig, proposal_pdf, proposal_text, \
-    request_prop_copy, request_prop_pdf, \
+    request_call_pdf, request_prop_copy, request_prop_pdf, \
     reset_token, reviewer, reviewer_acceptance, review_fig, \
     site_group_member, user, user_log, verify_token
-from ..util import require_not_none
+from ..util import directory_write, require_not_none
 
 auth_token_expiry = timedelta(hours=24)
 
@@ -55,6 +55,9 @@ rate_limit_period = timedelta(minutes=120)
 rate_limit_verify = 5
 rate_limit_password_reset = 3
 
+auth_failure_expiry = timedelta(minutes=30)
+auth_failure_limit_name = 5
+
 
 class PeoplePart(object):
     def add_email(
@@ -86,6 +89,7 @@ class PeoplePart(object):
 
         return result.inserted_primary_key[0]
 
+    @directory_write
     def add_institution(
             self, name, department, organization, address, country,
             name_abbr=None, department_abbr=None, organization_abbr=None,
@@ -120,6 +124,7 @@ class PeoplePart(object):
 
         return institution_id
 
+    @directory_write
     def add_person(
             self, name, title=None, public=False,
             user_id=None, remote_addr=None,
@@ -253,6 +258,7 @@ class PeoplePart(object):
 
         return result.inserted_primary_key[0]
 
+    @directory_write
     def add_user(
             self, name, password_raw, person_id=None, remote_addr=None,
             _test_skip_check=False):
@@ -313,7 +319,8 @@ class PeoplePart(object):
         return user_id
 
     def authenticate_user(
-            self, name, password_raw, user_id=None, remote_addr=None):
+            self, name, password_raw, user_id=None, remote_addr=None,
+            addr_failure_limit=None):
         """
         Given a user name and raw password, try to authenitcate the user.
 
@@ -326,6 +333,13 @@ class PeoplePart(object):
 
         Attempts to protect against multiple authentication attempts, but only
         if "name" is given.  (I.e. not in user_id re-authentication mode.)
+
+        If `remote_addr` and `addr_failure_limit` are given, attempts with
+        unrecognized user names are also counted for the remote address.
+        Once the limit is reached, all further attempts from that address
+        are rejected (until the failure record expires) without looking up
+        the user name or hashing the password, so that the response does
+        not reveal whether the name exists.
         """
 
         stmt = user.select()
@@ -343,32 +357,56 @@ class PeoplePart(object):
         if not password_raw:
             raise UserError('The password can not be blank.')
 
+        check_addr = ((name is not None) and (remote_addr is not None) and
+                      bool(addr_failure_limit))
+
         with self._transaction() as conn:
             if name is not None:
                 # Removed any expired auth_failure records.
+                now = datetime.utcnow()
                 conn.execute(auth_failure.delete().where(
-                    auth_failure.c.expiry < datetime.utcnow()))
+                    auth_failure.c.expiry < now))
+                conn.execute(auth_failure_addr.delete().where(
+                    auth_failure_addr.c.expiry < now))
 
-                # Check for excessive authentication failures.
+                # Check for excessive authentication failures.  This is
+                # done before the password is hashed so that repeated
+                # attempts are rejected cheaply.
                 attempts = conn.execute(select([
                     auth_failure.c.attempts
                 ]).where(auth_failure.c.user_name == name)).scalar()
 
                 # Current limit: more that 5 (i.e. 6 or more failures).
-                if (attempts is not None) and (attempts >= 5):
+                if (attempts is not None) and (
+                        attempts >= auth_failure_limit_name):
                     raise UserError(
                         'Too many authentication attempts for this user name.')
 
+                if check_addr:
+                    attempts = conn.execute(select([
+                        auth_failure_addr.c.attempts
+                    ]).where(
+                        auth_failure_addr.c.remote_addr == remote_addr
+                    )).scalar()
+
+                    if (attempts is not None) and (
+                            attempts >= addr_failure_limit):
+                        raise UserError(
+                            'Too many authentication attempts '
+                            'from this address.')
+
             result = conn.execute(stmt).first()
 
         if result is None:
             if name is not None:
-                self._record_auth_failure(name)
+                self._record_auth_failure(
+                    name, (remote_addr if check_addr else None))
 
-            # Spend time as if we were hashing the password so that the user
+            # Spend time hashing the password anyway so that the user
             # can't tell that the user name doesn't exist by this function
             # returning fast.
-            sleep(auth.password_hash_delay)
+            simulate_password_hash(password_raw)
+
             return None
 
         else:
@@ -393,31 +431,44 @@ class PeoplePart(object):
 
                 return None
 
-    def _record_auth_failure(self, name):
+    def _record_auth_failure(self, name, remote_addr=None):
         """
-        Record an authentication failure.
+        Record an authentication failure for the given user name and,
+        if specified, remote address.
+
+        Failures are only recorded for the remote address when the user
+        name was not recognized.
         """
 
+        expiry = datetime.utcnow() + auth_failure_expiry
+
+        self._record_auth_failure_entry(
+            auth_failure, auth_failure.c.user_name, name, expiry)
+
+        if remote_addr is not None:
+            self._record_auth_failure_entry(
+                auth_failure_addr, auth_failure_addr.c.remote_addr,
+                remote_addr, expiry)
+
+    def _record_auth_failure_entry(self, table, key_column, key, expiry):
         # Note the try .. except outside the with block: this is because
         # our context manager detects and raises  DatabaseIntegrityError
         # so we can only catch it after the block.
 
         try:
-            expiry = datetime.utcnow() + timedelta(minutes=30)
-
             with self._transaction() as conn:
-                conn.execute(auth_failure.insert().values({
-                    auth_failure.c.user_name: name,
-                    auth_failure.c.attempts: 1,
-                    auth_failure.c.expiry: expiry,
+                conn.execute(table.insert().values({
+                    key_column: key,
+                    table.c.attempts: 1,
+                    table.c.expiry: expiry,
                 }))
 
         except DatabaseIntegrityError:
             with self._transaction() as conn:
-                conn.execute(auth_failure.update().where(
-                    auth_failure.c.user_name == name
+                conn.execute(table.update().where(
+                    key_column == key
                 ).values({
-                    auth_failure.c.attempts: auth_failure.c.attempts + 1,
+                    table.c.attempts: table.c.attempts + 1,
                 }))
 
     def _delete_auth_failure(self, user_name, _conn=None):
@@ -512,6 +563,7 @@ class PeoplePart(object):
         with self._transaction() as conn:
             conn.execute(stmt)
 
+    @directory_write
     def delete_institution(self, institution_id, _test_skip_check=False):
         """
         Attempt to delete an institution.
@@ -544,6 +596,7 @@ class PeoplePart(object):
                     'no row matched deleting institution with id={}',
                     institution_id)
 
+    @directory_write
     def delete_user(self, user_id, _test_skip_check=False):
         """
         Delete a user record.
@@ -598,6 +651,19 @@ class PeoplePart(object):
         conn.execute(oauth_token.delete().where(
             oauth_token.c.expiry < datetime.utcnow()))
 
+    def get_directory_version(self):
+        """
+        Get the directory version counter.
+
+        This is a number which changes whenever this object is used to
+        write person, institution or user records.  It can therefore
+        be used to check whether cached lists of such records
+        may need to be regenerated.  Note that changes made by
+        other processes are not counted.
+        """
+
+        return self._directory_version
+
     def get_institution(self, institution_id, _conn=None):
         """
         Get an institution record.
@@ -860,6 +926,7 @@ class PeoplePart(object):
 
         return (token, expiry)
 
+    @directory_write
     def merge_institution_records(
             self, main_institution_id,
             duplicate_institution_id,
@@ -899,6 +966,7 @@ class PeoplePart(object):
             conn.execute(institution.delete().where(
                 institution.c.id == duplicate_institution_id))
 
+    @directory_write
     def merge_person_records(
             self, main_person_id, duplicate_person_id,
             duplicate_person_registered=None,
@@ -960,6 +1028,7 @@ class PeoplePart(object):
                     (reviewer, 'person_id'),
                     (reviewer_acceptance, 'person_id'),
                     (review_fig, 'uploader'),
+                    (request_call_pdf, 'requester'),
                     (request_prop_copy, 'requester'),
                     (request_prop_pdf, 'requester'),
                     (site_group_member, 'person_id')):
@@ -1632,6 +1701,7 @@ class PeoplePart(object):
                 update_columns=(),
                 forbid_add=True)
 
+    @directory_write
     def update_institution(
             self, institution_id, updater_person_id=None,
             name=None, department=None,
@@ -1711,6 +1781,7 @@ class PeoplePart(object):
                 updater_person_id, PersonLogEvent.INSTITUTION_EDIT,
                 institution_id=institution_id, _conn=conn)
 
+    @directory_write
     def update_person(
             self, person_id,
             name=None, title=(), public=None, institution_id=(),
@@ -1763,6 +1834,7 @@ class PeoplePart(object):
                 raise ConsistencyError(
                     'no rows matched updating person with id={}', person_id)
 
+    @directory_write
     def update_user(
             self, user_id, disabled=None,
             _test_skip_check=False):
@@ -1791,6 +1863,7 @@ class PeoplePart(object):
                 raise ConsistencyError(
                     'no rows matched updating user with id={}', user_id)
 
+    @directory_write
     def update_user_name(
             self, user_id, name, remote_addr=None,
             _test_skip_check=False):
@@ -1820,6 +1893,7 @@ class PeoplePart(object):
             self._add_user_log_entry(
                 conn, user_id, UserLogEvent.CHANGE_NAME, remote_addr)
 
+    @directory_write
     def update_user_password(
             self, user_id, password_raw, remote_addr=None,
             _test_skip_check=False, _skip_log=False,
@@ -1957,6 +2031,7 @@ class PeoplePart(object):
 
         return user_name
 
+    @directory_write
     def use_invitation(
             self, token, user_id=None, new_person_id=None,
             remote_addr=None, _test_skip_check=False):
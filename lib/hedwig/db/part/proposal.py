@@ -35,7 +35,7 @@ from ...type.collection import AffiliationCollection, AnnotationCollection, \
     ProposalFigureCollection, ProposalTextCollection, \
     RequestCollection, ResultCollection, TargetCollection
 from ...type.enum import AnnotationType, AttachmentState, \
-    CallState, FigureType, FormatType, \
+    CallState, FigureType, FormatType, MessageState, \
     PersonLogEvent, ProposalState, ProposalType, PublicationType, \
     RequestState, SemesterState
 from ...type.simple import Affiliation, Annotation, \
@@ -46,25 +46,27 @@ from ...type.simple import Affiliation, Annotation, \
     ProposalFigureInfo, ProposalPDFInfo, \
     ProposalText, \
     Queue, QueueInfo, \
-    RequestPropCopy, RequestPropPDF, \
+    RequestCallPDF, RequestPropCopy, RequestPropPDF, \
     ReviewerInfo, Semester, SemesterInfo, Target
 from ...util import is_list_like
 from ..compat import case, row_as_dict, row_as_mapping, scalar_subquery, select
 from ..meta import affiliation, affiliation_weight, \
     call, call_mid_close, call_preamble, category, decision, \
     facility, institution, \
-    member, person, prev_proposal, prev_proposal_pub, \
+    member, message, moc, person, prev_proposal, prev_proposal_pub, \
     proposal, proposal_annotation, proposal_category, \
     proposal_fig, proposal_fig_link, \
     proposal_fig_preview, proposal_fig_thumbnail, \
     proposal_pdf, proposal_pdf_link, proposal_pdf_preview, \
     proposal_text, proposal_text_link, \
-    queue, request_prop_copy, request_prop_pdf, \
-    review, reviewer, semester, target
-from ..util import require_not_none
+    queue, request_call_pdf, request_prop_copy, request_prop_pdf, \
+    review, review_fig, reviewer, semester, semester_ra_inaccessible, \
+    target
+from ..util import require_not_none, review_write
 
 
 class ProposalPart(object):
+    @review_write
     def add_affiliation(self, type_class, queue_id, name, type_=None):
         """
         Add an affiliation to the database.
@@ -171,6 +173,7 @@ class ProposalPart(object):
 
         return result.inserted_primary_key[0]
 
+    @review_write
     def add_member(
             self, proposal_id, person_id, affiliation_id,
             pi=False, editor=False, observer=False, reviewer=False,
@@ -222,6 +225,7 @@ class ProposalPart(object):
 
         return result.inserted_primary_key[0]
 
+    @review_write
     def add_proposal(
             self, call_id, person_id, affiliation_id, title,
             type_=ProposalType.STANDARD,
@@ -418,6 +422,33 @@ class ProposalPart(object):
 
             return result.inserted_primary_key[0]
 
+    def add_request_call_pdf(
+            self, call_id, requester_person_id,
+            _test_skip_check=False):
+        """
+        Add a request for a PDF bundle of the proposals for a call.
+        """
+
+        with self._transaction() as conn:
+            if not _test_skip_check and not self._exists_id(
+                    conn, call, call_id):
+                raise ConsistencyError(
+                    'call does not exist with id={}', call_id)
+
+            if not _test_skip_check and not self._exists_id(
+                    conn, person, requester_person_id):
+                raise ConsistencyError(
+                    'person does not exist with id={}', requester_person_id)
+
+            result = conn.execute(request_call_pdf.insert().values({
+                request_call_pdf.c.call_id: call_id,
+                request_call_pdf.c.state: RequestState.NEW,
+                request_call_pdf.c.requested: datetime.utcnow(),
+                request_call_pdf.c.requester: requester_person_id,
+            }))
+
+            return result.inserted_primary_key[0]
+
     def add_request_prop_copy(
             self, proposal_id, requester_person_id,
             call_id, affiliation_id, copy_members, continuation,
@@ -522,6 +553,7 @@ class ProposalPart(object):
 
             return result.inserted_primary_key[0]
 
+    @review_write
     def delete_member_person(self, proposal_id, person_id):
         """
         Remove a member from a proposal, by person identifier.
@@ -669,6 +701,10 @@ class ProposalPart(object):
             self._remove_orphan_records(
                 conn, proposal_text, proposal_text_link.c.text_id)
 
+    def delete_request_call_pdf(self, request_id, _test_skip_check=False):
+        self._delete_request(
+            request_call_pdf, request_id, _test_skip_check=_test_skip_check)
+
     def delete_request_prop_copy(self, request_id, _test_skip_check=False):
         self._delete_request(
             request_prop_copy, request_id, _test_skip_check=_test_skip_check)
@@ -999,6 +1035,26 @@ class ProposalPart(object):
 
         return Semester(**row_as_mapping(result))
 
+    def get_semester_ra_inaccessible(self, semester_id, el_min, _conn=None):
+        """
+        Get the stored list of inaccessible RA ranges for a semester.
+
+        :raises NoSuchRecord: if no value has been stored for the
+            given semester and elevation limit
+        """
+
+        stmt = select([semester_ra_inaccessible.c.ra_inaccessible]).where(and_(
+            semester_ra_inaccessible.c.semester_id == semester_id,
+            semester_ra_inaccessible.c.el_min == el_min))
+
+        with self._transaction(_conn=_conn) as conn:
+            result = conn.execute(stmt).first()
+
+        if result is None:
+            raise NoSuchRecord('semester RA inaccessibility does not exist')
+
+        return result.ra_inaccessible
+
     def get_queue(self, facility_id, queue_id, _conn=None):
         """
         Get a queue record.
@@ -1658,6 +1714,38 @@ class ProposalPart(object):
 
         return ans
 
+    def search_pending_count(self):
+        """
+        Count the records waiting to be processed by the poll tasks.
+
+        These are unsent messages and attachments, publication references
+        and requests in the "new" state.
+
+        :return: a dictionary of counts by table name
+        """
+
+        pending = (
+            (message, MessageState.UNSENT),
+            (moc, AttachmentState.NEW),
+            (prev_proposal_pub, AttachmentState.NEW),
+            (proposal_fig, AttachmentState.NEW),
+            (proposal_pdf, AttachmentState.NEW),
+            (request_call_pdf, RequestState.NEW),
+            (request_prop_copy, RequestState.NEW),
+            (request_prop_pdf, RequestState.NEW),
+            (review_fig, AttachmentState.NEW),
+        )
+
+        ans = {}
+
+        with self._transaction() as conn:
+            for (table, state) in pending:
+                ans[table.name] = conn.execute(
+                    select([count(table.c.id)]).where(
+                        table.c.state == state)).scalar()
+
+        return ans
+
     def search_prev_proposal(
             self, proposal_id, continuation=None, resolved=None,
             with_publications=True, with_proposal_info=False,
@@ -1835,11 +1923,18 @@ class ProposalPart(object):
             decision_accept_defined=None,
             proposal_number=None, call_type=None,
             semester_code=None, queue_code=None, queue_id=None,
-            category=None,
+            category=None, summary=False,
             _conn=None):
         """
         Search for proposals.
 
+        If "summary" is set then only the fields required to identify
+        and list proposals are retrieved: the proposal record itself,
+        the semester, queue, call type and facility.  The remaining
+        call-related fields (such as the word and page limits) are
+        set to `None`.  This mode is suitable for pages which only
+        display lists of proposals.
+
         If "person_id" is specified, then this method searches for proposals
         with this person as a member, and also sets "member" in the
         returned "Proposal" object to a "MemberInfo" object summarizing
@@ -1876,9 +1971,12 @@ class ProposalPart(object):
             queue.c.name.label('queue_name'),
             queue.c.code.label('queue_code'),
             call.c.type.label('call_type'),
+            semester.c.facility_id,
+        ]
+
+        call_columns = [
             call.c.separate.label('call_separate'),
             call.c.hidden.label('call_hidden'),
-            semester.c.facility_id,
             call.c.abst_word_lim,
             call.c.tech_word_lim,
             call.c.tech_fig_lim,
@@ -1895,6 +1993,11 @@ class ProposalPart(object):
             call.c.cnrq_page_lim,
         ]
 
+        if summary:
+            default.update({x.name: None for x in call_columns})
+        else:
+            select_columns.extend(call_columns)
+
         select_from = proposal.join(call).join(semester).join(queue)
 
         # Determine query: add member results if person_id specified.
@@ -2534,6 +2637,19 @@ class ProposalPart(object):
 
         return ans
 
+    def search_request_call_pdf(
+            self, request_id=None, call_id=None, state=None, **kwargs):
+        where_extra = []
+
+        if call_id is not None:
+            where_extra.append(request_call_pdf.c.call_id == call_id)
+
+        return self._search_request_prop(
+            request_call_pdf, RequestCallPDF,
+            request_id=request_id, proposal_id=None, state=state,
+            where_extra=where_extra,
+            **kwargs)
+
     def search_request_prop_copy(
             self, request_id=None, proposal_id=None, state=None,
             continuation=None, **kwargs):
@@ -2697,6 +2813,7 @@ class ProposalPart(object):
 
         return preamble_id
 
+    @review_write
     def set_member_institution(
             self, member_id, institution_id, _test_skip_check=False):
         with self._transaction() as conn:
@@ -2914,6 +3031,29 @@ class ProposalPart(object):
 
         return (link_id, text_id)
 
+    def set_semester_ra_inaccessible(
+            self, semester_id, el_min, ra_inaccessible, _conn=None):
+        """
+        Store the list of inaccessible RA ranges for a semester,
+        replacing any previous value for the same elevation limit.
+        """
+
+        with self._transaction(_conn=_conn) as conn:
+            if not self._exists_id(conn, semester, semester_id):
+                raise ConsistencyError(
+                    'semester does not exist with id={}', semester_id)
+
+            conn.execute(semester_ra_inaccessible.delete().where(and_(
+                semester_ra_inaccessible.c.semester_id == semester_id,
+                semester_ra_inaccessible.c.el_min == el_min)))
+
+            conn.execute(semester_ra_inaccessible.insert().values({
+                semester_ra_inaccessible.c.semester_id: semester_id,
+                semester_ra_inaccessible.c.el_min: el_min,
+                semester_ra_inaccessible.c.ra_inaccessible: ra_inaccessible,
+            }))
+
+    @review_write
     def sync_affiliation_weight(self, type_class, call_id, records):
         """
         Update the affiliation weighting values and possible hidden
@@ -2962,6 +3102,7 @@ class ProposalPart(object):
                 records=records,
                 update_columns=(call_mid_close.c.date,))
 
+    @review_write
     def sync_facility_category(self, facility_id, records):
         """
         Update the categories available for proposal for a facility.
@@ -2977,6 +3118,7 @@ class ProposalPart(object):
                 unique_columns=(category.c.name,),
                 forbid_circular_reinsert=True)
 
+    @review_write
     def sync_proposal_category(self, proposal_id, records, _conn=None):
         """
         Update the categories associated with a proposal.
@@ -3017,6 +3159,7 @@ class ProposalPart(object):
 
         return (n_insert, n_update, n_delete)
 
+    @review_write
     def sync_proposal_member(
             self, proposal_id, records, editor_person_id,
             forbid_delete=False):
@@ -3045,6 +3188,7 @@ class ProposalPart(object):
                     member.c.affiliation_id
                 ), forbid_add=True, forbid_delete=forbid_delete)
 
+    @review_write
     def sync_proposal_member_institution(self, proposal_id, records):
         """
         Update the institution of members of a proposal.
@@ -3056,6 +3200,7 @@ class ProposalPart(object):
                 update_columns=(member.c.institution_id,),
                 forbid_add=True, forbid_delete=True)
 
+    @review_write
     def sync_proposal_member_student(self, proposal_id, records):
         """
         Update the 'student' flag of members of a proposal.
@@ -3218,6 +3363,7 @@ class ProposalPart(object):
             return self._sync_records(
                 conn, target, target.c.proposal_id, proposal_id, records)
 
+    @review_write
     def sync_queue_affiliation(self, type_class, queue_id, records):
         """
         Update the affiliation records for a queue to match those
@@ -3236,6 +3382,7 @@ class ProposalPart(object):
                 records, unique_columns=(affiliation.c.name,),
                 forbid_circular_reinsert=True)
 
+    @review_write
     def update_call(
             self, call_id, date_open=None, date_close=None,
             abst_word_lim=None,
@@ -3436,6 +3583,17 @@ class ProposalPart(object):
                 raise ConsistencyError(
                     'Did not update previous proposal publication info')
 
+    def update_request_call_pdf(
+            self, request_id, state=None, processed=None,
+            state_prev=None,
+            state_is_system=False,
+            _test_skip_check=False):
+        self._update_request_prop(
+            request_call_pdf, request_id, state=state, processed=processed,
+            state_prev=state_prev,
+            state_is_system=state_is_system,
+            _test_skip_check=_test_skip_check)
+
     def update_request_prop_copy(
             self, request_id, state=None, processed=None,
             state_prev=None, copy_proposal_id=None,
@@ -3503,6 +3661,7 @@ class ProposalPart(object):
                 raise ConsistencyError(
                     'no rows matched updating request {}', request_id)
 
+    @review_write
     def update_semester(
             self, semester_id, name=None, code=None,
             date_start=None, date_end=None, description=None,
@@ -3551,6 +3710,12 @@ class ProposalPart(object):
                     'no rows matched updating semester with id={}',
                     semester_id)
 
+            # Remove stored values which depend on the semester dates.
+            if (date_start is not None) or (date_end is not None):
+                conn.execute(semester_ra_inaccessible.delete().where(
+                    semester_ra_inaccessible.c.semester_id == semester_id))
+
+    @review_write
     def update_proposal(
             self, proposal_id, state=None, title=None,
             state_prev=None,
@@ -3813,6 +3978,7 @@ class ProposalPart(object):
                 raise ConsistencyError(
                     'no rows matched updating proposal PDF with id={}', pdf_id)
 
+    @review_write
     def update_queue(
             self, queue_id, name=None, code=None, description=None,
             description_format=None,
@@ -20,27 +20,30 @@ from __future__ import absolute_import, division, print_function, \
 
 from datetime import datetime
 
-from sqlalchemy.sql.expression import and_, not_
+from sqlalchemy.sql.expression import and_, exists, not_, or_
 from sqlalchemy.sql.functions import count
 
 from ...error import ConsistencyError, Error, FormattedError, \
     NoSuchRecord, UserError
-from ...type.collection import GroupMemberCollection, ResultCollection, \
+from ...type.collection import GroupMemberCollection, \
+    ProposalCollection, ResultCollection, \
     ReviewerCollection, ReviewerAcceptanceCollection, \
     ReviewDeadlineCollection, \
     ReviewFigureCollection
 from ...type.enum import Assessment, FormatType, ReviewState
-from ...type.simple import GroupMember, Note, \
-    Reviewer, ReviewerAcceptance, \
+from ...type.simple import GroupMember, MemberPIInfo, Note, \
+    Proposal, Reviewer, ReviewerAcceptance, \
     ReviewDeadline, ReviewFigureInfo
+from ...type.util import null_tuple
 from ...util import is_list_like
-from ..compat import case, row_as_mapping, select
-from ..meta import affiliation_weight_note, available_note, \
+from ..compat import case, row_as_dict, row_as_mapping, select
+from ..meta import affiliation, affiliation_weight_note, available_note, \
     call, decision, group_member, \
-    institution, invitation, person, \
-    proposal, queue, \
+    institution, invitation, member, person, \
+    proposal, queue, semester, \
     review, reviewer, reviewer_acceptance, reviewer_note, review_deadline, \
     review_fig, review_fig_link, review_fig_preview, review_fig_thumbnail
+from ..util import review_write
 
 
 class ReviewPart(object):
@@ -69,6 +72,7 @@ class ReviewPart(object):
 
         return result.inserted_primary_key[0]
 
+    @review_write
     def add_reviewer(
             self, role_class, proposal_id, person_id, role,
             _test_skip_check=False, _conn=None):
@@ -162,6 +166,7 @@ class ReviewPart(object):
             key_value=call_id,
             _conn=_conn)
 
+    @review_write
     def delete_reviewer(
             self, reviewer_id=None,
             proposal_id=None, person_id=None, role=None,
@@ -312,7 +317,24 @@ class ReviewPart(object):
             review_fig, review_fig_link, review_fig_thumbnail.c.thumbnail,
             link_id, fig_id, md5sum, where_extra=where_extra)
 
-    def multiple_reviewer_update(self, role_class, remove=None, add=None):
+    def get_review_version(self):
+        """
+        Get the review version counter.
+
+        This is a number which changes whenever this object is used to
+        write information used in the review process, such as reviews,
+        decisions, proposal members or affiliations.  It can therefore
+        be used to check whether cached information about a call
+        may need to be regenerated.  Note that changes made by
+        other processes are not counted.
+        """
+
+        return self._review_version
+
+    @review_write
+    def multiple_reviewer_update(
+            self, role_class, remove=None, add=None, update=None,
+            messages=None):
         """
         Perform multiple reviewer updates.
 
@@ -323,13 +345,22 @@ class ReviewPart(object):
         a "unique" role is being changed.
 
         The "role_class" for the relevant facility must be provided -- this
-        will be passed to "add_reviewer".
+        will be passed to "add_reviewer" and "update_reviewer".
+
+        "remove", "add" and "update" are lists of kwargs dictionaries to be
+        passed to "delete_reviewer", "add_reviewer" and "update_reviewer"
+        respectively.
 
-        "remove" and "add" are lists of kwargs dictionaries to be passed
-        to "delete_reviewer" and "add_reviewer" respectively.
+        "messages" is a list of kwargs dictionaries for messages to be
+        added (via "add_messages") in the same transaction, for example
+        to notify reviewers of the changes.  This ensures that the
+        messages are only queued if the updates are made.
         """
 
         with self._transaction() as conn:
+            if messages is not None:
+                self.add_messages(messages, _conn=conn)
+
             if remove is not None:
                 for kwargs in remove:
                     self.delete_reviewer(_conn=conn, **kwargs)
@@ -340,6 +371,146 @@ class ReviewPart(object):
                         role_class=role_class,
                         _conn=conn, **kwargs)
 
+            if update is not None:
+                for kwargs in update:
+                    self.update_reviewer(
+                        role_class=role_class,
+                        _conn=conn, **kwargs)
+
+    def search_addable_review(
+            self, role_class, person_id, queue_id,
+            cttee_queue_id=None, _conn=None):
+        """
+        Search for proposals to which a person may be able to add
+        reviews directly.
+
+        This considers committee "other" reviews, in the queues given by
+        `cttee_queue_id`, for proposals where the person does not already
+        have a committee review.  It also considers feedback reviews, for
+        proposals where the person has a role able to write feedback
+        directly but there is no feedback review yet.  In both cases the
+        proposal must be in a state where the role is editable, and
+        proposals of which the person is a member are excluded.
+
+        Only proposals in the given queue(s) are considered.
+        Call and proposal types are not checked, so the caller should
+        still confirm that each role is applicable.
+
+        Only a subset of the usual proposal information is retrieved:
+        the proposal record itself, its semester and queue, the call type
+        and the PI (as the "member" attribute, as for
+        `search_proposal(with_member_pi=True)`).
+
+        :return: a `ProposalCollection` in which the "reviewers" attribute
+            of each proposal is a `ReviewerCollection` of dummy `Reviewer`
+            entries giving the candidate roles.
+        """
+
+        member_other = member.alias()
+
+        candidates = []
+
+        if cttee_queue_id:
+            cttee_other = and_(
+                call.c.queue_id.in_(cttee_queue_id),
+                proposal.c.state.in_(
+                    role_class.get_editable_states(role_class.CTTEE_OTHER)),
+                not_(exists().select_from(reviewer).where(and_(
+                    reviewer.c.proposal_id == proposal.c.id,
+                    reviewer.c.person_id == person_id,
+                    reviewer.c.role.in_(role_class.get_cttee_roles())))))
+
+            candidates.append((role_class.CTTEE_OTHER, cttee_other))
+
+        feedback = and_(
+            proposal.c.state.in_(
+                role_class.get_editable_states(role_class.FEEDBACK)),
+            exists().select_from(reviewer).where(and_(
+                reviewer.c.proposal_id == proposal.c.id,
+                reviewer.c.person_id == person_id,
+                reviewer.c.role.in_(role_class.get_feedback_roles(
+                    include_indirect=False)))),
+            not_(exists().select_from(reviewer).where(and_(
+                reviewer.c.proposal_id == proposal.c.id,
+                reviewer.c.role == role_class.FEEDBACK))))
+
+        candidates.append((role_class.FEEDBACK, feedback))
+
+        candidate_columns = [
+            'candidate_{}'.format(i) for i in range(len(candidates))]
+
+        stmt = select([
+            proposal,
+            call.c.semester_id,
+            semester.c.name.label('semester_name'),
+            semester.c.code.label('semester_code'),
+            semester.c.date_start.label('semester_start'),
+            semester.c.date_end.label('semester_end'),
+            call.c.queue_id,
+            queue.c.name.label('queue_name'),
+            queue.c.code.label('queue_code'),
+            call.c.type.label('call_type'),
+            semester.c.facility_id,
+            member.c.person_id.label('pi_person_id'),
+            person.c.name.label('pi_name'),
+            person.c.public.label('pi_public'),
+            person.c.user_id.label('pi_user_id'),
+            affiliation.c.name.label('pi_affiliation'),
+        ] + [
+            case([(condition, True)], else_=False).label(column)
+            for ((role, condition), column)
+            in zip(candidates, candidate_columns)
+        ]).select_from(
+            proposal.join(call).join(semester).join(queue).outerjoin(
+                member, and_(
+                    proposal.c.id == member.c.proposal_id,
+                    member.c.pi)
+            ).outerjoin(
+                person,
+                member.c.person_id == person.c.id
+            ).outerjoin(
+                affiliation,
+                member.c.affiliation_id == affiliation.c.id)
+        ).where(and_(
+            (call.c.queue_id.in_(queue_id) if is_list_like(queue_id)
+             else (call.c.queue_id == queue_id)),
+            or_(*(condition for (role, condition) in candidates)),
+            not_(exists().select_from(member_other).where(and_(
+                member_other.c.proposal_id == proposal.c.id,
+                member_other.c.person_id == person_id)))
+        )).order_by(proposal.c.id.asc())
+
+        ans = ProposalCollection()
+
+        with self._transaction(_conn=_conn) as conn:
+            for row in conn.execute(stmt):
+                values = row_as_dict(row)
+
+                roles = [
+                    role for ((role, condition), column)
+                    in zip(candidates, candidate_columns)
+                    if values.pop(column)]
+
+                member_info = MemberPIInfo(
+                    values.pop('pi_person_id'),
+                    values.pop('pi_name'),
+                    values.pop('pi_public'),
+                    values.pop('pi_user_id'),
+                    values.pop('pi_affiliation'))
+
+                if member_info.person_id is None:
+                    member_info = None
+
+                ans[row.id] = null_tuple(Proposal)._replace(
+                    member=member_info,
+                    reviewers=ReviewerCollection(
+                        (i, null_tuple(Reviewer)._replace(
+                            proposal_id=row.id, role=role))
+                        for (i, role) in enumerate(roles)),
+                    **values)
+
+        return ans
+
     def search_group_member(
             self, queue_id=None, group_type=None,
             person_id=None, facility_id=None,
@@ -810,6 +981,7 @@ class ReviewPart(object):
             key_value=call_id,
             note=note, format_=format_, _conn=_conn)
 
+    @review_write
     def set_decision(
             self, proposal_id, accept=(), exempt=None, ready=None,
             note=None, note_format=None):
@@ -860,6 +1032,7 @@ class ReviewPart(object):
 
         return decision_id
 
+    @review_write
     def set_review(
             self, role_class, reviewer_id, text, format_,
             assessment, rating, weight,
@@ -1077,14 +1250,15 @@ class ReviewPart(object):
 
         return (n_insert, n_update, n_delete)
 
+    @review_write
     def update_reviewer(
             self, role_class, reviewer_id,
-            notified=None, accepted=(), thanked=()):
+            notified=None, accepted=(), thanked=(), _conn=None):
         """
         Update the status information of a reviewer record.
         """
 
-        with self._transaction() as conn:
+        with self._transaction(_conn=_conn) as conn:
             try:
                 reviewer_record = self.search_reviewer(
                     reviewer_id=reviewer_id, _conn=conn).get_single()
@@ -20,7 +20,10 @@ from __future__ import absolute_import, division, print_function, \
 
 from functools import wraps
 
-from ..error import NoSuchRecord, FormattedError
+from ..error import DatabaseError, NoSuchRecord, FormattedError
+from ..util import get_logger
+
+logger = get_logger(__name__)
 
 
 def memoized(f):
@@ -48,6 +51,75 @@ def memoized(f):
     return decorated
 
 
+def directory_write(f):
+    """
+    Decorator for database methods which write person, institution
+    or user records.
+
+    Updates the database object's directory version counter
+    (see :meth:`~hedwig.db.part.people.PeoplePart.get_directory_version`)
+    after the method is called.
+    """
+
+    @wraps(f)
+    def decorated_method(self, *args, **kwargs):
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            self._directory_version = next(self._directory_version_ctr)
+
+    return decorated_method
+
+
+def review_write(f):
+    """
+    Decorator for database methods which write information used
+    in the review of proposals, such as reviews, decisions, proposal
+    members or affiliations.
+
+    Updates the database object's review version counter
+    (see :meth:`~hedwig.db.part.review.ReviewPart.get_review_version`)
+    after the method is called.
+    """
+
+    @wraps(f)
+    def decorated_method(self, *args, **kwargs):
+        try:
+            return f(self, *args, **kwargs)
+        finally:
+            self._review_version = next(self._review_version_ctr)
+
+    return decorated_method
+
+
+def retry_on_disconnect(f):
+    """
+    Decorator for read-only database methods which retries the method
+    once if it failed because the database connection was lost.
+
+    The retry is not attempted if the method was called within an
+    existing transaction (via a `_conn` argument), as it is then up
+    to the caller to retry the whole transaction.
+    """
+
+    @wraps(f)
+    def decorated_method(self, *args, **kwargs):
+        try:
+            return f(self, *args, **kwargs)
+
+        except DatabaseError as e:
+            if (kwargs.get('_conn') is not None
+                    or not getattr(e.orig, 'connection_invalidated', False)):
+                raise
+
+            logger.warning(
+                'Retrying {} after loss of database connection', f.__name__)
+
+        return f(self, *args, **kwargs)
+
+    return decorated_method
+
+
 def require_not_none(f):
     """
     Decorator which checks that the return value of a function is not
@@ -179,6 +179,9 @@ def render_email_template(name, context, facility=None):
     * `facility_name`
     * `facility_definite_name`
 
+    When rendering the same template for many messages,
+    :func:`prepare_email_template` can be used instead.
+
     .. note::
         This function no longer line-wraps the email message (using
         :func:`wrap_email_text`) and instead returns plain text
@@ -187,10 +190,24 @@ def render_email_template(name, context, facility=None):
         return value of this function to include the format type.
     """
 
-    # Apply the template.
+    return prepare_email_template(name, facility=facility)(context)
+
+
+def prepare_email_template(name, facility=None):
+    """
+    Prepare a function to render a template and then adjust paragraph
+    breaks, as for :func:`render_email_template`.
+
+    The template is selected (and the facility information
+    determined) only once, when this function is called.
+
+    :return: a function which takes a template context and returns
+        the rendered text
+    """
+
     env = get_environment()
 
-    full_context = context.copy()
+    extra_context = {}
 
     if facility is None:
         template = env.get_template(name)
@@ -200,12 +217,18 @@ def render_email_template(name, context, facility=None):
             facility.get_code() + '/' + name,
             'generic/' + name))
 
-        full_context.update({
+        extra_context.update({
             'facility_name': facility.get_name(),
             'facility_definite_name': facility.get_definite_name(),
         })
 
-    return _tidy_email_text(template.render(full_context))
+    def render(context):
+        full_context = context.copy()
+        full_context.update(extra_context)
+
+        return _tidy_email_text(template.render(full_context))
+
+    return render
 
 
 def _tidy_email_text(text):
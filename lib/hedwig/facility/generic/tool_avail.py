@@ -18,7 +18,7 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
-from collections import defaultdict, OrderedDict
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import warnings
 
@@ -26,11 +26,13 @@ from astropy import units
 from astropy.coordinates import AltAz, ICRS, SkyCoord
 from astropy.time import Time
 from astropy.utils.exceptions import AstropyWarning
-from numpy import arange, newaxis, nonzero
+from numpy import arange, newaxis
 
-from ...astro.coord import concatenate_coord_objects, get_earth_location
+from ...astro.coord import calculate_altitude_analytic, \
+    concatenate_coord_objects, get_earth_location
 from ...compat import first_value
-from ...error import UserError
+from ...config import get_config
+from ...error import FormattedError, UserError
 from ...view.tool import BaseTargetTool
 from ...web.util import ErrorPage
 
@@ -159,13 +161,18 @@ class AvailabilityTool(BaseTargetTool):
 
         return ctx
 
-    def _do_availability_search(self, target_objects, date_start, date_end):
-        avail_date = None
-        avail_time = None
-        avail_target = None
-        target_hits = None
-        n_max = 0
-        target_max = 0
+    def _do_availability_search(
+            self, target_objects, date_start, date_end,
+            elevation_model=None):
+        """
+        Count the targets above the elevation limit on a grid of
+        dates and times.
+
+        :param elevation_model: either "astropy" to transform the targets
+            to an `AltAz` frame or "analytic" to use
+            :func:`~hedwig.astro.coord.calculate_altitude_analytic`.
+            If not specified, read from the configuration file.
+        """
 
         date_range = (Time(date_end) - Time(date_start)).sec / 86400
 
@@ -196,11 +203,9 @@ class AvailabilityTool(BaseTargetTool):
         else:
             time_step = 3600
 
-        n = 0
         avail_date = OrderedDict()
-        avail_time = []
-        if len(target_objects) > 1:
-            target_hits = defaultdict(int)
+        avail_target = None
+        target_max = 0
 
         targets = concatenate_coord_objects(target_objects)
 
@@ -211,48 +216,51 @@ class AvailabilityTool(BaseTargetTool):
             + arange(0, self.time_duration + 1,
                      time_step)[newaxis, :] * units.second)
 
-        frame = AltAz(location=self.location, obstime=dates[:, :, newaxis])
-
-        with warnings.catch_warnings():
-            # Ignore warning about not having the latest IERS data.
-            warnings.simplefilter('ignore', AstropyWarning)
-
-            targets = targets[newaxis, newaxis, :].transform_to(frame)
+        if elevation_model is None:
+            elevation_model = get_config().get(
+                'tool_avail', 'elevation_model')
 
-        all_available = (targets.alt > self.el_min)
+        if elevation_model == 'analytic':
+            all_available = (
+                calculate_altitude_analytic(self.location, targets, dates)
+                > self.el_min.value)
 
-        (n_date, n_time, n_target_shape) = all_available.shape
+        elif elevation_model == 'astropy':
+            frame = AltAz(
+                location=self.location, obstime=dates[:, :, newaxis])
 
-        for i_date in range(0, n_date):
-            date_str = dates[i_date, 0].datetime.strftime('%Y-%m-%d')
-            result = avail_date[date_str] = []
+            with warnings.catch_warnings():
+                # Ignore warning about not having the latest IERS data.
+                warnings.simplefilter('ignore', AstropyWarning)
 
-            for i_time in range(0, n_time):
-                n_target = 0
+                targets = targets[newaxis, newaxis, :].transform_to(frame)
 
-                (available,) = nonzero(all_available[i_date, i_time, :])
+            all_available = (targets.alt > self.el_min)
 
-                for i in available:
-                    n_target += 1
+        else:
+            raise FormattedError(
+                'Unknown elevation model "{}"', elevation_model)
 
-                    if target_hits is not None:
-                        target_hits[i] += 1
+        (n_date, n_time, n_target_shape) = all_available.shape
 
-                if i_date == 0:
-                    avail_time.append(
-                        dates[i_date, i_time].datetime.strftime('%H:%M'))
+        # Count the available targets at each date and time, and the
+        # number of times at which each target is available.
+        n_available = all_available.sum(axis=2)
+        n = n_date * n_time
+        n_max = int(n_available.max()) if n > 0 else 0
 
-                result.append(n_target)
+        date_strs = [x.strftime('%Y-%m-%d') for x in dates[:, 0].datetime]
+        avail_time = [x.strftime('%H:%M') for x in dates[0, :].datetime]
 
-                if n_target > n_max:
-                    n_max = n_target
+        for (date_str, result) in zip(date_strs, n_available.tolist()):
+            avail_date[date_str] = result
 
-                n += 1
+        if (len(target_objects) > 1) and (n > 0):
+            target_hits = all_available.sum(axis=(0, 1)).tolist()
 
-        if (target_hits is not None) and (n > 0):
             avail_target = OrderedDict(
-                (x.name, (100.0 * target_hits[i]) / n)
-                for (i, x) in enumerate(target_objects))
+                (x.name, (100.0 * hits) / n)
+                for (x, hits) in zip(target_objects, target_hits))
 
             target_max = max(avail_target.values())
 
@@ -19,6 +19,7 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from collections import defaultdict, OrderedDict
+from threading import Lock
 
 from ...error import NoSuchRecord, NoSuchValue, ParseError
 from ...type.enum import BaseAffiliationType, \
@@ -63,6 +64,10 @@ class Generic(
         self._facilities = {id_: FacilityInfo(
             self.id_, self.get_code(), self.get_name(), self)}
 
+        self._call_snapshot_cache = {}
+        self._call_snapshot_lock = Lock()
+        self._call_snapshot_key_locks = {}
+
     @classmethod
     def get_code(cls):
         """
@@ -478,6 +483,28 @@ class Generic(
         return {k: (v / affiliation_total)
                 for (k, v) in affiliation_count.items()}
 
+    def calculate_affiliation_assignments(
+            self, db, member_collections, affiliations):
+        """
+        Calculate the fractional affiliation assignment for the members
+        of a number of proposals, such as all of the proposals in a call.
+
+        This default implementation calls
+        `calculate_affiliation_assignment` for each proposal.  Facilities
+        may override it to share work between the proposals.
+
+        :param db: database control object
+        :param member_collections: list of member collections
+        :param affiliations: collection of affiliations
+
+        :return: a list of dictionaries of fractional affiliation
+            assignment, in the same order as the `member_collections`
+        """
+
+        return [
+            self.calculate_affiliation_assignment(db, members, affiliations)
+            for members in member_collections]
+
     def attach_review_extra(self, db, proposals):
         """
         Get additional review information from the database.
@@ -774,7 +774,8 @@ class GenericAdmin(object):
 
         type_class = self.get_call_types()
 
-        proposals = db.search_proposal(call_id=call_id, with_member_pi=True)
+        proposals = db.search_proposal(
+            call_id=call_id, with_member_pi=True, summary=True)
 
         # Count number of proposals in each state.
         n_state = defaultdict(int)
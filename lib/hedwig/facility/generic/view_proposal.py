@@ -50,7 +50,7 @@ from ...type.simple import Affiliation, \
     Queue, Semester, Target, TargetToolInfo, \
     TextCopyInfo, ValidationMessage
 from ...type.util import null_tuple, with_can_edit, with_can_view
-from ...view import auth
+from ...view import auth, lookup
 from ...web.util import ErrorPage, HTTPError, HTTPForbidden, \
     HTTPNotFound, HTTPRedirect, \
     flash, get_logger, url_for
@@ -2194,7 +2194,7 @@ class GenericProposal(object):
             except UserError as e:
                 message = e.message
 
-        call = db.get_call(facility_id=None, call_id=proposal.call_id)
+        call = lookup.get_call(db, None, proposal.call_id)
 
         accepted_proposals = db.search_proposal(
             facility_id=self.id_, person_id=current_user.person.id,
@@ -2372,7 +2372,7 @@ class GenericProposal(object):
     def view_case_edit(
             self, current_user, db, proposal, can, role_class, role):
         code = role_class.get_code(role)
-        call = db.get_call(facility_id=None, call_id=proposal.call_id)
+        call = lookup.get_call(db, None, proposal.call_id)
 
         text_info = db.search_proposal_text(
             proposal_id=proposal.id, role=role).get_single(None)
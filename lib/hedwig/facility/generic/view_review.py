@@ -19,49 +19,81 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from collections import defaultdict, namedtuple, OrderedDict
+from contextlib import closing
 from datetime import datetime, timedelta
 from itertools import chain
 import re
 from statistics import mean
+from tempfile import TemporaryFile
+from threading import Lock
+from time import time
 import warnings
+from zipfile import ZipFile, ZIP_STORED
 
 from astropy.time import Time
 from astropy.coordinates import AltAz, ICRS, SkyCoord
 from astropy import units
 from astropy.utils.exceptions import AstropyWarning
-from numpy import arange, newaxis, nonzero
+from numpy import add, arange, newaxis, nonzero, zeros
 
 from ...admin.proposal import finalize_call_review
-from ...astro.coord import get_earth_location
-from ...email.format import render_email_template
+from ...astro.coord import coord_from_dec_deg_array, get_earth_location, \
+    ra_hour_bin
+from ...compat import first_value, string_type
+from ...config import get_config
+from ...email.format import prepare_email_template, render_email_template
 from ...error import DatabaseIntegrityError, NoSuchRecord, NoSuchValue, \
     UserError
 from ...file.csv import CSVWriter
 from ...file.pdf import pdf_to_svg
+from ...pdf.request import get_call_filename
 from ...stats.table import table_mean_stdev
-from ...view import auth
+from ...view import auth, lookup
 from ...view.util import int_or_none, float_or_none, \
     with_proposal, with_call_review, with_review
 from ...web.util import ErrorPage, \
     HTTPError, HTTPForbidden, HTTPNotFound, HTTPRedirect, \
     flash, format_datetime, parse_datetime, url_for
 from ...type.collection import AffiliationCollection, MemberCollection, \
-    ResultCollection, ReviewerCollection, ReviewDeadlineCollection
+    ResultCollection, ReviewerCollection, ReviewDeadlineCollection, \
+    TargetCollection
 from ...type.enum import Assessment, \
     FigureType, FormatType, \
     MessageThreadType, PermissionType, PersonTitle, \
-    ProposalState, ProposalType, ReviewState, \
+    ProposalState, ProposalType, RequestState, ReviewState, \
     SyncOperation
 from ...type.simple import Affiliation, DateAndTime, Link, MemberPIInfo, \
     Note, \
     ProposalWithCode, Reviewer, ReviewerAcceptance, \
-    ReviewFigureInfo, ReviewDeadline
+    ReviewFigureInfo, ReviewDeadline, TargetFracTimeColumns
 from ...type.util import compare_collections, null_tuple, \
     with_can_edit, with_can_view, with_can_view_edit, \
     with_can_view_edit_rating, with_proposals
-from ...util import lower_except_abbr
+from ...util import list_in_blocks, lower_except_abbr
 
 
+def _iter_file(file_, block_size=(1024 * 1024)):
+    """
+    Generator to read a file (given as a name or file object)
+    in blocks, closing it when done.
+    """
+
+    if isinstance(file_, string_type):
+        file_ = open(file_, 'rb')
+
+    with closing(file_):
+        while True:
+            block = file_.read(block_size)
+
+            if not block:
+                break
+
+            yield block
+
+
+CallSnapshotEntry = namedtuple(
+    'CallSnapshotEntry', ('version', 'expiry', 'data'))
+
 ProposalWithExtraPermissions = namedtuple(
     'ProposalWithExtraPermissions',
     ProposalWithCode._fields + (
@@ -108,22 +140,27 @@ class GenericReview(object):
 
         proposals = []
 
-        for proposal in db.search_proposal(
-                call_id=call.id, state=ProposalState.submitted_states(),
-                with_members=True, with_reviewers=bool(reviewer_roles),
-                with_reviewer_role=reviewer_roles,
-                with_decision=True, with_categories=True).values():
+        all_proposals = db.search_proposal(
+            call_id=call.id, state=ProposalState.submitted_states(),
+            with_members=True, with_reviewers=bool(reviewer_roles),
+            with_reviewer_role=reviewer_roles,
+            with_decision=True, with_categories=True, summary=True)
+
+        member_pi_can = self._get_member_pi_authorization(
+            current_user, db, all_proposals, can.cache)
+
+        reviewer_can = self._get_reviewer_authorization(
+            current_user, db, all_proposals, can.cache)
+
+        review_can = auth.for_review_many(
+            group_class, role_class, current_user, db,
+            None, all_proposals, auth_cache=can.cache)
+
+        for proposal in all_proposals.values():
             member_pi = proposal.members.get_pi(default=None)
             if member_pi is not None:
                 member_pi = with_can_view(
-                    member_pi, auth.for_person_member(
-                        current_user, db, self._facilities, member_pi,
-                        auth_cache=can.cache).view)
-
-            review_can = auth.for_review(
-                group_class, role_class, current_user, db,
-                reviewer=None, proposal=proposal,
-                auth_cache=can.cache)
+                    member_pi, member_pi_can[proposal.id].view)
 
             decision_can = auth.for_proposal_decision(
                 group_class, current_user, db, proposal, call=call,
@@ -132,14 +169,12 @@ class GenericReview(object):
             reviewers = None
             if proposal.reviewers is not None:
                 reviewers = proposal.reviewers.map_values(
-                    lambda x: with_can_view(x, auth.for_person_reviewer(
-                        current_user, db, self._facilities, x,
-                        auth_cache=can.cache).view))
+                    lambda x: with_can_view(x, reviewer_can[x.id].view))
 
             proposals.append(ProposalWithExtraPermissions(
                 *proposal._replace(member=member_pi, reviewers=reviewers),
                 code=self.make_proposal_code(db, proposal),
-                can_view_review=review_can.view,
+                can_view_review=review_can[proposal.id].view,
                 can_edit_decision=decision_can.edit))
 
         return {
@@ -153,6 +188,221 @@ class GenericReview(object):
             'show_admin_links': current_user.is_admin,
         }
 
+    def _get_member_pi_authorization(
+            self, current_user, db, proposals, auth_cache):
+        """
+        Determine profile authorization for the PI of each proposal.
+
+        :return: dictionary of `Authorization` objects by proposal ID.
+        """
+
+        members = {}
+        for proposal in proposals.values():
+            member_pi = proposal.members.get_pi(default=None)
+            if member_pi is not None:
+                members[proposal.id] = member_pi
+
+        return auth.for_person_member_many(
+            current_user, db, self._facilities, members,
+            auth_cache=auth_cache)
+
+    def _get_reviewer_authorization(
+            self, current_user, db, proposals, auth_cache):
+        """
+        Determine profile authorization for the reviewers attached to
+        each proposal.
+
+        :return: dictionary of `Authorization` objects by reviewer ID.
+        """
+
+        reviewers = {}
+        for proposal in proposals.values():
+            if proposal.reviewers is not None:
+                reviewers.update(proposal.reviewers)
+
+        return auth.for_person_reviewer_many(
+            current_user, db, self._facilities, reviewers,
+            auth_cache=auth_cache)
+
+    @with_call_review(permission=PermissionType.VIEW)
+    def view_review_call_pdf_request(
+            self, current_user, db, call, can, form):
+        if not get_config().getboolean('pdf_request', 'enable_request'):
+            raise ErrorPage('PDF download is not currently available.')
+
+        type_class = self.get_call_types()
+
+        requests = db.search_request_call_pdf(
+            call_id=call.id, state=RequestState.visible_states())
+
+        # Requests are shared by everyone reviewing the call, so if there
+        # is already a pending request, redirect there automatically.
+        requests_pre_ready = requests.subset_by_state(
+            RequestState.pre_ready_states())
+        if requests_pre_ready:
+            request = first_value(requests_pre_ready)
+
+            flash(
+                'A PDF file download of the proposals for this call '
+                'has already been requested.')
+
+            raise HTTPRedirect(url_for(
+                '.review_call_pdf_request_status', call_id=call.id,
+                request_id=request.id))
+
+        if form is not None:
+            if 'submit_confirm' in form:
+                request_id = db.add_request_call_pdf(
+                    call_id=call.id,
+                    requester_person_id=current_user.person.id)
+
+                flash('Your PDF file download has been requested.')
+
+                raise HTTPRedirect(url_for(
+                    '.review_call_pdf_request_status', call_id=call.id,
+                    request_id=request_id))
+
+            else:
+                raise HTTPRedirect(url_for(
+                    '.review_call', call_id=call.id))
+
+        return {
+            'title': 'Review Process: {} {} {}: Download PDF Files'.format(
+                call.semester_name, call.queue_name,
+                type_class.get_name(call.type)),
+            'call': call,
+            'requests': requests,
+        }
+
+    @with_call_review(permission=PermissionType.VIEW)
+    def view_review_call_pdf_request_status(
+            self, current_user, db, call, can, request_id):
+        type_class = self.get_call_types()
+
+        request = self._get_call_pdf_request(db, call, request_id)
+
+        if RequestState.is_ready(request.state):
+            raise HTTPRedirect(url_for(
+                '.review_call_pdf_request', call_id=call.id))
+
+        return {
+            'title': 'Review Process: {} {} {}: Download PDF Files'.format(
+                call.semester_name, call.queue_name,
+                type_class.get_name(call.type)),
+            'call': call,
+            'request': request,
+            'dynamic': self._get_call_pdf_request_dynamic(request),
+            'message': 'Please wait while your PDF file download is prepared.',
+            'target_query': url_for(
+                '.review_call_pdf_request_query',
+                call_id=call.id, request_id=request.id),
+            'target_redirect': url_for(
+                '.review_call_pdf_request', call_id=call.id),
+        }
+
+    @with_call_review(permission=PermissionType.VIEW)
+    def view_review_call_pdf_request_query(
+            self, current_user, db, call, can, request_id):
+        request = self._get_call_pdf_request(db, call, request_id)
+
+        return self._get_call_pdf_request_dynamic(request)
+
+    def _get_call_pdf_request(self, db, call, request_id):
+        try:
+            return db.search_request_call_pdf(
+                call_id=call.id, request_id=request_id).get_single()
+        except NoSuchRecord:
+            raise HTTPNotFound('Request not found.')
+
+    def _get_call_pdf_request_dynamic(self, request):
+        return {
+            'state_name': RequestState.get_name(request.state),
+            'is_ready': RequestState.is_ready(request.state),
+            'is_pre_ready': RequestState.is_pre_ready(request.state),
+        }
+
+    @with_call_review(permission=PermissionType.VIEW)
+    def view_review_call_pdf_download(
+            self, current_user, db, call, can, request_id, merged=False):
+        """
+        Download a call PDF bundle.
+
+        The stored files contain all of the submitted proposals of the
+        call, so access to each proposal is checked at this point.
+        People who can not view all of the proposals are sent an archive
+        containing only those which they can view.
+        """
+
+        group_class = self.get_group_types()
+        role_class = self.get_reviewer_roles()
+        type_class = self.get_call_types()
+
+        request = self._get_call_pdf_request(db, call, request_id)
+
+        if RequestState.is_expired(request.state):
+            raise HTTPError('Request has expired.')
+
+        if not RequestState.is_ready(request.state):
+            raise HTTPError('Request not ready.')
+
+        # Determine which of the proposals the person can currently view.
+        # (Proposals may have changed state since the files were prepared.)
+        proposal_names = set()
+
+        for proposal in db.search_proposal(
+                call_id=call.id,
+                with_members=True, with_reviewers=True).values():
+            if auth.for_proposal(
+                    group_class, role_class, current_user, db, proposal,
+                    auth_cache=can.cache,
+                    allow_unaccepted_review=False).view:
+                proposal_names.add('{}.pdf'.format(
+                    self.make_proposal_code(db, proposal)))
+
+        filename = get_call_filename(request)
+
+        with closing(ZipFile(filename, 'r')) as zip_:
+            can_view_all = all(
+                (x in proposal_names) for x in zip_.namelist())
+
+        filename_base = 'proposals-{}-{}-{}'.format(
+            re.sub('[^-_a-z0-9]', '_', call.semester_name.lower()),
+            re.sub('[^-_a-z0-9]', '_', call.queue_name.lower()),
+            re.sub('[^-_a-z0-9]', '_', type_class.url_path(call.type)))
+
+        if merged:
+            if not can_view_all:
+                raise HTTPForbidden(
+                    'The merged PDF file is only available to those '
+                    'who can view all of the proposals.')
+
+            return (
+                _iter_file(get_call_filename(request, merged=True)),
+                FigureType.PDF,
+                '{}.pdf'.format(filename_base))
+
+        if can_view_all:
+            return (
+                _iter_file(filename),
+                'application/zip',
+                '{}.zip'.format(filename_base))
+
+        # Prepare an archive with only the permitted proposals.
+        f = TemporaryFile()
+
+        with closing(ZipFile(filename, 'r')) as zip_in, \
+                closing(ZipFile(f, 'w', ZIP_STORED)) as zip_out:
+            for name in zip_in.namelist():
+                if name in proposal_names:
+                    zip_out.writestr(name, zip_in.read(name))
+
+        f.seek(0)
+
+        return (
+            _iter_file(f),
+            'application/zip',
+            '{}.zip'.format(filename_base))
+
     @with_call_review(permission=PermissionType.VIEW)
     def view_review_call_tabulation(self, current_user, db, call, can):
         type_class = self.get_call_types()
@@ -182,34 +432,131 @@ class GenericReview(object):
     def view_review_call_tabulation_download(
             self, current_user, db, call, can, with_cois=True):
         type_class = self.get_call_types()
-        tabulation = self._get_proposal_tabulation(
+
+        # Apply the user's authorization to the proposals in blocks, as
+        # the rows are required, rather than for the whole call at once.
+        blocks = self._iter_proposal_tabulation_blocks(
             current_user, db, call, can, with_extra=True)
 
         writer = CSVWriter()
 
-        titles = self._get_proposal_tabulation_titles(tabulation)
+        titles = self._get_proposal_tabulation_titles(next(blocks))
         if with_cois:
             titles = chain(titles, ['Co-Investigator names'])
         writer.add_row(titles)
 
-        for (row, proposal) in zip(
-                self._get_proposal_tabulation_rows(tabulation),
-                tabulation['proposals']):
-            if with_cois:
-                row = chain(row, (
-                    '{} ({})'.format(x.person_name, x.affiliation_name)
-                    for x in proposal['members'].values()
-                    if not x.pi))
-            writer.add_row(row)
-
+        def iter_rows():
+            for tabulation in blocks:
+                for (row, proposal) in zip(
+                        self._get_proposal_tabulation_rows(tabulation),
+                        tabulation['proposals']):
+                    if with_cois:
+                        row = chain(row, (
+                            '{} ({})'.format(
+                                x.person_name, x.affiliation_name)
+                            for x in proposal['members'].values()
+                            if not x.pi))
+                    yield row
+
+        # Return a generator so that the CSV file is sent as the rows
+        # are formatted rather than being prepared in memory.
         return (
-            writer.get_csv(),
+            writer.iter_csv(iter_rows()),
             'text/csv',
             'proposals-{}-{}-{}.csv'.format(
                 re.sub('[^-_a-z0-9]', '_', call.semester_name.lower()),
                 re.sub('[^-_a-z0-9]', '_', call.queue_name.lower()),
                 re.sub('[^-_a-z0-9]', '_', type_class.url_path(call.type))))
 
+    def _get_call_snapshot(self, db, call, key, make_snapshot):
+        """
+        Get a snapshot of information about a call, using the cached
+        version if still valid.
+
+        The snapshot must not depend on the current user's permissions,
+        and since it may be shared between requests, it must not be
+        modified by the caller.
+
+        Snapshots are regenerated when the database object's review or
+        directory version changes, or after the `call_snapshot_expiry`
+        time given in the `review` section of the configuration file.
+        Changes made by other processes are only seen after expiry.
+        Whenever a snapshot is stored, expired or outdated entries
+        (and their locks) are discarded, so that the cache only holds
+        recently-used snapshots.
+
+        :param db: database control object
+        :param call: call record
+        :param key: snapshot type key
+        :param make_snapshot: function to generate the snapshot
+            (called without arguments)
+
+        :return: the snapshot
+        """
+
+        version = (db.get_review_version(), db.get_directory_version())
+        cache_key = (db._mem_id, call.id, key)
+
+        def get_valid_entry():
+            with self._call_snapshot_lock:
+                cache_entry = self._call_snapshot_cache.get(cache_key)
+
+            if ((cache_entry is None) or (cache_entry.version != version)
+                    or (cache_entry.expiry < time())):
+                return None
+
+            return cache_entry
+
+        cache_entry = get_valid_entry()
+        if cache_entry is not None:
+            return cache_entry.data
+
+        with self._call_snapshot_lock:
+            key_lock = self._call_snapshot_key_locks.setdefault(
+                cache_key, Lock())
+
+        # Only allow one thread to regenerate each snapshot at once.  Others
+        # wait and then check whether the new snapshot is suitable.
+        with key_lock:
+            cache_entry = get_valid_entry()
+            if cache_entry is not None:
+                return cache_entry.data
+
+            expiry = time() + float(get_config().get(
+                'review', 'call_snapshot_expiry'))
+
+            cache_entry = CallSnapshotEntry(
+                version=version, expiry=expiry, data=make_snapshot())
+
+            with self._call_snapshot_lock:
+                self._prune_call_snapshots(db, version)
+                self._call_snapshot_cache[cache_key] = cache_entry
+
+        return cache_entry.data
+
+    def _prune_call_snapshots(self, db, version):
+        """
+        Remove expired entries from the call snapshot cache, along with
+        those for the given database which are not of the given version,
+        and the locks for keys no longer in the cache.
+
+        Must be called with the `_call_snapshot_lock` held.
+        """
+
+        now = time()
+
+        for (key, entry) in list(self._call_snapshot_cache.items()):
+            if (entry.expiry < now) or (
+                    (key[0] == db._mem_id) and (entry.version != version)):
+                del self._call_snapshot_cache[key]
+
+        # Locks currently held (e.g. by the caller) are left in place
+        # so that concurrent requests for the same key still share them.
+        for (key, key_lock) in list(self._call_snapshot_key_locks.items()):
+            if ((key not in self._call_snapshot_cache)
+                    and not key_lock.locked()):
+                del self._call_snapshot_key_locks[key]
+
     def _get_proposal_tabulation(
             self, current_user, db, call, can, with_extra=False):
         """Prepare information for the detailed tabulation of proposals.
@@ -219,35 +566,169 @@ class GenericReview(object):
         `with_extra` option is enabled and additional information,
         beyond that which can be displayed on the online version,
         is retrieved.
+
+        The permission-independent part of the tabulation is obtained
+        from a cached snapshot (see :meth:`_prepare_proposal_tabulation`)
+        and then the current user's authorization is applied to
+        a copy of each proposal's entry.
+        """
+
+        snapshot = self._get_proposal_tabulation_snapshot(
+            db, call, with_extra)
+
+        tabulation = snapshot.copy()
+        tabulation['proposals'] = [
+            self._get_proposal_tabulation_entry(current_user, db, call, can, x)
+            for x in snapshot['proposals']]
+
+        return tabulation
+
+    def _iter_proposal_tabulation_blocks(
+            self, current_user, db, call, can, with_extra=False):
+        """
+        Generator yielding the detailed tabulation of proposals in blocks.
+
+        This is like :meth:`_get_proposal_tabulation` except that
+        the current user's authorization is applied to the proposals
+        in blocks (of the database's `query_block_size`) as they are
+        required.  Each block is given as a copy of the tabulation
+        in which `proposals` is the list of entries for that block.
+        The first yielded value is the tabulation without any proposals,
+        e.g. for use in preparing column headings.
+        """
+
+        snapshot = self._get_proposal_tabulation_snapshot(
+            db, call, with_extra)
+
+        tabulation = snapshot.copy()
+        tabulation['proposals'] = []
+        yield tabulation
+
+        for block in list_in_blocks(
+                snapshot['proposals'], db.query_block_size):
+            tabulation = snapshot.copy()
+            tabulation['proposals'] = [
+                self._get_proposal_tabulation_entry(
+                    current_user, db, call, can, x)
+                for x in block]
+            yield tabulation
+
+    def _get_proposal_tabulation_snapshot(self, db, call, with_extra):
+        """
+        Get the cached snapshot of the permission-independent part of the
+        proposal tabulation, prepared by
+        :meth:`_prepare_proposal_tabulation`.
+        """
+
+        return self._get_call_snapshot(
+            db, call, ('tabulation', with_extra),
+            lambda: self._prepare_proposal_tabulation(
+                db, call, with_extra=with_extra))
+
+    def _get_proposal_tabulation_entry(
+            self, current_user, db, call, can, snapshot_proposal):
+        """
+        Apply the current user's authorization to a copy of a proposal's
+        entry from the tabulation snapshot.
         """
 
-        affiliation_type_class = self.get_affiliation_types()
         group_class = self.get_group_types()
         role_class = self.get_reviewer_roles()
 
+        updated_proposal = snapshot_proposal.copy()
+        proposal = updated_proposal.pop('proposal_record')
+
+        can_view_review = auth.for_review(
+            group_class, role_class, current_user, db,
+            reviewer=None, proposal=proposal,
+            auth_cache=can.cache).view
+
+        members = proposal.members.map_values(lambda x: with_can_view(
+            x, auth.for_person_member(
+                current_user, db, self._facilities, x,
+                auth_cache=can.cache).view))
+
+        updated_proposal.update({
+            'can_view_review': can_view_review,
+            'member_pi': members.get_pi(default=None),
+            'members': members,
+            'can_edit_decision': auth.for_proposal_decision(
+                group_class, current_user, db, proposal, call=call,
+                auth_cache=can.cache).edit,
+        })
+
+        if can_view_review:
+            # Determine authorization for each review.  Hide ratings
+            # which cannot be viewed.
+            reviewers = ReviewerCollection()
+
+            for reviewer_id, reviewer in proposal.reviewers.items():
+                reviewer_can = auth.for_review(
+                    group_class, role_class, current_user, db,
+                    reviewer=reviewer, proposal=proposal,
+                    auth_cache=can.cache, allow_unaccepted=False)
+
+                reviewers[reviewer_id] = with_can_view_edit_rating(
+                    reviewer,
+                    auth.for_person_reviewer(
+                        current_user, db, self._facilities, reviewer,
+                        auth_cache=can.cache).view,
+                    reviewer_can.edit, reviewer_can.view_rating)
+
+            (overall_rating, std_dev) = self.calculate_overall_rating(
+                reviewers.map_values(
+                    filter_value=lambda x: x.can_view_rating),
+                with_std_dev=True)
+
+            updated_proposal.update({
+                'reviewers': reviewers,
+                'rating': overall_rating,
+                'rating_std_dev': std_dev,
+            })
+
+        else:
+            # Remove 'reviewers' from dictionary for safety, so that
+            # we don't have to rely on the template hiding reviews
+            # which the user can't see.
+            updated_proposal.update({
+                'reviewers': ReviewerCollection(),
+                'rating': None,
+                'rating_std_dev': None,
+            })
+
+        return updated_proposal
+
+    def _prepare_proposal_tabulation(self, db, call, with_extra=False):
+        """
+        Prepare the permission-independent part of the
+        proposal tabulation.
+
+        Facility classes should override this method to add their
+        own information to the tabulation.  Each proposal's entry
+        includes the original proposal record as `proposal_record`,
+        which :meth:`_get_proposal_tabulation` uses to determine
+        the current user's authorization.
+        """
+
+        affiliation_type_class = self.get_affiliation_types()
+
         proposals = db.search_proposal(
             call_id=call.id, state=ProposalState.submitted_states(),
             with_members=True, with_reviewers=True, with_review_info=True,
-            with_decision=True, with_categories=with_extra)
+            with_decision=True, with_categories=with_extra, summary=True)
 
         self.attach_review_extra(db, proposals)
 
         affiliations = db.search_affiliation(
             queue_id=call.queue_id, hidden=False, with_weight_call_id=call.id)
 
-        proposal_list = []
-        for proposal in proposals.values():
-            can_view_review = auth.for_review(
-                group_class, role_class, current_user, db,
-                reviewer=None, proposal=proposal,
-                auth_cache=can.cache).view
-
-            members = proposal.members.map_values(lambda x: with_can_view(
-                x, auth.for_person_member(
-                    current_user, db, self._facilities, x,
-                    auth_cache=can.cache).view))
+        affiliation_assignments = self.calculate_affiliation_assignments(
+            db, [x.members for x in proposals.values()], affiliations)
 
-            member_pi = members.get_pi(default=None)
+        proposal_list = []
+        for (proposal, affiliation_assignment) in zip(
+                proposals.values(), affiliation_assignments):
+            member_pi = proposal.members.get_pi(default=None)
 
             n_other = 0
             for member in proposal.members.values():
@@ -258,57 +739,12 @@ class GenericReview(object):
             # can easily add extra entries to the proposal records.
             updated_proposal = proposal._asdict()
             updated_proposal.update({
-                'can_view_review': can_view_review,
-                'member_pi': member_pi,
+                'proposal_record': proposal,
                 'members_other': n_other,
-                'members': members,
                 'code': self.make_proposal_code(db, proposal),
-                'affiliations': self.calculate_affiliation_assignment(
-                    db, proposal.members, affiliations),
-                'can_edit_decision': auth.for_proposal_decision(
-                    group_class, current_user, db, proposal, call=call,
-                    auth_cache=can.cache).edit,
+                'affiliations': affiliation_assignment,
             })
 
-            if can_view_review:
-                # Determine authorization for each review.  Hide ratings
-                # which cannot be viewed.
-                reviewers = ReviewerCollection()
-
-                for reviewer_id, reviewer in proposal.reviewers.items():
-                    reviewer_can = auth.for_review(
-                        group_class, role_class, current_user, db,
-                        reviewer=reviewer, proposal=proposal,
-                        auth_cache=can.cache, allow_unaccepted=False)
-
-                    reviewers[reviewer_id] = with_can_view_edit_rating(
-                        reviewer,
-                        auth.for_person_reviewer(
-                            current_user, db, self._facilities, reviewer,
-                            auth_cache=can.cache).view,
-                        reviewer_can.edit, reviewer_can.view_rating)
-
-                (overall_rating, std_dev) = self.calculate_overall_rating(
-                    reviewers.map_values(
-                        filter_value=lambda x: x.can_view_rating),
-                    with_std_dev=True)
-
-                updated_proposal.update({
-                    'reviewers': reviewers,
-                    'rating': overall_rating,
-                    'rating_std_dev': std_dev,
-                })
-
-            else:
-                # Remove 'reviewers' from dictionary for safety, so that
-                # we don't have to rely on the template hiding reviews
-                # which the user can't see.
-                updated_proposal.update({
-                    'reviewers': ReviewerCollection(),
-                    'rating': None,
-                    'rating_std_dev': None,
-                })
-
             proposal_list.append(updated_proposal)
 
         return {
@@ -397,28 +833,44 @@ class GenericReview(object):
 
         affiliation_names.append(('0', 'Unknown'))
 
-        proposal_list = []
+        proposals_with_targets = self._attach_proposal_targets(db, proposals)
+
+        # Determine the fractional time spent in each RA bin, so that this
+        # can be scaled by the proposal's allocation, which may change
+        # later.  (At this level of detail we can't know whether an altered
+        # allocation corresponds to excluding particular targets.)
+        # The targets of all proposals are combined so that their
+        # coordinates can be converted together.
+        targets = TargetFracTimeColumns([], [], [], [])
+        target_proposal = []
+        for (i, proposal) in enumerate(proposals_with_targets.values()):
+            proposal_targets = proposal.targets.to_frac_time_columns()
+            for (column, values) in zip(targets, proposal_targets):
+                column.extend(values)
+            target_proposal.extend(i for x in proposal_targets.frac_time)
+
         ra_bins = list(range(0, 24))
-        for proposal in self._attach_proposal_targets(db, proposals).values():
-            # Determine the fractional time spent in each RA bin, so that this
-            # can be scaled by the proposal's allocation, which may change
-            # later.  (At this level of detail we can't know whether an altered
-            # allocation corresponds to excluding particular targets.)
-            ra_fraction = defaultdict(float)
-            for target in proposal.targets.to_frac_time_list():
-                ra = int(round(target.coord.icrs.ra.hour))
-                if ra > 23:
-                    ra -= 24
-
-                ra_fraction[ra] += target.frac_time
+        ra_fraction = zeros((len(proposals_with_targets), len(ra_bins)))
+        if target_proposal:
+            target_ra = ra_hour_bin(coord_from_dec_deg_array(
+                targets.system, targets.x, targets.y))
+            add.at(ra_fraction, (target_proposal, target_ra),
+                   targets.frac_time)
+
+        affiliation_assignments = self.calculate_affiliation_assignments(
+            db, [x.members for x in proposals_with_targets.values()],
+            affiliations)
 
+        proposal_list = []
+        for (proposal, proposal_ra_fraction, affiliation_assignment) in zip(
+                proposals_with_targets.values(), ra_fraction,
+                affiliation_assignments):
             info = {
                 'id': '{}'.format(proposal.id),
                 'code': proposal.code,
-                'ra': [ra_fraction[x] for x in ra_bins],
+                'ra': proposal_ra_fraction.tolist(),
                 'category': {
-                    'affiliation': self.calculate_affiliation_assignment(
-                        db, proposal.members, affiliations),
+                    'affiliation': affiliation_assignment,
                 },
             }
 
@@ -428,9 +880,8 @@ class GenericReview(object):
             ra_inaccessible = None
 
         else:
-            semester = db.get_semester(self.id_, semester_id=call.semester_id)
-            ra_inaccessible = self._get_ra_inaccessible(
-                semester.date_start, semester.date_end)
+            semester = lookup.get_semester(db, self.id_, call.semester_id)
+            ra_inaccessible = self._get_semester_ra_inaccessible(db, semester)
 
         return {
             'proposals': proposal_list,
@@ -457,6 +908,40 @@ class GenericReview(object):
             'ra_inaccessible': ra_inaccessible,
         }
 
+    def _get_semester_ra_inaccessible(self, db, semester):
+        """
+        Get the inaccessible RA ranges for a semester.
+
+        The result of `_get_ra_inaccessible` is stored in the database,
+        keyed by semester and elevation limit, since it is expensive to
+        compute.  The stored value is removed if the semester dates
+        are edited.
+        """
+
+        el_min = self.get_observing_info().el_min
+        if el_min is None:
+            return None
+
+        try:
+            return db.get_semester_ra_inaccessible(semester.id, el_min)
+
+        except NoSuchRecord:
+            pass
+
+        ra_inaccessible = self._get_ra_inaccessible(
+            semester.date_start, semester.date_end)
+
+        if ra_inaccessible is not None:
+            try:
+                db.set_semester_ra_inaccessible(
+                    semester.id, el_min, ra_inaccessible)
+
+            except DatabaseIntegrityError:
+                # The value may have been stored by a concurrent request.
+                pass
+
+        return ra_inaccessible
+
     def _get_ra_inaccessible(self, date_start, date_end):
         """
         Estimate which RAs are inaccessible in the middle of the shift
@@ -532,11 +1017,12 @@ class GenericReview(object):
 
         # Do a combined query for CRs and all the standard proposals.
         targets = db.search_target(proposal_id=proposal_ids)
+        target_subsets = targets.subsets_by_proposal()
 
         return proposals.map_values(lambda x: ProposalWithTargets(
             *x, code=self.make_proposal_code(db, x),
-            targets=targets.subset_by_proposal(
-                previous_proposal_ids.get(x.id, x.id))))
+            targets=target_subsets.get(
+                previous_proposal_ids.get(x.id, x.id), TargetCollection())))
 
     @with_call_review(permission=PermissionType.VIEW)
     def view_review_call_allocation_query(self, current_user, db, call, can):
@@ -615,6 +1101,9 @@ class GenericReview(object):
         else:
             cttee_role = int(cttee_role)
 
+        # The column headings list every reviewer whose ratings the user
+        # can see, so the statistics must be complete before the first
+        # row is written.  Only the formatting of the file is streamed.
         stats = self._get_review_statistics(
             current_user, db, call, can, cttee_role=cttee_role)
 
@@ -625,17 +1114,18 @@ class GenericReview(object):
                 x['name'], 'Weight'
             ] for x in stats['persons'].values())))
 
-        for proposal in stats['proposals'].values():
-            if proposal.id not in stats['ratings']:
-                continue
-            writer.add_row(chain(
-                [proposal.code], *([
-                    stats['ratings'].get(proposal.id, {}).get(x),
-                    stats['weights'].get(proposal.id, {}).get(x),
-                ] for x in stats['persons'].keys())))
+        def iter_rows():
+            for proposal in stats['proposals'].values():
+                if proposal.id not in stats['ratings']:
+                    continue
+                yield chain(
+                    [proposal.code], *([
+                        stats['ratings'].get(proposal.id, {}).get(x),
+                        stats['weights'].get(proposal.id, {}).get(x),
+                    ] for x in stats['persons'].keys()))
 
         return (
-            writer.get_csv(),
+            writer.iter_csv(iter_rows()),
             'text/csv',
             'review-stats-{}-{}-{}.csv'.format(
                 re.sub('[^-_a-z0-9]', '_', call.semester_name.lower()),
@@ -651,13 +1141,9 @@ class GenericReview(object):
         if cttee_role is not None:
             cttee_roles = role_class.get_cttee_roles()
 
-        proposals = db.search_proposal(
-            call_id=call.id, state=ProposalState.submitted_states(),
-            with_members=True, with_reviewers=True, with_review_info=True
-        ).map_values(lambda x: ProposalWithCode(
-            *x, code=self.make_proposal_code(db, x)))
-
-        self.attach_review_extra(db, proposals)
+        proposals = self._get_call_snapshot(
+            db, call, 'review_statistics',
+            lambda: self._prepare_review_statistics(db, call))
 
         # Create dictionary of proposals by peer reviewer person IDs.
         peer_reviewer_proposals = defaultdict(list)
@@ -731,6 +1217,22 @@ class GenericReview(object):
             },
         }
 
+    def _prepare_review_statistics(self, db, call):
+        """
+        Prepare the permission-independent part of the review statistics:
+        the collection of proposals, with codes and review information.
+        """
+
+        proposals = db.search_proposal(
+            call_id=call.id, state=ProposalState.submitted_states(),
+            with_members=True, with_reviewers=True, with_review_info=True
+        ).map_values(lambda x: ProposalWithCode(
+            *x, code=self.make_proposal_code(db, x)))
+
+        self.attach_review_extra(db, proposals)
+
+        return proposals
+
     @with_call_review(permission=PermissionType.VIEW)
     def view_review_call_clash(self, current_user, db, call, can, args, form):
         type_class = self.get_call_types()
@@ -916,8 +1418,7 @@ class GenericReview(object):
             if other_call_id == call.id:
                 raise ErrorPage('Selected other call is the same as this.')
             try:
-                other_call = db.get_call(
-                    facility_id=self.id_, call_id=other_call_id)
+                other_call = lookup.get_call(db, self.id_, other_call_id)
             except NoSuchRecord:
                 raise ErrorPage('Other call not found')
             assert other_call.id == other_call_id
@@ -1067,8 +1568,7 @@ class GenericReview(object):
             if other_call_id == call.id:
                 raise ErrorPage('Selected other call is the same as this.')
             try:
-                other_call = db.get_call(
-                    facility_id=self.id_, call_id=other_call_id)
+                other_call = lookup.get_call(db, self.id_, other_call_id)
             except NoSuchRecord:
                 raise ErrorPage('Other call not found')
             assert other_call.id == other_call_id
@@ -1221,12 +1721,24 @@ class GenericReview(object):
         state_editable_roles = {}
         type_excluded_roles = {}
 
-        for proposal in db.search_proposal(
-                call_id=call.id, state=ProposalState.submitted_states(),
-                type_=proposal_type,
-                with_members=True, with_reviewers=True,
-                with_review_info=True, with_reviewer_note=True,
-                with_reviewer_role=role, with_review_state=state).values():
+        all_proposals = db.search_proposal(
+            call_id=call.id, state=ProposalState.submitted_states(),
+            type_=proposal_type,
+            with_members=True, with_reviewers=True,
+            with_review_info=True, with_reviewer_note=True,
+            with_reviewer_role=role, with_review_state=state, summary=True)
+
+        member_pi_can = self._get_member_pi_authorization(
+            current_user, db, all_proposals, can.cache)
+
+        reviewer_can = self._get_reviewer_authorization(
+            current_user, db, all_proposals, can.cache)
+
+        review_can = auth.for_review_many(
+            group_class, role_class, current_user, db,
+            None, all_proposals, auth_cache=can.cache)
+
+        for proposal in all_proposals.values():
             roles = state_editable_roles.get(proposal.state)
             if roles is None:
                 roles = role_class.get_editable_roles(proposal.state)
@@ -1239,9 +1751,8 @@ class GenericReview(object):
 
             member_pi = proposal.members.get_pi(default=None)
             if member_pi is not None:
-                member_pi = with_can_view(member_pi, auth.for_person_member(
-                    current_user, db, self._facilities, member_pi,
-                    auth_cache=can.cache).view)
+                member_pi = with_can_view(
+                    member_pi, member_pi_can[proposal.id].view)
 
             proposals.append(ProposalWithInviteRoles(
                 *proposal._replace(
@@ -1249,9 +1760,7 @@ class GenericReview(object):
                     reviewers=proposal.reviewers.map_values(
                         lambda x: with_can_view_edit(
                             x,
-                            can_view=auth.for_person_reviewer(
-                                current_user, db, self._facilities, x,
-                                auth_cache=can.cache).view,
+                            can_view=reviewer_can[x.id].view,
                             can_edit=(x.role in roles)))),
                 invite_roles=[
                     x for x in invite_roles
@@ -1260,9 +1769,7 @@ class GenericReview(object):
                     group_class, type_class, role_class, current_user, db,
                     proposal, auth_cache=can.cache),
                 code=self.make_proposal_code(db, proposal),
-                can_view_review=auth.for_review(
-                    group_class, role_class, current_user, db, None, proposal,
-                    auth_cache=can.cache).view,
+                can_view_review=review_can[proposal.id].view,
                 can_edit_decision=None))
 
             for reviewer in proposal.reviewers.values():
@@ -1334,9 +1841,7 @@ class GenericReview(object):
             member_pi = proposal.members.get_pi(default=None)
             if member_pi is not None:
                 proposal = proposal._replace(member=with_can_view(
-                    member_pi, auth.for_person_member(
-                        current_user, db, self._facilities, member_pi,
-                        auth_cache=can.cache).view))
+                    member_pi, member_pi_can[proposal.id].view))
 
             return ProposalWithReviewerPersons(
                 *proposal, code=self.make_proposal_code(db, proposal),
@@ -1361,8 +1866,12 @@ class GenericReview(object):
             state=role_class.get_editable_states(primary_role),
             with_members=True, with_reviewers=True,
             with_review_info=True, with_reviewer_role=all_roles,
-            with_categories=(group_type == group_class.PEER),
-        ).map_values(augment_proposal)
+            with_categories=(group_type == group_class.PEER), summary=True)
+
+        member_pi_can = self._get_member_pi_authorization(
+            current_user, db, all_proposals, can.cache)
+
+        all_proposals = all_proposals.map_values(augment_proposal)
 
         # Determine group membership.
         if group_type == group_class.PEER:
@@ -1553,7 +2062,7 @@ class GenericReview(object):
         role_class = self.get_reviewer_roles()
 
         try:
-            call = db.get_call(facility_id=self.id_, call_id=proposal.call_id)
+            call = lookup.get_call(db, self.id_, proposal.call_id)
         except NoSuchRecord:
             raise HTTPError('The corresponding call was not found')
 
@@ -1642,10 +2151,15 @@ class GenericReview(object):
         # both to display the confirmation page and to send the notifications.)
         reviewers = OrderedDict()
 
-        for proposal in db.search_proposal(
-                call_id=call.id, state=role_class.get_editable_states(role),
-                with_reviewers=True, with_reviewer_role=role,
-                with_reviewer_notified=False).values():
+        proposals = db.search_proposal(
+            call_id=call.id, state=role_class.get_editable_states(role),
+            with_reviewers=True, with_reviewer_role=role,
+            with_reviewer_notified=False, summary=True)
+
+        reviewer_can = self._get_reviewer_authorization(
+            current_user, db, proposals, can.cache)
+
+        for proposal in proposals.values():
             proposal = ProposalWithCode(
                 *proposal, code=self.make_proposal_code(db, proposal))
 
@@ -1656,9 +2170,7 @@ class GenericReview(object):
 
                 reviewers[person_id].append(proposal._replace(
                     reviewers=None, reviewer=with_can_view(
-                        reviewer, auth.for_person_reviewer(
-                            current_user, db, self._facilities, reviewer,
-                            auth_cache=can.cache).view)))
+                        reviewer, reviewer_can[reviewer.id].view)))
 
         # Get the deadline for this review role.
         deadline = db.search_review_deadline(
@@ -1667,7 +2179,7 @@ class GenericReview(object):
         if form is not None:
             if 'submit_confirm' in form:
                 try:
-                    n_notifications = 0
+                    notifications = []
 
                     for (person_id, proposals_all) in reviewers.items():
                         # Include only reviews present in the form parameters.
@@ -1677,16 +2189,15 @@ class GenericReview(object):
                         if not proposals:
                             continue
 
-                        self._message_review_notification(
-                            current_user, db,
-                            role, person_id, proposals, deadline)
+                        notifications.append((person_id, proposals))
 
-                        n_notifications += 1
+                    if notifications:
+                        self._message_review_notification(
+                            current_user, db, role, notifications, deadline)
 
-                    if n_notifications:
                         flash(
                             'Notifications have been sent to {} reviewer(s).',
-                            n_notifications)
+                            len(notifications))
 
                 except UserError as e:
                     raise ErrorPage(e.message)
@@ -1706,81 +2217,93 @@ class GenericReview(object):
         }
 
     def _message_review_notification(
-            self, current_user, db, role, person_id, proposals, deadline):
+            self, current_user, db, role, notifications, deadline):
         """
-        Send a message to a an assigned reviewer informing them of their
+        Send messages to assigned reviewers informing them of their
         review assignments and update the notified flag for the
         corresponding entries in the reviewers table.
 
-        This method takes a list of proposals, each of which should have a
-        `reviewer` attribute corresponding to the review for which the
-        notification is being sent.
+        This method takes a list of `(person_id, proposals)` tuples,
+        giving a list of proposals for each reviewer to be notified.
+        Each proposal should have a `reviewer` attribute corresponding
+        to the review for which the notification is being sent.
+        The messages are all added in a single database transaction.
         """
 
-        assert proposals
-        for proposal in proposals:
-            assert proposal.reviewer.role == role
-            assert proposal.reviewer.person_id == person_id
-            assert not proposal.reviewer.notified
-
         type_class = self.get_call_types()
         role_class = self.get_reviewer_roles()
 
         role_name = role_class.get_name(role)
+        render_notification = prepare_email_template(
+            'review_notification.txt', facility=self)
+
+        messages = []
+        reviewer_updates = []
+
+        for (person_id, proposals) in notifications:
+            assert proposals
+            for proposal in proposals:
+                assert proposal.reviewer.role == role
+                assert proposal.reviewer.person_id == person_id
+                assert not proposal.reviewer.notified
+
+            # Use the reviewer information from the first proposal to get
+            # the (presumably) common information for the notification email.
+            reviewer = proposals[0].reviewer
+
+            email_ctx = {
+                'recipient_name': reviewer.person_name,
+                'inviter_name': current_user.person.name,
+                'queue_name': proposals[0].queue_name,
+                'semester_name': proposals[0].semester_name,
+                'call_type': type_class.get_name(proposals[0].call_type),
+                'role_name': role_name,
+                'role_is_peer': (role == role_class.PEER),
+                'role_is_accepted': role_class.is_accepted_review(role),
+                'target_guideline': self.make_review_guidelines_url(
+                    role=role),
+                'review_deadline': deadline,
+                'proposals': [
+                    ProposalWithViewReviewLinks(
+                        *x, target_proposal=url_for(
+                            '.proposal_view',
+                            proposal_id=x.id, _external=True),
+                        target_review=url_for(
+                            '.review_edit',
+                            reviewer_id=x.reviewer.id, _external=True))
+                    for x in proposals],
+            }
 
-        # Use the reviewer information from the first proposal to get
-        # the (presumably) common information for the notification email.
-        reviewer = proposals[0].reviewer
-
-        email_ctx = {
-            'recipient_name': reviewer.person_name,
-            'inviter_name': current_user.person.name,
-            'queue_name': proposals[0].queue_name,
-            'semester_name': proposals[0].semester_name,
-            'call_type': type_class.get_name(proposals[0].call_type),
-            'role_name': role_name,
-            'role_is_peer': (role == role_class.PEER),
-            'role_is_accepted': role_class.is_accepted_review(role),
-            'target_guideline': self.make_review_guidelines_url(role=role),
-            'review_deadline': deadline,
-            'proposals': [
-                ProposalWithViewReviewLinks(
-                    *x, target_proposal=url_for(
-                        '.proposal_view',
-                        proposal_id=x.id, _external=True),
-                    target_review=url_for(
-                        '.review_edit',
-                        reviewer_id=x.reviewer.id, _external=True))
-                for x in proposals],
-        }
+            if not reviewer.person_registered:
+                (token, expiry) = db.issue_invitation(person_id)
 
-        if not reviewer.person_registered:
-            (token, expiry) = db.issue_invitation(person_id)
+                email_ctx.update({
+                    'token': token,
+                    'expiry': expiry,
+                    'target_url': url_for(
+                        'people.invitation_token_enter',
+                        token=token, _external=True),
+                    'target_plain': url_for(
+                        'people.invitation_token_enter',
+                        _external=True),
+                })
 
-            email_ctx.update({
-                'token': token,
-                'expiry': expiry,
-                'target_url': url_for(
-                    'people.invitation_token_enter',
-                    token=token, _external=True),
-                'target_plain': url_for(
-                    'people.invitation_token_enter',
-                    _external=True),
+            messages.append({
+                'subject': 'Assignment of {} {}'.format(
+                    lower_except_abbr(role_name),
+                    ('reviews' if (len(proposals) > 1) else 'review')),
+                'body': render_notification(email_ctx),
+                'person_ids': [person_id],
             })
 
-        email_subject = 'Assignment of {} {}'.format(
-            lower_except_abbr(role_name),
-            ('reviews' if (len(proposals) > 1) else 'review'))
-
-        db.add_message(
-            email_subject,
-            render_email_template(
-                'review_notification.txt',
-                email_ctx, facility=self),
-            [person_id])
+            reviewer_updates.extend(
+                {'reviewer_id': x.reviewer.id, 'notified': True}
+                for x in proposals)
 
-        for proposal in proposals:
-            db.update_reviewer(role_class, proposal.reviewer.id, notified=True)
+        # Add the messages and update the reviewer records together, so that
+        # messages are not queued without the reviewers being marked.
+        db.multiple_reviewer_update(
+            role_class, update=reviewer_updates, messages=messages)
 
     @with_call_review(permission=PermissionType.EDIT)
     def view_reviewer_thank(self, current_user, db, call, can, role, form):
@@ -1818,7 +2341,7 @@ class GenericReview(object):
         if form is not None:
             if 'submit_confirm' in form:
                 try:
-                    n_notifications = 0
+                    notifications = []
 
                     for (person_id, proposals_all) in reviewers.items():
                         # Include only reviews present in the form parameters.
@@ -1828,15 +2351,15 @@ class GenericReview(object):
                         if not proposals:
                             continue
 
-                        self._message_review_thank(
-                            current_user, db, role, person_id, proposals)
+                        notifications.append((person_id, proposals))
 
-                        n_notifications += 1
+                    if notifications:
+                        self._message_review_thank(
+                            current_user, db, role, notifications)
 
-                    if n_notifications:
                         flash(
                             'Messages have been sent to {} reviewer(s).',
-                            n_notifications)
+                            len(notifications))
 
                 except UserError as e:
                     raise ErrorPage(e.message)
@@ -1854,52 +2377,62 @@ class GenericReview(object):
             'reviewers': reviewers,
         }
 
-    def _message_review_thank(
-            self, current_user, db, role, person_id, proposals):
+    def _message_review_thank(self, current_user, db, role, notifications):
         """
-        Send a message to a reviewer thanking
+        Send messages to reviewers thanking
         them for their contribution.
 
-        This method takes a list of proposals, each of which should have a
-        `reviewer` attribute corresponding to the review for which the
-        message is being sent.
+        This method takes a list of `(person_id, proposals)` tuples,
+        giving a list of proposals for each reviewer to be thanked.
+        Each proposal should have a `reviewer` attribute corresponding
+        to the review for which the message is being sent.
+        The messages are all added in a single database transaction.
         """
 
-        assert proposals
-        for proposal in proposals:
-            assert proposal.reviewer.role == role
-            assert proposal.reviewer.person_id == person_id
-            assert not proposal.reviewer.thanked
-
         type_class = self.get_call_types()
         role_class = self.get_reviewer_roles()
 
         role_name = role_class.get_name(role)
+        render_thank_you = prepare_email_template(
+            'review_thank_you.txt', facility=self)
+
+        messages = []
+        reviewer_updates = []
+
+        for (person_id, proposals) in notifications:
+            assert proposals
+            for proposal in proposals:
+                assert proposal.reviewer.role == role
+                assert proposal.reviewer.person_id == person_id
+                assert not proposal.reviewer.thanked
+
+            reviewer = proposals[0].reviewer
+
+            email_ctx = {
+                'recipient_name': reviewer.person_name,
+                'sender_name': current_user.person.name,
+                'queue_name': proposals[0].queue_name,
+                'semester_name': proposals[0].semester_name,
+                'call_type': type_class.get_name(proposals[0].call_type),
+                'role_name': role_name,
+                'proposals': proposals,
+            }
 
-        reviewer = proposals[0].reviewer
-
-        email_ctx = {
-            'recipient_name': reviewer.person_name,
-            'sender_name': current_user.person.name,
-            'queue_name': proposals[0].queue_name,
-            'semester_name': proposals[0].semester_name,
-            'call_type': type_class.get_name(proposals[0].call_type),
-            'role_name': role_name,
-            'proposals': proposals,
-        }
-
-        email_subject = 'Thank you for your {}'.format(
-            ('reviews' if (len(proposals) > 1) else 'review'))
+            messages.append({
+                'subject': 'Thank you for your {}'.format(
+                    ('reviews' if (len(proposals) > 1) else 'review')),
+                'body': render_thank_you(email_ctx),
+                'person_ids': [person_id],
+            })
 
-        db.add_message(
-            email_subject,
-            render_email_template(
-                'review_thank_you.txt',
-                email_ctx, facility=self),
-            [person_id])
+            reviewer_updates.extend(
+                {'reviewer_id': x.reviewer.id, 'thanked': True}
+                for x in proposals)
 
-        for proposal in proposals:
-            db.update_reviewer(role_class, proposal.reviewer.id, thanked=True)
+        # Add the messages and update the reviewer records together, so that
+        # messages are not queued without the reviewers being marked.
+        db.multiple_reviewer_update(
+            role_class, update=reviewer_updates, messages=messages)
 
     @with_proposal(permission=PermissionType.NONE, with_categories=True)
     def view_reviewer_add(self, current_user, db, proposal, role, form):
@@ -1929,7 +2462,7 @@ class GenericReview(object):
                 'Reviewer role is not expected for this proposal type.')
 
         try:
-            call = db.get_call(facility_id=self.id_, call_id=proposal.call_id)
+            call = lookup.get_call(db, self.id_, proposal.call_id)
         except NoSuchRecord:
             raise HTTPError('The corresponding call was not found')
 
@@ -22,6 +22,7 @@ from sqlalchemy.sql.functions import count
 
 from ...db.compat import row_as_mapping, select
 from ...db.meta import call, proposal, reviewer
+from ...db.util import review_write
 from ...error import ConsistencyError, FormattedError, UserError
 from ...type.collection import ResultCollection
 from ...type.enum import FormatType, ReviewState
@@ -324,6 +325,7 @@ class JCMTPart(object):
 
                 conn.execute(table.insert().values(values))
 
+    @review_write
     def set_jcmt_review(
             self, role_class, reviewer_id, review_state, review):
         state_done = (review_state == ReviewState.DONE)
@@ -422,6 +424,7 @@ class JCMTPart(object):
 
                 result = conn.execute(jcmt_review.insert().values(values))
 
+    @review_write
     def sync_jcmt_call_available(
             self, call_id, records,
             _test_skip_check=False):
@@ -441,6 +444,7 @@ class JCMTPart(object):
                 conn, jcmt_available, jcmt_available.c.call_id, call_id,
                 records, unique_columns=(jcmt_available.c.weather,))
 
+    @review_write
     def sync_jcmt_proposal_allocation(
             self, proposal_id, records, _test_skip_check=False):
         """
@@ -451,6 +455,7 @@ class JCMTPart(object):
         return self._sync_jcmt_proposal_alloc_req(
             jcmt_allocation, proposal_id, records, _test_skip_check)
 
+    @review_write
     def sync_jcmt_proposal_request(
             self, proposal_id, records, _test_skip_check=False):
         """
@@ -31,6 +31,11 @@ from ...error import UserError
 from .meta import jcmt_available, jcmt_call_options, jcmt_options, \
     jcmt_request, jcmt_review
 
+JCMTAffiliationWeights = namedtuple(
+    'JCMTAffiliationWeights',
+    ('id', 'member_column', 'pi_column', 'weight',
+     'fraction', 'is_fraction'))
+
 JCMTAvailable = namedtuple(
     'JCMTAvailable',
     [x.name for x in jcmt_available.columns])
@@ -23,6 +23,8 @@ from datetime import time, timedelta
 from itertools import chain
 import re
 
+from numpy import add, array, full, newaxis, nonzero, where, zeros
+
 from ...astro.coord import CoordSystem, format_coord
 from ...compat import url_encode
 from ...error import NoSuchRecord, NoSuchValue, ParseError, UserError
@@ -40,7 +42,7 @@ from ..eao.view import EAOFacility
 from .calculator_heterodyne import HeterodyneCalculator
 from .calculator_scuba2 import SCUBA2Calculator
 from .type import \
-    JCMTAffiliationType, \
+    JCMTAffiliationType, JCMTAffiliationWeights, \
     JCMTAvailable, JCMTAvailableCollection, JCMTAncillary, \
     JCMTCallOptions, JCMTCallType, JCMTGroupType, JCMTInstrument, \
     JCMTOptionValue, JCMTOptions, \
@@ -367,134 +369,174 @@ class JCMT(EAOFacility):
         of a proposal.
 
         This acts like the Generic method which it overrides but applies
-        the JCMT affiliation assignment rules.
+        the JCMT affiliation assignment rules.  It is implemented via
+        `calculate_affiliation_assignments`.
         """
 
-        affiliation_type_class = self.get_affiliation_types()
+        return self.calculate_affiliation_assignments(
+            db, [members], affiliations)[0]
 
-        affiliation_count = defaultdict(float)
-        affiliation_total = 0.0
+    def calculate_affiliation_assignments(
+            self, db, member_collections, affiliations):
+        """
+        Calculate the fractional affiliation assignment for the members
+        of a number of proposals, applying the JCMT affiliation
+        assignment rules.
 
-        # Determine total and maximum affiliation weight.
-        total_weight = 0.0
-        max_weight = 0.0
-        affiliation_weight = {}
-        for affiliation in affiliations.values():
-            if ((affiliation.type == affiliation_type_class.EXCLUDED) or
-                    (affiliation.type == affiliation_type_class.SHARED) or
-                    (affiliation.weight is None)):
-                continue
+        The affiliation weight tables are prepared once and then the
+        weighted member counts for all of the proposals are accumulated
+        together, in an array with a column for each affiliation.
+        """
 
-            total_weight += affiliation.weight
+        weights = self._get_affiliation_weights(affiliations)
 
-            if affiliation.weight > max_weight:
-                max_weight = affiliation.weight
+        n_proposal = len(member_collections)
+        shared = len(weights.id) - 1
 
-            affiliation_weight[affiliation.id] = affiliation.weight
+        # Find the PI (if present) of each proposal, and the columns in
+        # which the other members are to be counted.  Members with excluded
+        # or shared affiliations count as the PI's affiliation, with
+        # those of proposals without a PI being counted as unknown.
+        has_pi = zeros(n_proposal, dtype=bool)
+        pi_column = zeros(n_proposal, dtype=int)
+        member_proposal = []
+        member_column = []
+        get_member_column = weights.member_column.get
 
-        # Determine affiliation fractions, in case there are any proposal
-        # members with shared affiliation.
-        if not total_weight:
-            total_weight = 1.0
-        affiliation_fraction = {
-            k: v / total_weight
-            for (k, v) in affiliation_weight.items()}
+        for (i, members) in enumerate(member_collections):
+            pi = members.get_pi(default=None)
+            pi_id = None
 
-        # Find the PI (if present) and their affiliation.
-        try:
-            pi = members.get_pi()
-            pi_affiliation = pi.affiliation_id
-
-            # Ensure the PI has a "valid" affiliation as we will use it for
-            # excluded-affiliation members.
-            if ((pi_affiliation is None) or
-                    (pi_affiliation not in affiliations) or
-                    (affiliations[pi_affiliation].type ==
-                        affiliation_type_class.EXCLUDED)):
-                pi_affiliation = 0
-
-            elif affiliations[pi_affiliation].type == affiliation_type_class.SHARED:
-                # Use special value "None" for shared affiliation (not to be
-                # confused with "0" meaning unknown).
-                pi_affiliation = None
+            if pi is not None:
+                pi_id = pi.id
+                has_pi[i] = True
+                pi_column[i] = weights.pi_column.get(pi.affiliation_id, 0)
 
-        except NoSuchValue:
-            # NoSuchValue is raised if MemberCollection.get_pi fails to find a
-            # PI: record that there is no PI and their affiliation is therefore
-            # unknown (represented by "0").
-            pi = None
-            pi_affiliation = 0
+            # Skip the PI as we will process their affiliation separately.
+            columns = [
+                get_member_column(x.affiliation_id, 0)
+                for x in members.values() if x.id != pi_id]
+
+            member_proposal.extend([i] * len(columns))
+            member_column.extend(columns)
+
+        member_proposal = array(member_proposal, dtype=int)
+        member_column = array(member_column, dtype=int)
+
+        inherit = (member_column < 0)
+        member_column[inherit] = pi_column[member_proposal[inherit]]
 
         # Add up weighted affiliation counts for non-PI members.
-        for member in members.values():
-            # Skip the PI as we will process their affiliation separately.
-            if (pi is not None) and (member.id == pi.id):
+        count = zeros((n_proposal, len(weights.id)))
+        present = zeros((n_proposal, len(weights.id)), dtype=bool)
+
+        add.at(
+            count, (member_proposal, member_column),
+            weights.weight[member_column])
+        present[member_proposal, member_column] = True
+
+        total = count.sum(axis=1)
+
+        # 50% of the assigment is supposed to be apportioned to the PI
+        # affiliation, so add the PI with the same weight as all the other
+        # members combined.  If we didn't find any non-PI members (or they
+        # had zero weight), set the PI weight to 1.0.
+        pi_proposal = nonzero(has_pi)[0]
+        pi_weight = where(total[pi_proposal] > 0.0, total[pi_proposal], 1.0)
+
+        add.at(count, (pi_proposal, pi_column[pi_proposal]), pi_weight)
+        present[pi_proposal, pi_column[pi_proposal]] = True
+        total[pi_proposal] += pi_weight
+
+        # Assign counts in the shared column (from members who inherited
+        # the PI's shared affiliation, or the PI themself) by
+        # affiliation fractions.
+        count += count[:, shared, newaxis] * weights.fraction
+        present |= present[:, shared, newaxis] & weights.is_fraction
+
+        ans = []
+
+        for i in range(n_proposal):
+            if not total[i]:
+                # There was no PI and no members with non-zero weight:
+                # return 100% unknown.
+                ans.append({0: 1.0})
                 continue
 
-            affiliation = member.affiliation_id
-            if (affiliation is None) or (affiliation not in affiliations):
-                affiliation = 0
-            elif affiliations[affiliation].type == affiliation_type_class.EXCLUDED:
-                # Members with excluded affiliations count as the PI's
-                # affiliation.
-                affiliation = pi_affiliation
-            elif affiliations[affiliation].type == affiliation_type_class.SHARED:
-                # Count type "SHARED" as if it were "EXCLUDED" for non-PIs.
-                affiliation = pi_affiliation
-
-            if affiliation is None:
-                # Affiliation is shared -- this will not happen directly but
-                # the member may have "inherited" the PIs's shared affiliation.
-                for (aff_id, aff_frac) in affiliation_fraction.items():
-                    affiliation_count[aff_id] += aff_frac * max_weight
-
-                affiliation_total += max_weight
+            ans.append({
+                weights.id[j]: (count[i, j] / total[i])
+                for j in nonzero(present[i, :shared])[0]})
 
-            else:
-                # Non-shared affiliation -- determine weighting factor to use.
-                if affiliation == 0:
-                    # Weight "unknown" as the maximum of all the other
-                    # weights. In practise there should never be any members
-                    # in this state.
-                    weight = max_weight
-                else:
-                    weight = affiliations[affiliation].weight
-                    if weight is None:
-                        weight = 0.0
+        return ans
 
-                affiliation_count[affiliation] += weight
-                affiliation_total += weight
+    def _get_affiliation_weights(self, affiliations):
+        """
+        Prepare affiliation weight tables for
+        `calculate_affiliation_assignments`.
 
-        if not affiliation_total:
-            # We didn't find any non-PI members (or they had zero weight),
-            # so set the PI weight to 1.0.  Otherwise prepare to add the PI
-            # affiliation at the same total weight.  But if there is also
-            # no PI, return 100% unknown.
-            if pi is None:
-                return {0: 1.0}
+        Column zero represents unknown affiliation and the last column
+        represents shared affiliation.  The other columns are for
+        affiliations which are neither excluded nor shared.
 
-            pi_weight = 1.0
+        :return: a `JCMTAffiliationWeights` tuple
+        """
+
+        affiliation_type_class = self.get_affiliation_types()
+
+        ids = [0]
+        member_column = {}
+        pi_column = {}
+        affiliation_weight = {}
+
+        for affiliation in affiliations.values():
+            if affiliation.type == affiliation_type_class.EXCLUDED:
+                member_column[affiliation.id] = -1
+
+            elif affiliation.type == affiliation_type_class.SHARED:
+                member_column[affiliation.id] = -1
+                pi_column[affiliation.id] = None
 
-        else:
-            pi_weight = affiliation_total
-
-        if pi is not None:
-            # 50% of the assigment is supposed to be apportioned to the PI
-            # affiliation, so add the PI with the same weight as all the other
-            # members combined.
-            if pi_affiliation is None:
-                # Affiliation is shared -- assign by affiliation fractions
-                # multiplied by the PI's weighting factor.
-                for (aff_id, aff_frac) in affiliation_fraction.items():
-                    affiliation_count[aff_id] += pi_weight * aff_frac
             else:
-                affiliation_count[pi_affiliation] += pi_weight
+                member_column[affiliation.id] = pi_column[affiliation.id] = \
+                    len(ids)
+                ids.append(affiliation.id)
 
-            affiliation_total += pi_weight
+                if affiliation.weight is not None:
+                    affiliation_weight[affiliation.id] = affiliation.weight
 
-        return {
-            k: (v / affiliation_total)
-            for (k, v) in affiliation_count.items()}
+        ids.append(None)
+        shared = len(ids) - 1
+
+        for (id_, column) in pi_column.items():
+            if column is None:
+                pi_column[id_] = shared
+
+        # Determine total and maximum affiliation weight.
+        total_weight = sum(affiliation_weight.values())
+        max_weight = max(chain([0.0], affiliation_weight.values()))
+
+        # Weight "unknown" (and shared) as the maximum of all the other
+        # weights.  In practise there should never be any members
+        # in the unknown state.
+        weight = full(len(ids), float(max_weight))
+        fraction = zeros(len(ids))
+        is_fraction = zeros(len(ids), dtype=bool)
+
+        # Determine affiliation fractions, in case there are any proposal
+        # members with shared affiliation.
+        if not total_weight:
+            total_weight = 1.0
+
+        for (column, id_) in enumerate(ids[1:shared], 1):
+            weight[column] = affiliation_weight.get(id_, 0.0)
+
+            if id_ in affiliation_weight:
+                fraction[column] = affiliation_weight[id_] / total_weight
+                is_fraction[column] = True
+
+        return JCMTAffiliationWeights(
+            id=ids, member_column=member_column, pi_column=pi_column,
+            weight=weight, fraction=fraction, is_fraction=is_fraction)
 
     def _copy_proposal(
             self, current_user, db, old_proposal, proposal, *args, **kwargs):
@@ -808,12 +850,11 @@ class JCMT(EAOFacility):
 
         return report
 
-    def _get_proposal_tabulation(
-            self, current_user, db, call, can, with_extra=False):
+    def _prepare_proposal_tabulation(self, db, call, with_extra=False):
         affiliation_type_class = self.get_affiliation_types()
 
-        tabulation = super(JCMT, self)._get_proposal_tabulation(
-            current_user, db, call, can, with_extra)
+        tabulation = super(JCMT, self)._prepare_proposal_tabulation(
+            db, call, with_extra)
 
         empty_total = lambda: JCMTRequestTotal(
             total=0.0, weather=defaultdict(float),
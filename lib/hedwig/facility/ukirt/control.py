@@ -22,6 +22,7 @@ from sqlalchemy.sql.functions import count
 
 from ...db.compat import row_as_mapping, select
 from ...db.meta import call, proposal, reviewer
+from ...db.util import review_write
 from ...error import ConsistencyError, FormattedError, UserError
 from ...type.collection import ResultCollection
 from ...type.enum import FormatType
@@ -91,6 +92,7 @@ class UKIRTPart(object):
 
         return ans
 
+    @review_write
     def sync_ukirt_proposal_allocation(
             self, proposal_id, records,
             _test_skip_check=False):
@@ -112,6 +114,7 @@ class UKIRTPart(object):
                     ukirt_allocation.c.instrument,
                     ukirt_allocation.c.brightness))
 
+    @review_write
     def sync_ukirt_proposal_request(
             self, proposal_id, records,
             _test_skip_check=False):
@@ -173,10 +173,9 @@ class UKIRT(EAOFacility):
 
         return ctx
 
-    def _get_proposal_tabulation(
-            self, current_user, db, call, can, with_extra=False):
-        tabulation = super(UKIRT, self)._get_proposal_tabulation(
-            current_user, db, call, can, with_extra)
+    def _prepare_proposal_tabulation(self, db, call, with_extra=False):
+        tabulation = super(UKIRT, self)._prepare_proposal_tabulation(
+            db, call, with_extra)
 
         exempt = UKIRTRequestTotal(
             total=0.0,
@@ -101,8 +101,12 @@ class CSVWriter(object):
     """
 
     def __init__(self, dialect=CSVDialect):
+        self._dialect = dialect
+        self._new_buffer()
+
+    def _new_buffer(self):
         self._buffer = CSVIO()
-        self._writer = csv.writer(self._buffer, dialect=dialect)
+        self._writer = csv.writer(self._buffer, dialect=self._dialect)
 
     def add_row(self, row):
         """
@@ -117,3 +121,42 @@ class CSVWriter(object):
         """
 
         return encode_csv(self._buffer.getvalue())
+
+    def iter_csv(self, rows, block_size=(64 * 1024)):
+        """
+        Generator to add the given rows to the CSV file and
+        yield its contents in blocks.
+
+        This allows a large CSV file to be sent as it is generated,
+        without holding the whole file in memory.  Any rows
+        already added to the buffer are included at the start
+        of the first block.
+
+        :param rows: iterable of rows
+        :param block_size: approximate size of the blocks to yield
+        """
+
+        for row in rows:
+            self.add_row(row)
+
+            if self._buffer.tell() >= block_size:
+                yield self._flush_buffer()
+
+        block = self._flush_buffer()
+
+        if block:
+            yield block
+
+    def _flush_buffer(self):
+        """
+        Return the contents of the buffer and replace it with a new one.
+
+        (A new buffer is used as truncating a buffer does not
+        release the memory which it has allocated.)
+        """
+
+        value = self.get_csv()
+
+        self._new_buffer()
+
+        return value
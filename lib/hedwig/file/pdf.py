@@ -29,7 +29,7 @@ except ImportError:
     from PyPDF2 import PdfFileMerger
     merge_kwargs = {'import_bookmarks': False}
 
-from ..compat import split_version
+from ..compat import split_version, string_type
 from ..config import get_config
 from ..error import Error, ConversionError
 from ..type.enum import FigureType
@@ -45,17 +45,40 @@ def pdf_merge(pdfs):
     into a single document (returned also as a buffer).
     """
 
+    with ClosingMultiple() as closer:
+        f = closer(BytesIO())
+
+        pdf_merge_to_file((BytesIO(x) for x in pdfs), f)
+
+        return f.getvalue()
+
+
+def pdf_merge_to_file(pdfs, output):
+    """
+    Merge a sequence of PDFs into a single document, writing it to
+    the given output file.
+
+    This avoids holding the merged document in memory.  The input PDFs
+    are read via the PDF library's (lazy) parser, so can be supplied
+    as file names or file objects, rather than as buffers, to
+    minimize memory usage.
+
+    :param pdfs: sequence of file names or file objects
+    :param output: output file name or file object
+    """
+
     with ClosingMultiple() as closer:
         merger = closer(PdfFileMerger(strict=False))
 
-        for buff in pdfs:
-            f = closer(BytesIO(buff))
-            merger.append(f, **merge_kwargs)
+        for pdf in pdfs:
+            if isinstance(pdf, string_type):
+                pdf = closer(open(pdf, 'rb'))
+            else:
+                closer(pdf)
 
-        f = closer(BytesIO())
-        merger.write(f)
+            merger.append(pdf, **merge_kwargs)
 
-        return f.getvalue()
+        merger.write(output)
 
 
 def pdf_to_png(pdf, page_count=None, renderer='ghostscript', **kwargs):
@@ -18,6 +18,8 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from threading import local
+
 from markdown import Markdown
 from markdown.treeprocessors import Treeprocessor
 from markdown.extensions import Extension
@@ -58,16 +60,32 @@ class HedwigExtension(Extension):
         md.inlinePatterns.deregister('html')
 
 
+_markdown_local = local()
+
+
 def markdown_to_html(text, start_heading):
     """
     Convert Markdown to HTML.
+
+    `Markdown` instances are re-used, since they are relatively
+    expensive to construct.  As they are not thread-safe, a separate
+    set of instances (one for each `start_heading`) is kept for each
+    thread.  Instances are reset after each conversion.
     """
 
-    md = Markdown(extensions=[
-        HedwigExtension(start_heading=start_heading),
-        SmartyExtension(),
-    ])
+    instances = getattr(_markdown_local, 'instances', None)
+    if instances is None:
+        instances = _markdown_local.instances = {}
+
+    md = instances.get(start_heading)
+    if md is None:
+        md = instances[start_heading] = Markdown(extensions=[
+            HedwigExtension(start_heading=start_heading),
+            SmartyExtension(),
+        ])
 
-    html = md.convert(text)
+    try:
+        return md.convert(text)
 
-    return html
+    finally:
+        md.reset()
@@ -0,0 +1,432 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+Collection of operational metrics.
+
+A :class:`Metrics` object accumulates statistics about `hedwigctl poll`
+tasks and web application requests, and reports the hit rates of
+registered caches.  These can be formatted in the Prometheus text
+exposition format or as a summary for the log.
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from contextlib import contextmanager
+from io import open
+import logging
+import os
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from timeit import default_timer
+
+# Tables (as counted by the database `search_pending_count` method)
+# containing the records handled by each poll task.
+poll_task_backlog = {
+    'email': ('message',),
+    'figure': ('proposal_fig', 'review_fig'),
+    'pdf': ('proposal_pdf',),
+    'publication': ('prev_proposal_pub',),
+    'moc': ('moc',),
+    'reqpropcopy': ('request_prop_copy',),
+    'reqproppdf': ('request_prop_pdf',),
+    'reqcallpdf': ('request_call_pdf',),
+}
+
+request_duration_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PollTaskRun(object):
+    """
+    Information about a single run of a poll task.
+
+    The `items` (number of items processed) and `backlog` attributes
+    can be set while the task is running.
+    """
+
+    def __init__(self):
+        self.items = None
+        self.errors = 0
+        self.backlog = None
+
+
+class _PollTaskMetrics(object):
+    def __init__(self):
+        self.runs = 0
+        self.duration = 0.0
+        self.last_duration = None
+        self.items = 0
+        self.errors = 0
+        self.backlog = None
+
+
+class _RequestMetrics(object):
+    def __init__(self, n_buckets):
+        self.count = 0
+        self.duration = 0.0
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.buckets = [0] * n_buckets
+        self.status = {}
+
+
+class _ErrorCountHandler(logging.Handler):
+    """
+    Logging handler which counts error messages.
+    """
+
+    def __init__(self, run):
+        super(_ErrorCountHandler, self).__init__(level=logging.ERROR)
+        self.run = run
+
+    def emit(self, record):
+        self.run.errors += 1
+
+
+class Metrics(object):
+    """
+    Class for accumulating operational metrics.
+
+    Methods may be called from multiple threads.
+
+    :param process: name of the type of process (e.g. "web" or "poll"),
+        included in the names of the cache metrics so that the metrics
+        of several processes can be combined
+    """
+
+    def __init__(self, process=None):
+        self._cache_metric = (
+            'hedwig_cache' if process is None
+            else 'hedwig_{}_cache'.format(process))
+        self._lock = Lock()
+        self._poll_tasks = {}
+        self._requests = {}
+        self._caches = {}
+
+    def add_cache(self, name, get_stats):
+        """
+        Register a cache whose statistics should be reported.
+
+        :param name: name of the cache
+        :param get_stats: function returning a (hits, misses) tuple
+            of cumulative counts
+        """
+
+        with self._lock:
+            self._caches[name] = get_stats
+
+    @contextmanager
+    def poll_task(self, name, logger_name='hedwig'):
+        """
+        Context manager to record a run of a poll task.
+
+        Yields a :class:`PollTaskRun` object.  The duration of the
+        block is recorded, along with the number of error messages
+        logged via the given logger (or its descendants) and any
+        exception raised, which is then re-raised.
+        """
+
+        run = PollTaskRun()
+        handler = _ErrorCountHandler(run)
+        logger = logging.getLogger(logger_name)
+        logger.addHandler(handler)
+        start = default_timer()
+
+        try:
+            yield run
+
+        except Exception:
+            run.errors += 1
+            raise
+
+        finally:
+            logger.removeHandler(handler)
+
+            self.record_poll_task(
+                name, default_timer() - start,
+                items=run.items, errors=run.errors, backlog=run.backlog)
+
+    def record_poll_task(
+            self, name, duration, items=None, errors=0, backlog=None):
+        """
+        Record a run of a poll task.
+        """
+
+        with self._lock:
+            task = self._poll_tasks.get(name)
+            if task is None:
+                task = self._poll_tasks[name] = _PollTaskMetrics()
+
+            task.runs += 1
+            task.duration += duration
+            task.last_duration = duration
+            task.errors += errors
+
+            if items is not None:
+                task.items += items
+
+            if backlog is not None:
+                task.backlog = backlog
+
+    def record_poll_backlog(self, db, names):
+        """
+        Record the backlog size for the given poll tasks.
+
+        This uses the database `search_pending_count` method to count
+        the records waiting to be processed.  Tasks for which no
+        backlog is defined are skipped.
+        """
+
+        names = [x for x in names if x in poll_task_backlog]
+        if not names:
+            return
+
+        pending = db.search_pending_count()
+
+        with self._lock:
+            for name in names:
+                task = self._poll_tasks.get(name)
+                if task is None:
+                    task = self._poll_tasks[name] = _PollTaskMetrics()
+
+                task.backlog = sum(
+                    pending[x] for x in poll_task_backlog[name])
+
+    def record_request(
+            self, endpoint, status, duration,
+            db_time=None, db_queries=None):
+        """
+        Record the handling of a web request.
+
+        :param endpoint: the name of the Flask endpoint
+        :param status: the HTTP status code of the response
+        :param duration: the time taken to handle the request (seconds)
+        :param db_time: the time spent in the database (seconds)
+        :param db_queries: the number of database queries
+        """
+
+        with self._lock:
+            request = self._requests.get(endpoint)
+            if request is None:
+                request = self._requests[endpoint] = _RequestMetrics(
+                    len(request_duration_buckets))
+
+            request.count += 1
+            request.duration += duration
+
+            if db_time is not None:
+                request.db_time += db_time
+
+            if db_queries is not None:
+                request.db_queries += db_queries
+
+            for (i, bucket) in enumerate(request_duration_buckets):
+                if duration <= bucket:
+                    request.buckets[i] += 1
+
+            request.status[status] = request.status.get(status, 0) + 1
+
+    def format_prometheus(self):
+        """
+        Format the metrics in the Prometheus text exposition format.
+        """
+
+        lines = []
+
+        def metric(name, type_, help_, samples):
+            if not samples:
+                return
+
+            lines.append('# HELP {} {}'.format(name, help_))
+            lines.append('# TYPE {} {}'.format(name, type_))
+
+            for (suffix, labels, value) in samples:
+                lines.append('{}{}{{{}}} {}'.format(
+                    name, suffix,
+                    ','.join('{}="{}"'.format(k, _escape_label(v))
+                             for (k, v) in labels),
+                    _format_value(value)))
+
+        with self._lock:
+            tasks = sorted(self._poll_tasks.items())
+            requests = sorted(self._requests.items())
+            caches = [(k, v()) for (k, v) in sorted(self._caches.items())]
+
+            metric(
+                'hedwig_poll_task_runs_total', 'counter',
+                'Number of runs of each poll task.',
+                [('', [('task', k)], v.runs) for (k, v) in tasks])
+
+            metric(
+                'hedwig_poll_task_duration_seconds_total', 'counter',
+                'Total time spent running each poll task.',
+                [('', [('task', k)], v.duration) for (k, v) in tasks])
+
+            metric(
+                'hedwig_poll_task_last_duration_seconds', 'gauge',
+                'Time taken by the most recent run of each poll task.',
+                [('', [('task', k)], v.last_duration) for (k, v) in tasks
+                 if v.last_duration is not None])
+
+            metric(
+                'hedwig_poll_task_items_total', 'counter',
+                'Number of items processed by each poll task.',
+                [('', [('task', k)], v.items) for (k, v) in tasks])
+
+            metric(
+                'hedwig_poll_task_errors_total', 'counter',
+                'Number of errors encountered by each poll task.',
+                [('', [('task', k)], v.errors) for (k, v) in tasks])
+
+            metric(
+                'hedwig_poll_task_backlog', 'gauge',
+                'Number of items waiting to be processed by each poll task.',
+                [('', [('task', k)], v.backlog) for (k, v) in tasks
+                 if v.backlog is not None])
+
+            metric(
+                'hedwig_http_requests_total', 'counter',
+                'Number of web requests handled, by response status.',
+                [('', [('endpoint', k), ('status', status)], n)
+                 for (k, v) in requests
+                 for (status, n) in sorted(v.status.items())])
+
+            duration_samples = []
+            for (k, v) in requests:
+                for (bucket, n) in zip(request_duration_buckets, v.buckets):
+                    duration_samples.append(
+                        ('_bucket', [('endpoint', k), ('le', bucket)], n))
+
+                duration_samples.extend((
+                    ('_bucket', [('endpoint', k), ('le', '+Inf')], v.count),
+                    ('_sum', [('endpoint', k)], v.duration),
+                    ('_count', [('endpoint', k)], v.count),
+                ))
+
+            metric(
+                'hedwig_http_request_duration_seconds', 'histogram',
+                'Time taken to handle web requests.',
+                duration_samples)
+
+            metric(
+                'hedwig_http_request_db_seconds_total', 'counter',
+                'Time spent in the database while handling web requests.',
+                [('', [('endpoint', k)], v.db_time) for (k, v) in requests])
+
+            metric(
+                'hedwig_http_request_db_queries_total', 'counter',
+                'Number of database queries made by web requests.',
+                [('', [('endpoint', k)], v.db_queries)
+                 for (k, v) in requests])
+
+            metric(
+                self._cache_metric + '_hits_total', 'counter',
+                'Number of cache hits.',
+                [('', [('cache', k)], v[0]) for (k, v) in caches])
+
+            metric(
+                self._cache_metric + '_misses_total', 'counter',
+                'Number of cache misses.',
+                [('', [('cache', k)], v[1]) for (k, v) in caches])
+
+        return ''.join(x + '\n' for x in lines)
+
+    def format_summary(self):
+        """
+        Format a summary of the metrics for the log.
+
+        :return: a list of lines
+        """
+
+        lines = []
+
+        with self._lock:
+            for (name, task) in sorted(self._poll_tasks.items()):
+                lines.append(
+                    'Poll task {}: {} run(s) taking {:.3f} s '
+                    '(last {:.3f} s), {} item(s), {} error(s){}'.format(
+                        name, task.runs, task.duration,
+                        (task.last_duration or 0.0),
+                        task.items, task.errors,
+                        ('' if task.backlog is None else
+                         ', backlog {}'.format(task.backlog))))
+
+            for (endpoint, request) in sorted(self._requests.items()):
+                lines.append(
+                    'Endpoint {}: {} request(s), mean {:.3f} s '
+                    '(database {:.3f} s, {:.1f} queries)'.format(
+                        endpoint, request.count,
+                        request.duration / request.count,
+                        request.db_time / request.count,
+                        request.db_queries / request.count))
+
+            for (name, get_stats) in sorted(self._caches.items()):
+                (hits, misses) = get_stats()
+                total = hits + misses
+                lines.append(
+                    'Cache {}: {} hit(s), {} miss(es) ({:.0f}% hits)'.format(
+                        name, hits, misses,
+                        ((100.0 * hits / total) if total else 0.0)))
+
+        return lines
+
+    def write_file(self, filename):
+        """
+        Write the metrics to a file in the Prometheus text format.
+
+        The file is replaced atomically, so that it can be read by
+        another process (such as the web application or the node
+        exporter's "textfile" collector) at any time.
+        """
+
+        dirname = os.path.dirname(os.path.abspath(filename))
+
+        with NamedTemporaryFile(
+                mode='w', dir=dirname, prefix='.metrics',
+                delete=False) as f:
+            f.write(self.format_prometheus())
+
+        os.chmod(f.name, 0o644)
+        os.rename(f.name, filename)
+
+
+def read_metrics_file(filename):
+    """
+    Read a file of metrics written by :meth:`Metrics.write_file`.
+
+    :return: the file contents, or an empty string if it does not exist
+    """
+
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    except IOError:
+        return ''
+
+
+def _escape_label(value):
+    return '{}'.format(value).replace(
+        '\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+
+    return '{}'.format(value)
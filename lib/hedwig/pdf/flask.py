@@ -18,16 +18,18 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from contextlib import contextmanager
+from shutil import rmtree
+from tempfile import mkdtemp
 
-from flask import g as flask_g
 from werkzeug.test import create_environ
 
 from ..compat import first_value
 from ..config import get_facilities
 from ..error import FormattedError, NoSuchValue
-from ..file.pdf import pdf_merge
+from ..file.pdf import pdf_merge, pdf_merge_to_file
 from ..type.simple import CurrentUser, UserInfo
 from ..type.util import null_tuple
+from ..web.util import fixed_current_user_environ_key
 from .write import PDFWriter
 
 
@@ -41,6 +43,40 @@ class PDFWriterFlask(PDFWriter):
         Request PDF representation of a proposal.
         """
 
+        (url, person_id) = self._proposal_request_info(proposal_id)
+
+        # Request and return the PDF.
+        return pdf_merge(self._request_pdf(url, person_id, section=True))
+
+    def proposal_to_file(self, proposal_id, filename):
+        """
+        Write PDF representation of a proposal to the given file.
+
+        Each section is spooled to a temporary file as it is prepared,
+        and the sections are then merged directly into the output file,
+        so that the complete document is never held in memory.
+        """
+
+        (url, person_id) = self._proposal_request_info(proposal_id)
+
+        spool_dir = mkdtemp(prefix='hedwig_pdf_')
+
+        try:
+            pdf_merge_to_file(
+                self._request_pdf(
+                    url, person_id, section=True, spool_dir=spool_dir),
+                filename)
+
+        finally:
+            rmtree(spool_dir)
+
+    def _proposal_request_info(self, proposal_id):
+        """
+        Determine the URL and identity to use to request a proposal.
+
+        :return: a (url, person_id) tuple
+        """
+
         proposal = self.db.get_proposal(None, proposal_id, with_members=True)
 
         # Determine the proposal PI.  We will access the proposal as if
@@ -59,8 +95,7 @@ class PDFWriterFlask(PDFWriter):
         facility_code = get_facilities(db=self.db)[proposal.facility_id].code
         url = '{}/proposal/{}'.format(facility_code, proposal_id)
 
-        # Request and return the PDF.
-        return pdf_merge(self._request_pdf(url, person_id, section=True))
+        return (url, person_id)
 
     def reviews(self, proposal_id):
         """
@@ -94,18 +129,23 @@ class PDFWriterFlask(PDFWriter):
     @contextmanager
     def _fixed_auth(self, person_id, session_options={}):
         """
-        Prepare fixed log-in information by temporarily setting a
-        `before_request` function to place a fixed `current_user`
-        object in the flask `g` object.
+        Prepare a request context with fixed log-in information.
+
+        A fixed `current_user` object is placed in the request environment,
+        from which it is applied to the flask `g` object by the
+        `before_request` function set up by
+        :func:`~hedwig.web.app.create_web_app` -- this should have been
+        called using: without_auth=True.  Nothing is registered with
+        the application itself, so several requests can be prepared
+        concurrently (e.g. in separate threads).
 
         If `session_options` is provided, it should be a dictionary of extra
         information to include in the `current_user` object.
-        """
 
-        # Make sure there are no "before_request" functions, since we
-        # will clear them later -- `create_web_app` should have been called
-        # using: without_auth=True.
-        assert (not self.app.before_request_funcs), 'no before_request func.'
+        Yields a WSGI application callable which applies the same log-in
+        information to further requests, such as those for resources
+        referenced by the page being rendered.
+        """
 
         user = None
         person = None
@@ -120,16 +160,15 @@ class PDFWriterFlask(PDFWriter):
             auth_token_id=None,
             options=session_options)
 
-        try:
-            @self.app.before_request
-            def apply_fixed_auth():
-                flask_g.current_user = current_user
+        def fixed_auth_app(environ, start_response):
+            environ[fixed_current_user_environ_key] = current_user
+            return self.app(environ, start_response)
 
-            yield
+        environ = self._prepare_environ()
+        environ[fixed_current_user_environ_key] = current_user
 
-        finally:
-            # Remove our fixed log-in "before_request" function.
-            self.app.before_request_funcs.clear()
+        with self.app.request_context(environ):
+            yield fixed_auth_app
 
     def _prepare_environ(self):
         """
@@ -18,21 +18,55 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from contextlib import closing
 from datetime import datetime, timedelta
+from functools import partial
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import os
+import shutil
+from tempfile import mkdtemp, mkstemp
+from zipfile import ZipFile, ZIP_STORED
 
-from .request import get_proposal_filename
-from ..config import get_pdf_writer
+from .request import get_call_filename, get_proposal_filename
+from .write import prune_cache_dir
+from ..config import get_config, get_facilities, get_pdf_writer
 from ..error import ConsistencyError, FormattedError
-from ..type.enum import RequestState
+from ..file.pdf import pdf_merge_to_file
+from ..type.enum import ProposalState, RequestState
 from ..util import get_logger
 
 logger = get_logger(__name__)
 
 
-def process_request_prop_pdf(db, app, dry_run=False):
+# Context used by worker processes, inherited when the worker pool is forked.
+_worker_context = None
+
+# Cumulative numbers of PDF section cache hits and misses for all requests
+# processed, including those handled by worker processes.
+_section_cache_stats = [0, 0]
+
+
+def get_section_cache_stats():
+    """
+    Get the cumulative PDF section cache statistics for requests
+    processed by this module's functions.
+
+    :return: a (hits, misses) tuple
+    """
+
+    return tuple(_section_cache_stats)
+
+
+def process_request_prop_pdf(
+        db, app, dry_run=False, workers=None, worker_type=None):
     """
     Function to handle requests for PDF versions of proposals.
+
+    Requests can be processed concurrently using a pool of worker
+    threads or (forked) processes.  If the `workers` and `worker_type`
+    arguments are not given, they are read from the `pdf_request`
+    section of the configuration file.
     """
 
     requests = db.search_request_prop_pdf(state=RequestState.NEW)
@@ -42,16 +76,42 @@ def process_request_prop_pdf(db, app, dry_run=False):
 
     pdf_writer = get_pdf_writer(db=db, app=app)
 
+    return sum(_map_workers(
+        db, pdf_writer,
+        partial(_process_request_prop_pdf_single, dry_run=dry_run),
+        list(requests.values()), workers, worker_type))
+
+
+def process_request_call_pdf(
+        db, app, dry_run=False, workers=None, worker_type=None):
+    """
+    Function to handle requests for PDF bundles of the proposals for a call.
+
+    Each submitted proposal of the call is rendered once, using a pool of
+    workers as for :func:`process_request_prop_pdf`.  The results are
+    stored as a ZIP archive of the individual files along with a single
+    merged PDF file.  These files contain all of the proposals, so access
+    must be checked when they are downloaded.
+    """
+
+    requests = db.search_request_call_pdf(state=RequestState.NEW)
+
+    if not requests:
+        return 0
+
+    pdf_writer = get_pdf_writer(db=db, app=app)
+    facilities = get_facilities(db=db)
+
     n_processed = 0
 
     for request in requests.values():
         logger.debug(
-            'Handling proposal PDF request {} (proposal {})',
-            request.id, request.proposal_id)
+            'Handling call PDF request {} (call {})',
+            request.id, request.call_id)
 
         try:
             if not dry_run:
-                db.update_request_prop_pdf(
+                db.update_request_call_pdf(
                     request_id=request.id, state=RequestState.PROCESSING,
                     state_prev=RequestState.NEW,
                     state_is_system=True)
@@ -59,22 +119,58 @@ def process_request_prop_pdf(db, app, dry_run=False):
             continue
 
         try:
-            pdf = pdf_writer.proposal(request.proposal_id)
+            call = db.get_call(facility_id=None, call_id=request.call_id)
+            facility = facilities[call.facility_id]
 
-            filename = get_proposal_filename(request)
+            filename = get_call_filename(request)
+            filename_merged = get_call_filename(request, merged=True)
 
-            if os.path.exists(filename):
-                raise FormattedError(
-                    'File {} already exists (for request {}, proposal {})',
-                    filename, request.id, request.proposal_id)
+            for filename_ in (filename, filename_merged):
+                if os.path.exists(filename_):
+                    raise FormattedError(
+                        'File {} already exists (for request {}, call {})',
+                        filename_, request.id, request.call_id)
 
-            if not dry_run:
-                with open(filename, 'wb') as f:
-                    f.write(pdf)
+            spool_dir = mkdtemp(prefix='hedwig_call_pdf_')
+
+            try:
+                proposals = []
+
+                for proposal in db.search_proposal(
+                        call_id=call.id,
+                        state=ProposalState.submitted_states()).values():
+                    proposals.append((
+                        proposal.id,
+                        facility.view.make_proposal_code(db, proposal),
+                        os.path.join(
+                            spool_dir, 'proposal_{}.pdf'.format(proposal.id))))
+
+                _map_workers(
+                    db, pdf_writer, _write_proposal_pdf,
+                    [(x[0], x[2]) for x in proposals], workers, worker_type)
+
+                filename_tmp = os.path.join(spool_dir, 'bundle.zip')
+                filename_merged_tmp = os.path.join(spool_dir, 'bundle.pdf')
+
+                with closing(ZipFile(filename_tmp, 'w', ZIP_STORED)) as zip_:
+                    for (proposal_id, proposal_code, proposal_file) \
+                            in proposals:
+                        zip_.write(
+                            proposal_file, '{}.pdf'.format(proposal_code))
+
+                pdf_merge_to_file(
+                    [x[2] for x in proposals], filename_merged_tmp)
+
+                if not dry_run:
+                    shutil.move(filename_tmp, filename)
+                    shutil.move(filename_merged_tmp, filename_merged)
+
+            finally:
+                shutil.rmtree(spool_dir)
 
             try:
                 if not dry_run:
-                    db.update_request_prop_pdf(
+                    db.update_request_call_pdf(
                         request_id=request.id, state=RequestState.READY,
                         processed=datetime.utcnow(),
                         state_prev=RequestState.PROCESSING,
@@ -87,17 +183,226 @@ def process_request_prop_pdf(db, app, dry_run=False):
 
         except Exception:
             logger.exception(
-                'Error handling proposal PDF request {} (proposal {})',
-                request.id, request.proposal_id)
+                'Error handling call PDF request {} (call {})',
+                request.id, request.call_id)
 
             if not dry_run:
-                db.update_request_prop_pdf(
+                db.update_request_call_pdf(
                     request_id=request.id, state=RequestState.ERROR,
                     state_is_system=True)
 
     return n_processed
 
 
+def _map_workers(db, pdf_writer, function, items, workers, worker_type):
+    """
+    Apply a function to each of a list of items, using a pool of workers
+    if configured.
+
+    The function is called with the database object, PDF writer and item.
+    If the `workers` and `worker_type` arguments are `None`, they are
+    read from the `pdf_request` section of the configuration file.
+    The PDF writer's cache statistics are logged on completion.
+
+    :return: a list of the function results, in the same order as the items
+    """
+
+    global _worker_context
+
+    if workers is None or worker_type is None:
+        config = get_config()
+
+        if workers is None:
+            workers = int(config.get('pdf_request', 'workers'))
+
+        if worker_type is None:
+            worker_type = config.get('pdf_request', 'worker_type')
+
+    workers = min(workers, len(items))
+
+    (cache_hits_start, cache_misses_start) = pdf_writer.get_cache_stats()
+    cache_hits = cache_misses = 0
+
+    if workers < 2:
+        results = [function(db, pdf_writer, item) for item in items]
+
+    elif worker_type == 'thread':
+        pool = ThreadPool(workers)
+
+        try:
+            results = pool.map(partial(function, db, pdf_writer), items)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    elif worker_type == 'process':
+        # Worker processes keep their own cache statistics, so in this case
+        # each returns the changes in its statistics along with its result.
+        _worker_context = (db, pdf_writer, function)
+
+        try:
+            pool_class = multiprocessing.get_context('fork').Pool
+        except AttributeError:
+            pool_class = multiprocessing.Pool
+
+        pool = pool_class(workers, initializer=_init_worker_process)
+
+        try:
+            results = []
+
+            for (result, hits, misses) in pool.imap(_worker_call, items):
+                results.append(result)
+                cache_hits += hits
+                cache_misses += misses
+
+        finally:
+            pool.close()
+            pool.join()
+
+            _worker_context = None
+
+    else:
+        raise FormattedError(
+            'Unknown PDF request worker type {}', worker_type)
+
+    (cache_hits_end, cache_misses_end) = pdf_writer.get_cache_stats()
+    cache_hits += cache_hits_end - cache_hits_start
+    cache_misses += cache_misses_end - cache_misses_start
+
+    _section_cache_stats[0] += cache_hits
+    _section_cache_stats[1] += cache_misses
+
+    if cache_hits or cache_misses:
+        logger.info(
+            'Proposal PDF section cache: {} hit(s), {} miss(es) ({:.0f}%)',
+            cache_hits, cache_misses,
+            100.0 * cache_hits / (cache_hits + cache_misses))
+
+    return results
+
+
+def _init_worker_process():
+    """
+    Prepare a newly-forked worker process.
+
+    Discards database connections inherited from the parent process
+    so that the worker opens its own connections.
+    """
+
+    (db, pdf_writer, function) = _worker_context
+
+    engine = db._engine
+
+    try:
+        engine.dispose(close=False)
+    except TypeError:
+        engine.dispose()
+
+
+def _worker_call(item):
+    """
+    Apply the function from the worker context to an item
+    in a worker process.
+
+    :return: a tuple of the function result and the
+        numbers of cache hits and misses
+    """
+
+    (db, pdf_writer, function) = _worker_context
+
+    (cache_hits, cache_misses) = pdf_writer.get_cache_stats()
+
+    result = function(db, pdf_writer, item)
+
+    (cache_hits_end, cache_misses_end) = pdf_writer.get_cache_stats()
+
+    return (
+        result,
+        cache_hits_end - cache_hits,
+        cache_misses_end - cache_misses)
+
+
+def _write_proposal_pdf(db, pdf_writer, item):
+    """
+    Write a proposal PDF file, given a (proposal_id, filename) tuple.
+    """
+
+    (proposal_id, filename) = item
+
+    pdf_writer.proposal_to_file(proposal_id, filename)
+
+
+def _process_request_prop_pdf_single(db, pdf_writer, request, dry_run):
+    """
+    Handle an individual proposal PDF request.
+
+    :return: 1 if the request was processed, 0 otherwise
+    """
+
+    logger.debug(
+        'Handling proposal PDF request {} (proposal {})',
+        request.id, request.proposal_id)
+
+    try:
+        if not dry_run:
+            db.update_request_prop_pdf(
+                request_id=request.id, state=RequestState.PROCESSING,
+                state_prev=RequestState.NEW,
+                state_is_system=True)
+    except ConsistencyError:
+        return 0
+
+    try:
+        filename = get_proposal_filename(request)
+
+        if os.path.exists(filename):
+            raise FormattedError(
+                'File {} already exists (for request {}, proposal {})',
+                filename, request.id, request.proposal_id)
+
+        # Write the PDF to a temporary file and rename it into place when
+        # complete.  (In dry run mode, just remove the temporary file.)
+        (fd, filename_tmp) = mkstemp(
+            suffix='.tmp', dir=os.path.dirname(filename))
+        os.close(fd)
+
+        try:
+            pdf_writer.proposal_to_file(request.proposal_id, filename_tmp)
+
+            if not dry_run:
+                os.rename(filename_tmp, filename)
+
+        finally:
+            if os.path.exists(filename_tmp):
+                os.unlink(filename_tmp)
+
+        try:
+            if not dry_run:
+                db.update_request_prop_pdf(
+                    request_id=request.id, state=RequestState.READY,
+                    processed=datetime.utcnow(),
+                    state_prev=RequestState.PROCESSING,
+                    state_is_system=True)
+
+            return 1
+
+        except ConsistencyError:
+            return 0
+
+    except Exception:
+        logger.exception(
+            'Error handling proposal PDF request {} (proposal {})',
+            request.id, request.proposal_id)
+
+        if not dry_run:
+            db.update_request_prop_pdf(
+                request_id=request.id, state=RequestState.ERROR,
+                state_is_system=True)
+
+    return 0
+
+
 def process_request_prop_pdf_expiry(db, dry_run=False):
     """
     Function to expire processed requests for PDF versions of proposals.
@@ -156,3 +461,84 @@ def process_request_prop_pdf_expiry(db, dry_run=False):
                     state_is_system=True)
 
     return n_expired
+
+
+def process_request_call_pdf_expiry(db, dry_run=False):
+    """
+    Function to expire processed requests for PDF bundles of calls.
+    """
+
+    n_expired = 0
+
+    for request in db.search_request_call_pdf(
+            state=RequestState.READY,
+            processed_before=(
+                datetime.utcnow() - timedelta(hours=24))).values():
+        logger.debug(
+            'Expiring call PDF request {} (call {})',
+            request.id, request.call_id)
+
+        try:
+            if not dry_run:
+                db.update_request_call_pdf(
+                    request_id=request.id, state=RequestState.EXPIRING,
+                    state_prev=RequestState.READY,
+                    state_is_system=True)
+        except ConsistencyError:
+            continue
+
+        try:
+            for filename in (
+                    get_call_filename(request),
+                    get_call_filename(request, merged=True)):
+                if not os.path.isfile(filename):
+                    raise FormattedError(
+                        'File {} doest not exist (for request {}, call {})',
+                        filename, request.id, request.call_id)
+
+                if not dry_run:
+                    os.unlink(filename)
+
+            try:
+                if not dry_run:
+                    db.update_request_call_pdf(
+                        request_id=request.id, state=RequestState.EXPIRED,
+                        state_prev=RequestState.EXPIRING,
+                        state_is_system=True)
+
+                n_expired += 1
+
+            except ConsistencyError:
+                continue
+
+        except Exception:
+            logger.exception(
+                'Error expiring call PDF request {} (call {})',
+                request.id, request.call_id)
+
+            if not dry_run:
+                db.update_request_call_pdf(
+                    request_id=request.id, state=RequestState.EXPIRE_ERROR,
+                    state_is_system=True)
+
+    return n_expired
+
+
+def process_pdf_cache_expiry(dry_run=False):
+    """
+    Function to remove entries from the PDF writer cache directory
+    (if configured) which have not been used recently.
+    """
+
+    config = get_config()
+
+    cache_dir = config.get('pdf_write', 'cache_dir')
+    if not cache_dir:
+        return 0
+
+    max_age = float(config.get('pdf_write', 'cache_max_age'))
+    if not max_age:
+        return 0
+
+    return prune_cache_dir(
+        cache_dir, max_age=(max_age * 24 * 3600), dry_run=dry_run)
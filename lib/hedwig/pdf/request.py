@@ -25,6 +25,22 @@ from ..error import FormattedError
 
 
 def get_proposal_filename(request):
+    return _get_request_filename('prop_req_{}.pdf'.format(request.id))
+
+
+def get_call_filename(request, merged=False):
+    """
+    Get the file name for a call PDF bundle request.
+
+    :param merged: if true, give the name of the merged PDF file rather
+        than the ZIP archive of individual proposals.
+    """
+
+    return _get_request_filename('call_req_{}.{}'.format(
+        request.id, ('pdf' if merged else 'zip')))
+
+
+def _get_request_filename(filename):
     output_dir = get_config().get('pdf_request', 'prop_dir')
 
     if not output_dir:
@@ -33,6 +49,4 @@ def get_proposal_filename(request):
     if not os.path.isdir(output_dir):
         raise FormattedError('Proposal PDF request directory does not exist.')
 
-    filename = 'prop_req_{}.pdf'.format(request.id)
-
     return os.path.join(output_dir, filename)
@@ -18,9 +18,15 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 import logging
+import os
+
+try:
+    from urllib.parse import urljoin
+except ImportError:
+    from urlparse import urljoin
 
 from flask import request as _flask_request
-from flask_weasyprint import HTML as FWP_HTML, make_url_fetcher
+from flask_weasyprint import make_flask_url_dispatcher, make_url_fetcher
 from weasyprint import HTML as WP_HTML, CSS
 
 from ..error import FormattedError
@@ -33,7 +39,18 @@ logging.getLogger('weasyprint').setLevel(logging.ERROR)
 
 
 class PDFWriterWeasyPrint(PDFWriterFlask):
-    def _request_pdf(self, url, person_id=None, section=False):
+    def _request_pdf(
+            self, url, person_id=None, section=False, spool_dir=None):
+        """
+        Request a PDF via WeasyPrint.
+
+        If `section` is specified, returns a list of PDF sections.  These
+        will be given as buffers unless a `spool_dir` is specified,
+        in which case each section is written to a file in that directory
+        as soon as it has been prepared, and the list contains the
+        file names.
+        """
+
         # Set up request environment.
         session_options = {
             'pdf_as_svg': True,
@@ -49,38 +66,110 @@ class PDFWriterWeasyPrint(PDFWriterFlask):
             string='@page {{size: {};}}'.format(self.page_size)))
 
         # Perform the request to generate the PDF using WeasyPrint.
-        with self._fixed_auth(person_id, session_options=session_options), \
-                self.app.request_context(self._prepare_environ()):
+        with self._fixed_auth(
+                person_id, session_options=session_options) as app:
+            base_url = _flask_request.url
+            url_fetcher = _make_fixed_auth_url_fetcher(app)
+
             if not section:
-                return FWP_HTML(url).write_pdf(stylesheets=stylesheets)
+                return WP_HTML(
+                    urljoin(base_url, url),
+                    url_fetcher=url_fetcher
+                ).write_pdf(stylesheets=stylesheets)
 
-            # When processing a page in sections, we need to not use the
-            # Flask-WeasyPrint wrapper layer so that we can check the MIME
+            # When processing a page in sections, we need to check the MIME
             # type of each section to decide whether to process it with
             # WeasyPrint or output it directly.
             pdfs = []
-            base_url = _flask_request.url
-            url_fetcher = make_url_fetcher()
 
             response = url_fetcher(
                 '{}{}/section'.format(base_url, url))
 
-            for (mime_type, data) in parse_multipart_response(
-                    response['string']):
+            sections = parse_multipart_response(response['string'])
+            del response
+
+            # Remove each section from the list as it is handled so that
+            # spooled sections can be released from memory.
+            sections.reverse()
+
+            while sections:
+                (mime_type, data) = sections.pop()
+
                 if mime_type == 'application/pdf':
-                    pdfs.append(data)
+                    pass
 
                 elif mime_type == 'text/html':
-                    pdfs.append(
-                        WP_HTML(
-                            string=data,
-                            base_url=base_url,
-                            url_fetcher=url_fetcher
-                        ).write_pdf(stylesheets=stylesheets))
+                    data = self._write_html_section(
+                        data, base_url, url_fetcher, stylesheets)
 
                 else:
                     raise FormattedError(
                         'Section request returned unexpected MIME type {}',
                         mime_type)
 
+                if spool_dir is None:
+                    pdfs.append(data)
+
+                else:
+                    filename = os.path.join(
+                        spool_dir, 'section_{}.pdf'.format(len(pdfs)))
+
+                    with open(filename, 'wb') as f:
+                        f.write(data)
+
+                    pdfs.append(filename)
+
+                del data
+
             return pdfs
+
+    def _write_html_section(self, html, base_url, url_fetcher, stylesheets):
+        """
+        Convert a section of HTML to PDF, using the cache directory
+        if one is configured.
+
+        Cache entries are identified by the HTML (which includes the MD5
+        sums of any figures in their URLs) and base URL, along with the page
+        size and software version.  Therefore sections of a proposal
+        which have not changed do not need to be rendered again.
+        """
+
+        if self.cache_dir is None:
+            return WP_HTML(
+                string=html, base_url=base_url, url_fetcher=url_fetcher
+            ).write_pdf(stylesheets=stylesheets)
+
+        pdf = self._read_cache(base_url, html)
+
+        if pdf is None:
+            pdf = WP_HTML(
+                string=html, base_url=base_url, url_fetcher=url_fetcher
+            ).write_pdf(stylesheets=stylesheets)
+
+            self._write_cache(pdf, base_url, html)
+
+        return pdf
+
+
+def _make_fixed_auth_url_fetcher(app):
+    """
+    Create a Flask-WeasyPrint URL fetcher which directs requests for
+    the application to the given WSGI application callable.
+
+    This allows fixed log-in information to be applied to all requests
+    made while rendering a document.  Must be called in a request context.
+    """
+
+    dispatcher = make_flask_url_dispatcher()
+
+    def fixed_auth_dispatcher(url):
+        result = dispatcher(url)
+
+        if result is None:
+            return None
+
+        (flask_app, base_url, path) = result
+
+        return (app, base_url, path)
+
+    return make_url_fetcher(dispatcher=fixed_auth_dispatcher)
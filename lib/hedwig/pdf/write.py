@@ -17,7 +17,14 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from hashlib import sha256
+import os
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+
 from ..error import FormattedError
+from ..version import version
 
 
 class PDFWriter(object):
@@ -25,15 +32,104 @@ class PDFWriter(object):
     Base class for Hedwig PDF writers.
     """
 
-    def __init__(self, db, app, base_url, page_size):
+    def __init__(self, db, app, base_url, page_size, cache_dir=None):
         """
         Construct PDF writer object.
+
+        If a `cache_dir` is given, writers which support it may store
+        rendered sections of documents in this directory for re-use.
         """
 
         self.db = db
         self.app = app
         self.base_url = base_url
         self.page_size = page_size
+        self.cache_dir = cache_dir
+
+        self._cache_lock = Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def get_cache_stats(self):
+        """
+        Get the numbers of cache hits and misses recorded by this writer.
+
+        :return: a (hits, misses) tuple
+        """
+
+        with self._cache_lock:
+            return (self._cache_hits, self._cache_misses)
+
+    def _record_cache_access(self, hit):
+        """
+        Record a cache access, for the statistics returned by
+        :meth:`get_cache_stats`.
+        """
+
+        with self._cache_lock:
+            if hit:
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+
+    def _read_cache(self, *key_parts):
+        """
+        Read an entry from the cache directory.
+
+        Entries are identified by a hash of the given key parts along with
+        the page size and software version.  The entry's modification
+        time is updated so that :func:`prune_cache_dir` can remove
+        entries which are no longer used.  The access is recorded
+        for :meth:`get_cache_stats`.
+
+        :return: the cached PDF, or `None` if there is no such entry
+        """
+
+        filename = self._get_cache_filename(key_parts)
+
+        try:
+            with open(filename, 'rb') as f:
+                pdf = f.read()
+
+            os.utime(filename, None)
+
+        except (IOError, OSError):
+            self._record_cache_access(hit=False)
+            return None
+
+        self._record_cache_access(hit=True)
+        return pdf
+
+    def _write_cache(self, pdf, *key_parts):
+        """
+        Write an entry to the cache directory.
+
+        The file is written under a temporary name and then renamed,
+        so that other workers never read an incomplete entry.
+        """
+
+        filename = self._get_cache_filename(key_parts)
+        cache_subdir = os.path.dirname(filename)
+
+        if not os.path.isdir(cache_subdir):
+            try:
+                os.makedirs(cache_subdir)
+            except OSError:
+                if not os.path.isdir(cache_subdir):
+                    raise
+
+        with NamedTemporaryFile(
+                dir=cache_subdir, suffix='.tmp', delete=False) as f:
+            f.write(pdf)
+
+        os.rename(f.name, filename)
+
+    def _get_cache_filename(self, key_parts):
+        key = sha256('\n'.join(
+            (version, self.page_size) + tuple(key_parts)).encode('utf-8')
+        ).hexdigest()
+
+        return os.path.join(self.cache_dir, key[:2], '{}.pdf'.format(key))
 
     def proposal(self, proposal_id):
         """
@@ -44,6 +140,19 @@ class PDFWriter(object):
 
         raise FormattedError('Not implemented')
 
+    def proposal_to_file(self, proposal_id, filename):
+        """
+        Write PDF representation of a proposal to the given file.
+
+        Subclasses may override this to avoid holding the whole
+        document in memory.
+        """
+
+        pdf = self.proposal(proposal_id)
+
+        with open(filename, 'wb') as f:
+            f.write(pdf)
+
     def reviews(self, proposal_id):
         """
         Request PDF representation of reviews of a proposal.
@@ -52,3 +161,45 @@ class PDFWriter(object):
         """
 
         raise FormattedError('Not implemented')
+
+
+def prune_cache_dir(cache_dir, max_age, dry_run=False):
+    """
+    Remove entries from a PDF writer cache directory which have
+    not been used recently.
+
+    :param cache_dir: the cache directory
+    :param max_age: age (in seconds) since the last modification
+        after which entries are removed
+    :param dry_run: if specified, only count the entries
+
+    :return: the number of entries removed
+    """
+
+    n_removed = 0
+    cutoff = time() - max_age
+
+    for (dirpath, dirnames, filenames) in os.walk(cache_dir):
+        for filename in filenames:
+            # Also consider temporary files, which could have been left
+            # behind if a worker was interrupted.
+            if not filename.endswith(('.pdf', '.tmp')):
+                continue
+
+            path = os.path.join(dirpath, filename)
+
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+
+                if not dry_run:
+                    os.unlink(path)
+
+            except OSError:
+                # The entry may have been removed, or touched and then
+                # replaced, by another process.
+                continue
+
+            n_removed += 1
+
+    return n_removed
@@ -99,6 +99,21 @@ class CollectionByProposal(object):
             (k, v) for (k, v) in self.items()
             if v.proposal_id == proposal_id)
 
+    def subsets_by_proposal(self):
+        """
+        Divide the collection into subsets (of the same type) for each
+        proposal, in a single pass.
+
+        :return: a dictionary of subsets by proposal identifier
+        """
+
+        ans = defaultdict(type(self))
+
+        for (k, v) in self.items():
+            ans[v.proposal_id][k] = v
+
+        return dict(ans)
+
 
 class CollectionByQueue(object):
     """
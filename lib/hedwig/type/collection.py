@@ -21,8 +21,8 @@ from __future__ import absolute_import, division, print_function, \
 from collections import OrderedDict, namedtuple
 from math import sqrt
 
-from ..astro.coord import CoordSystem, coord_from_dec_deg, coord_to_dec_deg, \
-    format_coord, format_coord_all_systems, parse_coord
+from ..astro.coord import CoordSystem, coord_from_dec_deg, \
+    format_coord, format_coord_all_systems, parse_coord_list
 from ..compat import first_value
 from ..email.util import is_valid_email
 from ..error import MultipleRecords, MultipleValues, \
@@ -34,7 +34,8 @@ from .base import CollectionByCall, CollectionByFacility, \
     CollectionOrdered, CollectionSortable
 from .enum import PublicationType, ReviewState
 from .misc import DefaultOrderedDict
-from .simple import Target, TargetFracTime, TargetObject
+from .simple import Target, TargetFracTime, TargetFracTimeColumns, \
+    TargetObject
 
 ResultTable = namedtuple('ResultTable', ('table', 'columns', 'rows'))
 
@@ -1038,89 +1039,148 @@ class TargetCollection(ResultCollection, CollectionOrdered,
         return ans
 
     @classmethod
-    def from_formatted_collection(cls, records, as_object_list=False):
+    def from_formatted_collection(
+            cls, records, as_object_list=False, errors=None):
         """
         Construct an instance of this class where, for every entry in the
         input collection, the `x`, `y`, `time` and `priority` values are
         parsed.  (As decimal degrees (`float`), `float` and `int`
         respectively.)
 
+        The coordinates of all of the entries are parsed together
+        using :func:`hedwig.astro.coord.parse_coord_list`.
+
         :param records: input collection of formatted targets
         :param as_object_list: if specified, return a list of
             `TargetObject` instances instead of a `TargetCollection`
+        :param errors: if a dictionary is given, then rather than raising
+            the first `UserError` encountered, the error for each entry
+            which could not be parsed is stored in it by key, and the
+            entry is omitted from the result
         """
 
         ans = ([] if as_object_list else cls())
 
+        coord_keys = [
+            k for (k, v) in records.items() if v.name and v.x and v.y]
+        coords = parse_coord_list(
+            [records[k].system for k in coord_keys],
+            [records[k].x for k in coord_keys],
+            [records[k].y for k in coord_keys],
+            [records[k].name for k in coord_keys],
+            with_coord=as_object_list)
+        coord_index = {k: i for (i, k) in enumerate(coord_keys)}
+
         for (k, v) in records.items():
-            system = v.system
+            try:
+                ans_value = cls._parse_formatted_value(
+                    v, coords, coord_index.get(k), as_object_list)
 
-            if not v.name:
-                raise UserError('Each target object should have a name.')
+            except UserError as e:
+                if errors is None:
+                    raise
 
-            try:
-                if v.time:
-                    time = float(v.time)
-                else:
-                    time = None
+                errors[k] = e
+                continue
 
-            except ValueError:
-                raise UserError('Could not parse time for "{}".', v.name)
+            if ans_value is None:
+                continue
 
-            try:
-                if v.priority:
-                    priority = int(v.priority)
-                else:
-                    priority = None
-            except ValueError:
-                raise UserError('Could not parse priority for "{}".', v.name)
-
-            if v.x and v.y:
-                coord = parse_coord(system, v.x, v.y, v.name)
-                if as_object_list:
-                    ans.append(TargetObject(
-                        v.name, system, coord=coord, time=time))
-                    continue
+            if as_object_list:
+                ans.append(ans_value)
+            else:
+                ans[k] = ans_value
 
-                (x, y) = coord_to_dec_deg(coord)
+        return ans
 
-            elif v.x or v.y:
-                raise UserError('Target "{}" has only one coordinate.',
-                                v.name)
+    @staticmethod
+    def _parse_formatted_value(v, coords, coord_index, as_object_list):
+        """
+        Parse an entry for `from_formatted_collection`, given the
+        results of parsing the coordinates of all of the entries.
 
-            elif as_object_list:
-                continue
+        :return: the parsed entry, or `None` if it should be omitted
+            from an object list
+        """
 
+        system = v.system
+
+        if not v.name:
+            raise UserError('Each target object should have a name.')
+
+        try:
+            if v.time:
+                time = float(v.time)
             else:
-                system = x = y = None
+                time = None
 
-            if v.note:
-                note = v.note
+        except ValueError:
+            raise UserError('Could not parse time for "{}".', v.name)
+
+        try:
+            if v.priority:
+                priority = int(v.priority)
             else:
-                note = None
+                priority = None
+        except ValueError:
+            raise UserError('Could not parse priority for "{}".', v.name)
 
-            ans[k] = v._replace(
-                system=system, x=x, y=y,
-                time=time, priority=priority, note=note)
+        if v.x and v.y:
+            error = coords.error.get(coord_index)
+            if error is not None:
+                raise error
 
-        return ans
+            if as_object_list:
+                return TargetObject(
+                    v.name, system, coord=coords.coord[coord_index],
+                    time=time)
+
+            x = coords.x_deg[coord_index]
+            y = coords.y_deg[coord_index]
+
+        elif v.x or v.y:
+            raise UserError('Target "{}" has only one coordinate.',
+                            v.name)
+
+        elif as_object_list:
+            return None
+
+        else:
+            system = x = y = None
+
+        if v.note:
+            note = v.note
+        else:
+            note = None
+
+        return v._replace(
+            system=system, x=x, y=y,
+            time=time, priority=priority, note=note)
 
     def to_object_list(self):
         """
         Returns a list of `TargetObject` instances representing members of the
         collection for which coordinates have been defined.
+
+        One array-valued coordinate object is constructed for each
+        coordinate system present, and then indexed to give the
+        coordinates of the individual targets.
         """
 
-        ans = []
+        targets = [
+            v for v in self.values() if not (v.x is None or v.y is None)]
 
-        for v in self.values():
-            if not (v.x is None or v.y is None):
-                ans.append(TargetObject(
-                    v.name, v.system,
-                    coord=coord_from_dec_deg(v.system, v.x, v.y),
-                    time=v.time))
+        coords = {}
+        for system in set(v.system for v in targets):
+            selected = [v for v in targets if v.system == system]
+            coords[system] = iter(coord_from_dec_deg(
+                system,
+                [v.x for v in selected], [v.y for v in selected]))
 
-        return ans
+        return [
+            TargetObject(
+                v.name, v.system, coord=next(coords[v.system]), time=v.time)
+            for v in targets]
 
     def to_frac_time_list(self):
         """
@@ -1128,14 +1188,44 @@ class TargetCollection(ResultCollection, CollectionOrdered,
         of `to_object_list`.
         """
 
-        objects = self.to_object_list()
+        return [
+            TargetFracTime(coord=v.coord, frac_time=frac_time)
+            for (v, frac_time) in self._iter_frac_time(self.to_object_list())]
 
-        n_target = len(objects)
-        total_time = self.total_time()
+    def to_frac_time_columns(self):
+        """
+        Returns a `TargetFracTimeColumns` tuple of lists of the coordinate
+        system, position (in decimal degrees) and fractional time
+        of each target, as would be given by `to_frac_time_list`.
 
-        ans = []
+        This allows the targets of many collections to be combined and
+        converted to a single coordinate object via
+        :func:`hedwig.astro.coord.coord_from_dec_deg_array`.
+        """
+
+        ans = TargetFracTimeColumns([], [], [], [])
+
+        for (v, frac_time) in self._iter_frac_time([
+                v for v in self.values()
+                if not (v.x is None or v.y is None)]):
+            ans.system.append(v.system)
+            ans.x.append(v.x)
+            ans.y.append(v.y)
+            ans.frac_time.append(frac_time)
+
+        return ans
+
+    def _iter_frac_time(self, targets):
+        """
+        Generator yielding each of the given targets (which should be those
+        with defined coordinates) together with its fraction of the
+        total time of the collection.
+        """
+
+        n_target = len(targets)
+        total_time = self.total_time()
 
-        for v in objects:
+        for v in targets:
             if total_time:
                 if v.time:
                     frac_time = v.time / total_time
@@ -1146,9 +1236,7 @@ class TargetCollection(ResultCollection, CollectionOrdered,
             else:
                 frac_time = 1.0 / n_target
 
-            ans.append(TargetFracTime(coord=v.coord, frac_time=frac_time))
-
-        return ans
+            yield (v, frac_time)
 
     def total_time(self):
         """
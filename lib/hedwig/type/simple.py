@@ -30,7 +30,7 @@ from ..db.meta import affiliation, \
     proposal, proposal_annotation, proposal_category, \
     proposal_fig, proposal_fig_link, proposal_pdf, proposal_pdf_link, \
     proposal_text, proposal_text_link, queue, \
-    request_prop_copy, request_prop_pdf, \
+    request_call_pdf, request_prop_copy, request_prop_pdf, \
     review, reviewer, reviewer_acceptance, \
     review_calculation, review_deadline, \
     review_fig, review_fig_link, \
@@ -239,6 +239,10 @@ PersonLog = namedtuple(
     [x.name for x in person_log.columns] +
     ['person_name', 'other_person_name', 'institution_name'])
 
+PreparedJSON = namedtuple(
+    'PreparedJSON',
+    ['data', 'etag', 'data_gzip'])
+
 PrevProposal = namedtuple(
     'PrevProposal',
     [x.name for x in prev_proposal.columns] +
@@ -311,6 +315,11 @@ ProposalText = namedtuple(
      if x.name not in ('id',)] +
     ['editor_name'])
 
+RequestCallPDF = namedtuple(
+    'RequestCallPDF',
+    [x.name for x in request_call_pdf.columns] +
+    ['requester_name'])
+
 RequestPropCopy = namedtuple(
     'RequestPropCopy',
     [x.name for x in request_prop_copy.columns] +
@@ -388,6 +397,9 @@ TargetCoord = namedtuple('TargetCoord', ('name', 'x', 'y', 'system'))
 
 TargetFracTime = namedtuple('TargetFracTime', ('coord', 'frac_time'))
 
+TargetFracTimeColumns = namedtuple(
+    'TargetFracTimeColumns', ('system', 'x', 'y', 'frac_time'))
+
 TargetObject = namedtuple('TargetObject', ('name', 'system', 'coord', 'time'))
 
 TargetToolInfo = namedtuple(
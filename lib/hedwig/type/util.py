@@ -178,14 +178,35 @@ def null_tuple(type_):
     return type_(*((None,) * len(type_._fields)))
 
 
+_extended_tuple_types = {}
+
+
+def _extended_tuple(obj, suffix, fields):
+    """
+    Get a named tuple type extending that of the given tuple
+    with additional fields.
+
+    The generated types are cached since creating a named tuple type
+    is much slower than creating an instance of one.
+    """
+
+    key = (type(obj), suffix)
+    type_ = _extended_tuple_types.get(key)
+
+    if type_ is None:
+        type_ = _extended_tuple_types[key] = namedtuple(
+            type(obj).__name__ + suffix, obj._fields + fields)
+
+    return type_
+
+
 def with_can_edit(obj, can_edit):
     """
     Add a `can_edit` field to a tuple and set it to the given value.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithCE',
-        obj._fields + ('can_edit',))(*obj, can_edit=can_edit)
+    return _extended_tuple(obj, 'WithCE', ('can_edit',))(
+        *obj, can_edit=can_edit)
 
 
 def with_can_view(obj, can_view):
@@ -193,9 +214,8 @@ def with_can_view(obj, can_view):
     Add a `can_view` field to a tuple and set it to the given value.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithCV',
-        obj._fields + ('can_view',))(*obj, can_view=can_view)
+    return _extended_tuple(obj, 'WithCV', ('can_view',))(
+        *obj, can_view=can_view)
 
 
 def with_can_view_edit(obj, can_view, can_edit):
@@ -203,10 +223,8 @@ def with_can_view_edit(obj, can_view, can_edit):
     Add `can_view` and `can_edit` fields to a tuple.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithCVE',
-        obj._fields + ('can_view', 'can_edit'))(
-            *obj, can_view=can_view, can_edit=can_edit)
+    return _extended_tuple(obj, 'WithCVE', ('can_view', 'can_edit'))(
+        *obj, can_view=can_view, can_edit=can_edit)
 
 
 def with_can_view_edit_rating(obj, can_view, can_edit, can_view_rating):
@@ -214,9 +232,8 @@ def with_can_view_edit_rating(obj, can_view, can_edit, can_view_rating):
     Add `can_view`, `can_edit` and `can_view_rating` fields to a tuple.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithCVER',
-        obj._fields + ('can_view', 'can_edit', 'can_view_rating'))(
+    return _extended_tuple(
+        obj, 'WithCVER', ('can_view', 'can_edit', 'can_view_rating'))(
             *obj, can_view=can_view, can_edit=can_edit,
             can_view_rating=can_view_rating)
 
@@ -226,9 +243,7 @@ def with_cache(obj, cache):
     Add a `cache` field to a tuple and set it to the given value.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithCache',
-        obj._fields + ('cache',))(*obj, cache=cache)
+    return _extended_tuple(obj, 'WithCache', ('cache',))(*obj, cache=cache)
 
 
 def with_deadline(obj, can_edit, deadline):
@@ -236,10 +251,8 @@ def with_deadline(obj, can_edit, deadline):
     Add `can_edit` and `deadline` fields to a tuple.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithDeadline',
-        obj._fields + ('can_edit', 'deadline',))(
-            *obj, can_edit=can_edit, deadline=deadline)
+    return _extended_tuple(obj, 'WithDeadline', ('can_edit', 'deadline'))(
+        *obj, can_edit=can_edit, deadline=deadline)
 
 
 def with_proposals(obj, proposal=None):
@@ -254,9 +267,8 @@ def with_proposals(obj, proposal=None):
     if proposal is not None:
         proposals.append(proposal)
 
-    return namedtuple(
-        type(obj).__name__ + 'WithProposals',
-        obj._fields + ('proposals',))(*obj, proposals=proposals)
+    return _extended_tuple(obj, 'WithProposals', ('proposals',))(
+        *obj, proposals=proposals)
 
 
 def with_sync_operation(obj, sync_operation, sync_update=()):
@@ -265,7 +277,5 @@ def with_sync_operation(obj, sync_operation, sync_update=()):
     to the given values.
     """
 
-    return namedtuple(
-        type(obj).__name__ + 'WithSO',
-        obj._fields + ('sync_operation', 'sync_update'))(
-            *obj, sync_operation=sync_operation, sync_update=sync_update)
+    return _extended_tuple(obj, 'WithSO', ('sync_operation', 'sync_update'))(
+        *obj, sync_operation=sync_operation, sync_update=sync_update)
@@ -19,10 +19,13 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from collections import namedtuple
+from datetime import datetime, timedelta
+from time import time
 
 from ..compat import first_value
 from ..email.format import render_email_template
 from ..error import ConsistencyError, NoSuchRecord, UserError
+from ..type.collection import ResultCollection
 from ..type.simple import ProposalWithCode, Link
 from ..type.enum import AttachmentState, MessageState, MessageThreadType, \
     PersonTitle, RequestState, SiteGroupType, UserLogEvent
@@ -33,6 +36,11 @@ from .base import ViewMember
 
 
 class AdminView(ViewMember):
+    # Time (in seconds) for which to cache message list counts.
+    message_count_expiry = 300
+
+    _message_count_cache = {}
+
     def home(self, current_user, facilities):
         return {
             'title': 'Site Administration',
@@ -80,11 +88,12 @@ class AdminView(ViewMember):
         url_params = {}       # Params for nav links.
         set_form_params = {}  # Extras for form -- url_params will be added.
         kwargs = {'limit': num_per_page}
+        count_kwargs = {}
 
         person_id = current_input.get('person_id')
         if person_id is not None:
             person_id = int(person_id)
-            kwargs['person_id'] = person_id
+            kwargs['person_id'] = count_kwargs['person_id'] = person_id
             url_params['person_id'] = person_id
 
         else:
@@ -95,15 +104,41 @@ class AdminView(ViewMember):
             state = None
         if state is not None:
             state = int(state)
-            kwargs['state'] = state
+            kwargs['state'] = count_kwargs['state'] = state
             url_params['state'] = state
 
+        date_after = current_input.get('date_after')
+        date_before = current_input.get('date_before')
+        try:
+            if date_after:
+                kwargs['date_after'] = count_kwargs['date_after'] = \
+                    datetime.strptime(date_after, '%Y-%m-%d')
+                url_params['date_after'] = date_after
+            if date_before:
+                # The form field is labeled "until", so include messages
+                # from the given day.
+                kwargs['date_before'] = count_kwargs['date_before'] = \
+                    datetime.strptime(date_before, '%Y-%m-%d') + \
+                    timedelta(days=1)
+                url_params['date_before'] = date_before
+        except ValueError:
+            raise ErrorPage('Could not parse date filter.')
+
         id_lt = current_input.get('id_lt')
         if id_lt is not None:
             id_lt = int(id_lt)
             kwargs['message_id_lt'] = id_lt
             set_form_params['id_lt'] = id_lt
 
+        id_gt = current_input.get('id_gt')
+        if id_gt is not None:
+            if id_lt is not None:
+                raise ErrorPage('Conflicting page parameters.')
+            id_gt = int(id_gt)
+            kwargs['message_id_gt'] = id_gt
+            kwargs['oldest_first'] = True
+            set_form_params['id_gt'] = id_gt
+
         # Include all URL params in the setting form.
         set_form_params.update(url_params)
 
@@ -122,24 +157,41 @@ class AdminView(ViewMember):
                 raise ErrorPage(
                     'Message list requested for non-existent person.')
 
-        # Retrieve messages.
+        # Retrieve messages.  If going backwards (id_gt), these will have been
+        # retrieved oldest first, so reverse them for display.
         messages = db.search_message(**kwargs)
 
-        # Prepare pagination URLs.  Give only "first" and "next" links as
-        # we can generate these with simple SQL constructs (id < x, limit).
+        if id_gt is not None:
+            messages = ResultCollection(reversed(list(messages.items())))
+
+        # Prepare pagination URLs.  These are based on the message
+        # identifiers (id < x or id > x, with a limit) rather than
+        # page numbers so that each page can be retrieved efficiently.
         target_first = None
+        target_prev = None
         target_next = None
 
-        if id_lt is not None:
+        if (id_lt is not None) or (id_gt is not None):
             target_first = url_for('.message_list', **url_params)
 
         # Guess that there are more messages if we have as many as the limit
         # specified.  (Might not be true if the number of messages is divisible
         # by the number per page.)
-        if len(messages) >= num_per_page:
+        if messages:
+            if (id_gt is None) or (len(messages) >= num_per_page):
+                if (id_lt is not None) or (id_gt is not None):
+                    target_prev = url_for(
+                        '.message_list', id_gt=max(messages.keys()),
+                        **url_params)
+
+            if (id_gt is not None) or (len(messages) >= num_per_page):
+                target_next = url_for(
+                    '.message_list', id_lt=min(messages.keys()),
+                    **url_params)
+
+        elif id_gt is not None:
             target_next = url_for(
-                '.message_list', id_lt=min(messages.keys()),
-                **url_params)
+                '.message_list', id_lt=(id_gt + 1), **url_params)
 
         return {
             'title': (
@@ -148,19 +200,48 @@ class AdminView(ViewMember):
                 '{}: Messages'.format(person.name)),
             'person': person,
             'messages': messages,
+            'message_count': self._get_message_count(db, count_kwargs),
             'target_first': target_first,
+            'target_prev': target_prev,
             'target_next': target_next,
             # Parameters for the filtering form at the top of the page:
             'form_params': {
                 k: v for (k, v) in url_params.items()
-                if k != 'state'},
+                if k not in ('state', 'date_after', 'date_before')},
             # Parameters for the state setting form (submit at bottom of page).
             'set_form_params': set_form_params,
             'current_state': state,
+            'current_date_after': date_after,
+            'current_date_before': date_before,
             'states': MessageState.get_options(is_system=True),
             'states_allowed': MessageState.get_options(),
         }
 
+    def _get_message_count(self, db, count_kwargs):
+        """
+        Get the number of messages matching the given search criteria.
+
+        Counts are cached for `message_count_expiry` seconds, since counting
+        all matching messages is slow when there are many of them.
+        """
+
+        key = (db._mem_id,) + tuple(sorted(count_kwargs.items()))
+        now = time()
+
+        cached = self._message_count_cache.get(key)
+        if (cached is not None) and (cached[0] > now):
+            return cached[1]
+
+        message_count = db.search_message_count(**count_kwargs)
+
+        if len(self._message_count_cache) >= 100:
+            self._message_count_cache.clear()
+
+        self._message_count_cache[key] = (
+            now + self.message_count_expiry, message_count)
+
+        return message_count
+
     def message_view(self, current_user, db, message_id):
         try:
             message = db.get_message(message_id)
@@ -29,6 +29,7 @@ from ..type.simple import Call, Person, Proposal, Reviewer
 from ..type.util import null_tuple
 from ..web.util import HTTPError, HTTPForbidden, \
     HTTPRedirectWithReferrer, url_for
+from . import lookup
 
 Authorization = namedtuple('Authorization', ('view', 'edit'))
 
@@ -257,6 +258,48 @@ def for_person_reviewer(
         auth_cache=auth_cache)
 
 
+def for_person_member_many(
+        current_user, db, facilities, members, auth_cache=None):
+    """
+    Determine authorization for person profiles for a dictionary of
+    member records.
+
+    The information required by :func:`for_person` is fetched once
+    and shared between the members, so the number of database queries
+    does not depend on the number of members.
+
+    :return: dictionary of `Authorization` objects, by member key.
+    """
+
+    if auth_cache is None:
+        auth_cache = {}
+
+    return {
+        key: for_person_member(
+            current_user, db, facilities, member, auth_cache=auth_cache)
+        for (key, member) in members.items()}
+
+
+def for_person_reviewer_many(
+        current_user, db, facilities, reviewers, auth_cache=None):
+    """
+    Determine authorization for person profiles for a dictionary of
+    reviewer records.
+
+    As :func:`for_person_member_many` but using :func:`for_person_reviewer`.
+
+    :return: dictionary of `Authorization` objects, by reviewer key.
+    """
+
+    if auth_cache is None:
+        auth_cache = {}
+
+    return {
+        key: for_person_reviewer(
+            current_user, db, facilities, reviewer, auth_cache=auth_cache)
+        for (key, reviewer) in reviewers.items()}
+
+
 def for_institution(
         current_user, db, facilities, institution, auth_cache=None):
     """
@@ -594,10 +637,9 @@ def for_review(
             # than making a new database search.
             if reviewer.role == role_class.FEEDBACK:
                 if proposal.reviewers is None:
-                    if db.search_reviewer(
-                            proposal_id=reviewer.proposal_id,
-                            person_id=person_id,
-                            role=role_class.get_feedback_roles()):
+                    if _has_review_role(
+                            auth_cache, db, reviewer.proposal_id, person_id,
+                            role_class.get_feedback_roles()):
                         return AuthorizationWithRating(*yes, view_rating=True)
                 else:
                     if proposal.reviewers.has_person(
@@ -644,6 +686,68 @@ def for_review(
     return AuthorizationWithRating(*no, view_rating=False)
 
 
+def for_review_many(
+        group_class, role_class,
+        current_user, db, reviewers, proposals, auth_cache=None,
+        skip_membership_test=False,
+        allow_unaccepted=None):
+    """
+    Determine the current user's authorization regarding multiple reviews.
+
+    `proposals` should be a dictionary of proposals by proposal ID.
+    `reviewers` can either be a dictionary of reviewer records, each of
+    which is considered with the proposal given by its `proposal_id`,
+    or `None` for non-reviewer-specific authorization for each proposal.
+
+    Group membership and the current user's own review roles for the
+    relevant proposals are fetched in advance, so that the number
+    of database queries does not depend on the number of reviews.
+    The remaining arguments are passed on to :func:`for_review`.
+
+    :return: dictionary of `AuthorizationWithRating` objects,
+        by the keys of `reviewers`, or of `proposals` if `reviewers`
+        is `None`.
+    """
+
+    if auth_cache is None:
+        auth_cache = {}
+
+    if (current_user.user is not None) and (current_user.person is not None):
+        person_id = current_user.person.id
+
+        _get_group_membership(auth_cache, db, person_id)
+
+        if reviewers is not None:
+            feedback_proposal_ids = set(
+                x.proposal_id for x in reviewers.values()
+                if x.role == role_class.FEEDBACK
+                and proposals[x.proposal_id].reviewers is None)
+
+            if feedback_proposal_ids:
+                _preload_review_roles(
+                    auth_cache, db, person_id, feedback_proposal_ids)
+
+    kwargs = {
+        'auth_cache': auth_cache,
+        'skip_membership_test': skip_membership_test,
+        'allow_unaccepted': allow_unaccepted,
+    }
+
+    if reviewers is None:
+        return {
+            key: for_review(
+                group_class, role_class, current_user, db, None, proposal,
+                **kwargs)
+            for (key, proposal) in proposals.items()}
+
+    return {
+        key: for_review(
+            group_class, role_class, current_user, db,
+            reviewer, proposals[reviewer.proposal_id],
+            **kwargs)
+        for (key, reviewer) in reviewers.items()}
+
+
 def for_review_prev_proposal(
         group_class, current_user, db, prev_proposal, members=None,
         auth_cache=None):
@@ -742,8 +846,10 @@ def find_addable_reviews(current_user, db, facilities, auth_cache=None):
     Find proposals for which the user can add reviews.
 
     This function only considers reviews which the user can "directly"
-    add --- i.e. for suitable proposals it calls
-    :func:`can_add_review_roles` with `include_indirect=False`.
+    add --- i.e. it applies the same rules as :func:`can_add_review_roles`
+    with `include_indirect=False`.  Candidate proposals are selected
+    by the database's `search_addable_review` method so that the members
+    and reviewers of other proposals do not need to be retrieved.
 
     :param db: database control object/
     :param facilities: dictionary of FacilityInfo objects.
@@ -751,7 +857,8 @@ def find_addable_reviews(current_user, db, facilities, auth_cache=None):
         **Providing this dictionary is strongly recommended.**
 
     :return ProposalCollection: proposals for which the user can add reviews,
-        with the reviewers attribute containing a ReviewerCollection of dummy
+        with the member attribute giving the PI and
+        the reviewers attribute containing a ReviewerCollection of dummy
         Review namedtuples for those reviews.
     """
 
@@ -759,31 +866,36 @@ def find_addable_reviews(current_user, db, facilities, auth_cache=None):
 
     # Assume that they can't add a review if they're not a member of any
     # review groups, so give up now if that is the case.
-    group_members = _get_group_membership(
-        auth_cache, db, current_user.person.id)
+    person_id = current_user.person.id
+    group_members = _get_group_membership(auth_cache, db, person_id)
     if not group_members:
         return ans
 
-    # Assume that reviews can only be added when proposals are in review
-    # states -- find such proposals.  Also search only for relevant queues.
-    proposals = db.search_proposal(
-        state=ProposalState.review_states(),
-        with_members=True, with_reviewers=True,
-        queue_id=set((x.queue_id for x in group_members.values())))
-
-    if not proposals:
-        return ans
-
     for facility in facilities.values():
         group_class = facility.view.get_group_types()
         role_class = facility.view.get_reviewer_roles()
         type_class = facility.view.get_call_types()
 
-        for proposal in proposals.values_by_facility(facility.id):
-            roles = can_add_review_roles(
-                group_class, type_class, role_class, current_user, db,
-                proposal, include_indirect=False,
-                auth_cache=auth_cache)
+        # Search only for relevant queues.
+        queue_ids = set(
+            x.queue_id for x in group_members.values()
+            if x.facility_id == facility.id)
+        if not queue_ids:
+            continue
+
+        cttee_queue_ids = set(
+            x.queue_id for x in group_members.values_by_group_type(
+                group_class.CTTEE, facility_id=facility.id))
+
+        for proposal in db.search_addable_review(
+                role_class, person_id, queue_ids,
+                cttee_queue_id=cttee_queue_ids).values():
+            excluded_roles = ProposalType.get_excluded_roles(proposal.type)
+
+            roles = [
+                x.role for x in proposal.reviewers.values()
+                if type_class.has_reviewer_role(proposal.call_type, x.role)
+                and x.role not in excluded_roles]
             if not roles:
                 continue
 
@@ -812,7 +924,7 @@ def _redirect_review_accept(reviewer):
 @memoized
 def _get_call(db, call_id):
     try:
-        return db.search_call(call_id=call_id).get_single()
+        return lookup.get_call(db, None, call_id)
     except NoSuchRecord:
         return None
 
@@ -835,6 +947,48 @@ def _get_proposal_co_membership(db, person_id):
         proposal_state=ProposalState.editable_states())
 
 
+def _has_review_role(auth_cache, db, proposal_id, person_id, roles):
+    """
+    Determine whether the person has a review of one of the given roles
+    for the proposal.
+
+    The person's review roles are cached by proposal (when an `auth_cache`
+    is given) and can be fetched for many proposals at once via
+    :func:`_preload_review_roles`.
+    """
+
+    review_roles = None
+
+    if auth_cache is not None:
+        review_roles = auth_cache.get(
+            ('_review_roles', person_id), {}).get(proposal_id)
+
+    if review_roles is None:
+        review_roles = _preload_review_roles(
+            auth_cache, db, person_id, (proposal_id,))[proposal_id]
+
+    return not review_roles.isdisjoint(roles)
+
+
+def _preload_review_roles(auth_cache, db, person_id, proposal_ids):
+    """
+    Fetch the person's review roles for the given proposals.
+
+    :return: dictionary of sets of roles by proposal ID.
+    """
+
+    ans = {x: set() for x in proposal_ids}
+
+    for reviewer in db.search_reviewer(
+            proposal_id=list(ans.keys()), person_id=person_id).values():
+        ans[reviewer.proposal_id].add(reviewer.role)
+
+    if auth_cache is not None:
+        auth_cache.setdefault(('_review_roles', person_id), {}).update(ans)
+
+    return ans
+
+
 @memoized
 def _get_site_group_membership(db, person_id):
     return db.search_site_group_member(person_id=person_id)
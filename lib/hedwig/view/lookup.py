@@ -0,0 +1,119 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+Request-scoped lookup of call, semester and queue records.
+
+These records are needed by many helper functions (and by the
+authorization module) while handling a single request.  The functions
+in this module store them in the Flask `g` object so that each is only
+retrieved from the database once per request.
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import functools
+
+from ..error import NoSuchRecord
+from ..web.util import flask_g, has_request_context
+
+_cache_attr = 'hedwig_lookup_cache'
+
+
+def request_memoized(f):
+    """
+    Decorator to cache database lookups for the duration of a request.
+
+    Expects the database object as the first argument.  Results are
+    keyed by the function name, the remaining arguments and the database's
+    review version, so that records are retrieved again if they are
+    updated during the request.  Outside of a request context,
+    no caching is performed.
+    """
+
+    @functools.wraps(f)
+    def decorated(db, *args):
+        if not has_request_context():
+            return f(db, *args)
+
+        cache = flask_g.setdefault(_cache_attr, {})
+        key = (f.__name__, db._mem_id, db.get_review_version()) + args
+
+        if key in cache:
+            return cache[key]
+
+        value = cache[key] = f(db, *args)
+        return value
+
+    return decorated
+
+
+def get_call(db, facility_id, call_id):
+    """
+    Get a call record, as given by the database `get_call` method.
+
+    :param facility_id: facility to which the call must belong,
+        or `None` to allow any facility
+
+    :raises NoSuchRecord: if the call is not found
+    """
+
+    return _check_facility(_get_call(db, call_id), facility_id, 'call')
+
+
+def get_semester(db, facility_id, semester_id):
+    """
+    Get a semester record, as given by the database `get_semester` method.
+
+    :raises NoSuchRecord: if the semester is not found
+    """
+
+    return _check_facility(
+        _get_semester(db, semester_id), facility_id, 'semester')
+
+
+def get_queue(db, facility_id, queue_id):
+    """
+    Get a queue record, as given by the database `get_queue` method.
+
+    :raises NoSuchRecord: if the queue is not found
+    """
+
+    return _check_facility(_get_queue(db, queue_id), facility_id, 'queue')
+
+
+def _check_facility(record, facility_id, name):
+    if (facility_id is not None) and (record.facility_id != facility_id):
+        raise NoSuchRecord('{} does not exist', name)
+
+    return record
+
+
+@request_memoized
+def _get_call(db, call_id):
+    return db.get_call(facility_id=None, call_id=call_id)
+
+
+@request_memoized
+def _get_semester(db, semester_id):
+    return db.get_semester(None, semester_id)
+
+
+@request_memoized
+def _get_queue(db, queue_id):
+    return db.get_queue(None, queue_id)
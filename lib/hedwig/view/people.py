@@ -91,7 +91,9 @@ class PeopleView(object):
                 register_only = ('register_only' in form)
 
                 user_id = db.authenticate_user(
-                    user_name, form['password'], remote_addr=remote_addr)
+                    user_name, form['password'], remote_addr=remote_addr,
+                    addr_failure_limit=int(get_config().get(
+                        'log_in', 'addr_failure_limit') or 0))
 
                 if user_id is None:
                     raise UserError('User name or password not recognised.')
@@ -1135,7 +1137,7 @@ class PeopleView(object):
             '{}: Proposals'.format(person.name))
 
     def _person_proposals(self, db, person_id, facilities, person, title):
-        all_proposals = db.search_proposal(person_id=person_id)
+        all_proposals = db.search_proposal(person_id=person_id, summary=True)
 
         proposals = []
 
@@ -1180,7 +1182,7 @@ class PeopleView(object):
         # which are editable in each proposal's actual state.)
         all_proposals = db.search_proposal(
             reviewer_person_id=person_id,
-            with_members=True,
+            with_members=True, summary=True,
             state=(None if view_all else ProposalState.review_states()))
         calls = set((x.call_id for x in all_proposals.values()))
 
@@ -1208,14 +1210,20 @@ class PeopleView(object):
 
             facility_proposals = ProposalCollection()
 
-            for proposal in all_proposals.values_by_facility(facility.id):
+            facility_all_proposals = all_proposals.map_values(
+                filter_value=(lambda x: x.facility_id == facility.id))
+
+            facility_can = auth.for_review_many(
+                group_class, role_class, current_user, db,
+                facility_all_proposals.map_values(lambda x: x.reviewer),
+                {x.id: x for x in facility_all_proposals.values()},
+                auth_cache=auth_cache, allow_unaccepted=True)
+
+            for (reviewer_id, proposal) in facility_all_proposals.items():
                 # Filter reviews by edit permission.  But show all reviews
                 # when viewing the administrative version of this page,
                 # and exclude rejected reviews otherwise.
-                can = auth.for_review(
-                    group_class, role_class, current_user, db,
-                    proposal.reviewer, proposal,
-                    auth_cache=auth_cache, allow_unaccepted=True)
+                can = facility_can[reviewer_id]
                 if as_admin or (can.edit and (
                         proposal.reviewer.review_state
                         != ReviewState.REJECTED)):
@@ -1251,7 +1259,6 @@ class PeopleView(object):
                             *proposal,
                             code=facility.view.make_proposal_code(
                                 db, proposal))._replace(
-                            member=proposal.members.get_pi(default=None),
                             reviewers=proposal_reviewers,
                             members=None, reviewer=None)
 
@@ -1299,7 +1306,8 @@ class PeopleView(object):
 
         proposals = {}
         if proposal_ids:
-            proposals = db.search_proposal(proposal_id=proposal_ids)
+            proposals = db.search_proposal(
+                proposal_id=proposal_ids, summary=True)
 
         events = OrderedDict()
         for (event_id, event) in raw_events.items():
@@ -1566,7 +1574,8 @@ class PeopleView(object):
             for m in members.values()
             if m.person_id not in persons]
 
-        all_proposals = db.search_proposal(proposal_id=proposal_ids)
+        all_proposals = db.search_proposal(
+            proposal_id=proposal_ids, summary=True)
 
         proposals = []
         for facility in facilities.values():
@@ -18,15 +18,27 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from codecs import utf_8_encode
+from collections import namedtuple
+from hashlib import md5
 import json
+from threading import Lock
+from time import time
+import zlib
 
 import requests
 
 from ..compat import str_to_unicode
 from ..config import get_countries
+from ..type.simple import PreparedJSON
 from ..web.util import HTTPError, HTTPForbidden
+from .util import int_or_none
 from . import auth
 
+DirectoryCacheEntry = namedtuple(
+    'DirectoryCacheEntry',
+    ('version', 'expiry', 'entries', 'words', 'prepared'))
+
 
 class QueryView(object):
     cadc_name_resolver = \
@@ -34,6 +46,15 @@ class QueryView(object):
 
     fixed_name_responses = {}
 
+    # Time (in seconds) for which cached person and institution lists
+    # are used.  Lists are regenerated sooner if the database object's
+    # directory version changes, but this is not affected by changes
+    # made by other processes.
+    directory_cache_expiry = 60
+
+    # Whether to prepare gzip-compressed versions of cached lists.
+    directory_cache_gzip = True
+
     def __init__(self):
         # Prepare JSON version of the country list.
         self.country_list_json = json.dumps([
@@ -44,10 +65,26 @@ class QueryView(object):
             for (code, name) in get_countries().items()
         ])
 
+        self._directory_cache = {}
+        self._directory_cache_lock = Lock()
+
     def get_country_list(self):
         return self.country_list_json
 
-    def get_institution_list(self, db):
+    def get_institution_list(self, db, args):
+        """
+        Get the list of institutions.
+
+        The complete list is returned as a `PreparedJSON` tuple unless
+        the query argument `q` is given, in which case only matching
+        entries (up to the number given by `limit`, if specified)
+        are returned.
+        """
+
+        return self._get_directory_list(
+            db, ('institution',), self._make_institution_list, args)
+
+    def _make_institution_list(self, db):
         countries = get_countries()
         institutions = []
 
@@ -93,15 +130,27 @@ class QueryView(object):
 
         return institutions
 
-    def get_person_list(self, current_user, db, facilities, public):
-        countries = get_countries()
-        persons = []
+    def get_person_list(self, current_user, db, facilities, public, args):
+        """
+        Get the list of registered persons, either all or only
+        those with public profiles.
+
+        The result is as described for :meth:`get_institution_list`.
+        """
 
         if not public:
             can = auth.for_person_list(current_user, db, facilities)
             if not can.view:
                 raise HTTPForbidden('Permission denied.')
 
+        return self._get_directory_list(
+            db, ('person', public),
+            (lambda db: self._make_person_list(db, public)), args)
+
+    def _make_person_list(self, db, public):
+        countries = get_countries()
+        persons = []
+
         for person in db.search_person(
                 registered=True, public=public,
                 with_institution=True).values():
@@ -139,6 +188,74 @@ class QueryView(object):
 
         return persons
 
+    def _get_directory_list(self, db, key, make_entries, args):
+        """
+        Get a list of directory entries, using the cached version if
+        still valid.
+
+        :param db: database control object
+        :param key: cache key
+        :param make_entries: function to generate the list of entries,
+            given the database control object
+        :param args: request arguments
+
+        :return: a `PreparedJSON` tuple, or a list of entries if searching
+        """
+
+        version = db.get_directory_version()
+        now = time()
+
+        with self._directory_cache_lock:
+            cache_entry = self._directory_cache.get(key)
+
+        if ((cache_entry is None) or (cache_entry.version != version)
+                or (cache_entry.expiry < now)):
+            entries = make_entries(db)
+            data = json.dumps(entries)
+            data_bytes = utf_8_encode(data)[0]
+
+            data_gzip = None
+            if self.directory_cache_gzip:
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+                data_gzip = (
+                    compressor.compress(data_bytes) + compressor.flush())
+
+            cache_entry = DirectoryCacheEntry(
+                version=version,
+                expiry=(now + self.directory_cache_expiry),
+                entries=entries,
+                words=[
+                    frozenset(_search_words(
+                        x['text_full'] + ' ' + x['text_abbr']))
+                    for x in entries],
+                prepared=PreparedJSON(
+                    data=data,
+                    etag=md5(data_bytes).hexdigest(),
+                    data_gzip=data_gzip))
+
+            with self._directory_cache_lock:
+                self._directory_cache[key] = cache_entry
+
+        query = args.get('q', '')
+        if not query:
+            return cache_entry.prepared
+
+        try:
+            limit = int_or_none(args.get('limit', ''))
+        except ValueError:
+            raise HTTPError('Invalid limit value.')
+        query_words = _search_words(query)
+        result = []
+
+        for (entry, words) in zip(cache_entry.entries, cache_entry.words):
+            if all(any(x.startswith(y) for x in words) for y in query_words):
+                result.append(entry)
+
+                if (limit is not None) and (len(result) >= limit):
+                    break
+
+        return result
+
     @classmethod
     def add_fixed_name_response(
             cls, target, response, format_='json',
@@ -170,6 +287,14 @@ class QueryView(object):
             raise HTTPError('Failed to resolve name via CADC.')
 
 
+def _search_words(value):
+    """
+    Split a string into lower case words for searching.
+    """
+
+    return value.lower().replace(',', ' ').split()
+
+
 def truncate(value, length, abbreviation=None):
     if value is None:
         return ''
@@ -25,7 +25,7 @@ from ..error import NoSuchRecord
 from ..type.enum import PermissionType
 from ..web.util import HTTPError, HTTPForbidden, HTTPNotFound
 from ..type.util import with_cache
-from . import auth
+from . import auth, lookup
 
 
 def count_words(text):
@@ -112,7 +112,7 @@ def with_call_review(permission):
             group_class = self.get_group_types()
 
             try:
-                call = db.get_call(facility_id=self.id_, call_id=call_id)
+                call = lookup.get_call(db, self.id_, call_id)
             except NoSuchRecord:
                 raise HTTPNotFound('Call not found')
 
@@ -372,7 +372,7 @@ def with_queue(f):
     def decorated(
             self, current_user, db, queue_id, *args, **kwargs):
         try:
-            queue = db.get_queue(self.id_, queue_id)
+            queue = lookup.get_queue(db, self.id_, queue_id)
         except NoSuchRecord:
             raise HTTPNotFound('Queue not found.')
 
@@ -21,16 +21,22 @@ from __future__ import absolute_import, division, print_function, \
 from itertools import count
 import logging
 import os
+from timeit import default_timer
 
-from flask import Flask
+from flask import Flask, Response
 from flask import g as flask_g
+from flask import request as flask_request
 from jinja2_orderblocks import OrderBlocks
 
 from ..config import get_config, get_database, get_facilities, get_home
+from ..db.instrument import instrument_engine, \
+    start_query_stats, stop_query_stats
+from ..metrics import Metrics, read_metrics_file
 from ..type.enum import MessageThreadType, SiteGroupType
+from .format import format_cache
 from .template_util import register_template_utils
-from .util import CurrentUserFormatter, check_current_user, \
-    make_enum_converter, register_error_handlers
+from .util import CurrentUserFormatter, HTTPForbidden, check_current_user, \
+    check_fixed_current_user, make_enum_converter, register_error_handlers
 
 from .blueprint.admin import create_admin_blueprint
 from .blueprint.facility import create_facility_blueprint
@@ -61,7 +67,9 @@ def create_web_app(
         logger.  (Otherwise it is configured to log to the file specified
         in the configuration file.)
     :param without_auth: if `True`, do not set up the `before_request`
-        function to check for log in information.
+        function to check for log in information.  Instead fixed log in
+        information can be supplied via the request environment,
+        as described for :func:`~hedwig.web.util.check_fixed_current_user`.
     :param _test_return_extra: if true, instead of just returning the
         application object, return a dictionary of values useful for
         debugging.  (Currently just returns the output of `locals()`.)
@@ -172,12 +180,27 @@ def create_web_app(
             create_facility_blueprint(db, facility.view),
             url_prefix='/' + facility.code)
 
+    # Set up statistics collection first so that it covers the other
+    # beginning of request functions.
+    if config.getboolean('query_stats', 'enable'):
+        _configure_query_stats(app, db, config)
+
+    if config.getboolean('metrics', 'enable'):
+        _configure_metrics(app, db, config)
+
     if not without_auth:
         # Add beginning of request function to check session for user log in.
         @app.before_request
         def _check_current_user():
             check_current_user(db)
 
+    else:
+        # Add beginning of request function to apply any fixed log in
+        # information supplied via the request environment.
+        @app.before_request
+        def _check_fixed_current_user():
+            check_fixed_current_user()
+
     @app.context_processor
     def add_to_context():
         return {
@@ -193,3 +216,162 @@ def create_web_app(
         return locals()
 
     return app
+
+
+def _get_file_logger(name, filename):
+    """
+    Get a logger which writes to the given file.
+
+    Loggers are shared by the whole process, so the file handler is only
+    added if the logger does not already have one for this file (e.g.
+    from a previous call to :func:`create_web_app`).
+    """
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+
+    filename = os.path.abspath(filename)
+
+    if not any((isinstance(x, logging.FileHandler)
+                and x.baseFilename == filename)
+               for x in logger.handlers):
+        file_handler = logging.FileHandler(filename)
+        file_handler.setFormatter(logging.Formatter(
+            fmt='%(asctime)s %(message)s',
+            datefmt='%Y-%m-%dT%H:%M:%S'))
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+def _configure_query_stats(app, db, config):
+    """
+    Set up per-request collection of database query statistics.
+    """
+
+    instrument_engine(db._engine)
+
+    response_header = config.getboolean('query_stats', 'response_header')
+    n_slowest = int(config.get('query_stats', 'n_slowest'))
+    slow_query_time = float(config.get('query_stats', 'slow_query_time'))
+
+    slow_query_logger = app.logger
+    slow_query_log = config.get('query_stats', 'slow_query_log')
+    if slow_query_log:
+        slow_query_logger = _get_file_logger(
+            'hedwig.slow_query', slow_query_log)
+
+    @app.before_request
+    def _start_query_stats():
+        flask_g.query_stats = start_query_stats(n_slowest=n_slowest)
+
+    if response_header:
+        @app.after_request
+        def _add_query_stats_header(response):
+            stats = flask_g.get('query_stats')
+            if stats is not None:
+                response.headers['X-Hedwig-Query-Stats'] = \
+                    stats.format_header()
+            return response
+
+    @app.teardown_request
+    def _stop_query_stats(exception):
+        stats = flask_g.pop('query_stats', None)
+        if stats is None:
+            return
+
+        stop_query_stats()
+
+        for query in stats.slowest:
+            if query.duration < slow_query_time:
+                break
+
+            slow_query_logger.warning(
+                'Slow query ({:.3f}s) for {}: {}'.format(
+                    query.duration, flask_request.path,
+                    ' '.join(query.statement.split())))
+
+
+def _configure_metrics(app, db, config):
+    """
+    Set up recording of request metrics and the metrics endpoint.
+
+    Database statistics are taken from the query statistics of the
+    request, if these are being collected, or otherwise collected
+    separately.
+    """
+
+    instrument_engine(db._engine)
+
+    metrics = Metrics(process='web')
+    metrics.add_cache('format', format_cache.get_stats)
+
+    allow_address = [
+        x.strip() for x in config.get('metrics', 'allow_address').split(',')]
+    poll_file = config.get('metrics', 'poll_file')
+
+    log_interval = float(config.get('metrics', 'log_interval'))
+    log_file = config.get('metrics', 'log_file')
+    summary_logger = None
+    if log_interval and log_file:
+        summary_logger = _get_file_logger('hedwig.metrics', log_file)
+
+    summary_time = [default_timer()]
+
+    @app.before_request
+    def _start_request_metrics():
+        flask_g.metrics_start = default_timer()
+
+        if flask_g.get('query_stats') is None:
+            flask_g.metrics_query_stats = start_query_stats(n_slowest=0)
+
+    @app.after_request
+    def _record_response_status(response):
+        flask_g.metrics_status = response.status_code
+        return response
+
+    # Note: teardown functions are called in the reverse order of
+    # registration, so this is called before the query statistics
+    # teardown function (if present) removes them.
+    @app.teardown_request
+    def _record_request_metrics(exception):
+        start = flask_g.pop('metrics_start', None)
+        if start is None:
+            return
+
+        stats = flask_g.pop('metrics_query_stats', None)
+        if stats is not None:
+            stop_query_stats()
+        else:
+            stats = flask_g.get('query_stats')
+
+        now = default_timer()
+
+        # Requests which do not match a route (e.g. 404 errors) have
+        # no endpoint.
+        metrics.record_request(
+            (flask_request.endpoint or 'none'),
+            flask_g.pop('metrics_status', 500),
+            now - start,
+            db_time=(None if stats is None else stats.time),
+            db_queries=(None if stats is None else stats.count))
+
+        if (summary_logger is not None) and (
+                now >= summary_time[0] + log_interval):
+            summary_time[0] = now
+
+            for line in metrics.format_summary():
+                summary_logger.info(line)
+
+    def metrics_endpoint():
+        if flask_request.remote_addr not in allow_address:
+            raise HTTPForbidden('Access to metrics is not permitted.')
+
+        text = metrics.format_prometheus()
+
+        if poll_file:
+            text += read_metrics_file(poll_file)
+
+        return Response(text, mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -143,6 +143,43 @@ def create_facility_blueprint(db, facility):
     def review_call(current_user, call_id):
         return facility.view_review_call(current_user, db, call_id)
 
+    @bp.route('/call/<int:call_id>/review/pdf', methods=['GET', 'POST'])
+    @require_auth()
+    @facility_template('call_review_pdf_request.html')
+    def review_call_pdf_request(current_user, call_id):
+        return facility.view_review_call_pdf_request(
+            current_user, db, call_id,
+            (request.form if request.method == 'POST' else None))
+
+    @bp.route('/call/<int:call_id>/review/pdf/<int:request_id>/')
+    @require_auth()
+    @facility_template('call_review_pdf_request_status.html')
+    def review_call_pdf_request_status(current_user, call_id, request_id):
+        return facility.view_review_call_pdf_request_status(
+            current_user, db, call_id, request_id)
+
+    @bp.route('/call/<int:call_id>/review/pdf/<int:request_id>/query')
+    @require_auth()
+    @send_json()
+    def review_call_pdf_request_query(current_user, call_id, request_id):
+        return facility.view_review_call_pdf_request_query(
+            current_user, db, call_id, request_id)
+
+    @bp.route('/call/<int:call_id>/review/pdf/<int:request_id>/download')
+    @require_auth()
+    @send_file()
+    def review_call_pdf_download(current_user, call_id, request_id):
+        return facility.view_review_call_pdf_download(
+            current_user, db, call_id, request_id)
+
+    @bp.route(
+        '/call/<int:call_id>/review/pdf/<int:request_id>/download/merged')
+    @require_auth()
+    @send_file()
+    def review_call_pdf_download_merged(current_user, call_id, request_id):
+        return facility.view_review_call_pdf_download(
+            current_user, db, call_id, request_id, merged=True)
+
     @bp.route('/call/<int:call_id>/review/tabulation')
     @require_auth()
     @facility_template('call_review_tabulation.html')
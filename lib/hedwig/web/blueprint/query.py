@@ -41,7 +41,7 @@ def create_query_blueprint(db, facilities):
     @bp.route('/institutions')
     @send_json(allow_cache=True, cache_max_age=10)
     def institution_list():
-        return view.get_institution_list(db)
+        return view.get_institution_list(db, request.args)
 
     @bp.route('/nameresolver')
     @send_file(allow_cache=True, cache_max_age=3600, cache_private=False)
@@ -52,12 +52,14 @@ def create_query_blueprint(db, facilities):
     @require_auth()
     @send_json(allow_cache=True, cache_max_age=60)
     def person_list(current_user):
-        return view.get_person_list(current_user, db, facilities, public=True)
+        return view.get_person_list(
+            current_user, db, facilities, public=True, args=request.args)
 
     @bp.route('/people/all')
     @require_auth()
     @send_json(allow_cache=True, cache_max_age=60)
     def person_list_all(current_user):
-        return view.get_person_list(current_user, db, facilities, public=None)
+        return view.get_person_list(
+            current_user, db, facilities, public=None, args=request.args)
 
     return bp
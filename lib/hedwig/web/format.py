@@ -18,16 +18,22 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from hashlib import md5
 import re
 
 from markupsafe import Markup
 
+from ..config import MemoCache
 from ..format.rst import rst_to_html
 from ..format.markdown import markdown_to_html
 from ..type.enum import FormatType, MessageFormatType
 from .util import get_logger, HTTPError
 
 
+# Cache of formatted RST and Markdown text.
+format_cache = MemoCache(max_size=1000)
+
+
 def format_text(text, format=None, as_inline=False):
     """
     Format text, possibly using different formatting schemes.
@@ -105,7 +111,8 @@ def format_text_rst(text, extract_title_toc=False, start_heading=3):
     """
     Format RST for display as HTML.
 
-    This applies the :func:`hedwig.format.rst.rst_to_html` function.
+    This applies the :func:`hedwig.format.rst.rst_to_html` function,
+    via the `format_cache`.
 
     :param text: text marked up as RST for formatting
     :param extract_title_toc: indicate whether to extract title and TOC
@@ -117,27 +124,69 @@ def format_text_rst(text, extract_title_toc=False, start_heading=3):
         and a list of TOC items.
     """
 
-    (body, title, toc) = rst_to_html(
-        text, extract_title=extract_title_toc,
-        start_heading=start_heading)
+    (body, title, toc) = _format_text_cached(
+        FormatType.RST, _FormatCacheText(text), start_heading,
+        extract_title_toc)
 
     if not extract_title_toc:
         return Markup(body)
 
     else:
-        return (Markup(body), Markup(title), toc)
+        return (Markup(body), Markup(title), list(toc))
 
 
 def format_text_markdown(text, start_heading=3):
     """
     Format Markdown for display as HTML.
+
+    This applies the :func:`hedwig.format.markdown.markdown_to_html`
+    function, via the `format_cache`.
     """
 
-    body = markdown_to_html(text, start_heading=start_heading)
+    body = _format_text_cached(
+        FormatType.MD, _FormatCacheText(text), start_heading, False)
 
     return Markup(body)
 
 
+class _FormatCacheText(object):
+    """
+    Wrapper for text passed to :func:`_format_text_cached`.
+
+    The `_mem_id` attribute, used by :class:`hedwig.config.MemoCache`
+    as the key, is a digest of the text so that the cache does not
+    retain a copy of every text it has formatted.
+    """
+
+    __slots__ = ('text', '_mem_id')
+
+    def __init__(self, text):
+        self.text = text
+        self._mem_id = md5(text.encode('utf-8')).digest()
+
+
+@format_cache
+def _format_text_cached(format, text, start_heading, extract_title):
+    """
+    Convert RST or Markdown text to HTML, via the `format_cache`.
+
+    :param text: a `_FormatCacheText` object
+
+    :return: the HTML body, or for RST, a tuple of the body, title and
+        a list of TOC items, which should not be modified
+    """
+
+    if format == FormatType.RST:
+        return rst_to_html(
+            text.text, extract_title=extract_title,
+            start_heading=start_heading)
+
+    elif format == FormatType.MD:
+        return markdown_to_html(text.text, start_heading=start_heading)
+
+    raise HTTPError('Unknown format type.')
+
+
 def format_message_text(text, format=None):
     """
     Format message text, using different formatting types.
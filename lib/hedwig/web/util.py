@@ -53,11 +53,15 @@ except ImportError:
 
 from ..compat import ExceptionWithMessage, string_type
 from ..error import NoSuchRecord, UserError
-from ..type.simple import CurrentUser, DateAndTime, Person, UserInfo
+from ..type.simple import CurrentUser, DateAndTime, Person, PreparedJSON, \
+    UserInfo
 from ..type.enum import FigureType, FileTypeInfo
 from ..type.util import null_tuple
 from ..util import FormattedLogger
 
+# Key used to pass fixed log-in information in a WSGI environment.
+fixed_current_user_environ_key = 'hedwig.fixed_current_user'
+
 
 class CurrentUserFormatter(Formatter):
     """Log entry formatter which includes information
@@ -584,6 +588,12 @@ def send_json(
     """
     Decorator for route functions which return JSON.
 
+    The function may return a
+    :class:`~hedwig.type.simple.PreparedJSON` tuple instead of
+    a value to be encoded.  In this case the given `etag` (if not `None`)
+    is used to answer conditional requests and the `data_gzip`
+    version (if not `None`) is sent to clients which accept it.
+
     :raises Exception: if applied to a function with an attribute
         `_hedwig_require_auth` because :func:`require_auth` should be
         the outermost decorator.
@@ -595,9 +605,15 @@ def send_json(
 
         @functools.wraps(f)
         def decorated_function(*args, **kwargs):
-            response = _FlaskResponse(
-                json.dumps(f(*args, **kwargs)),
-                mimetype='application/json')
+            result = f(*args, **kwargs)
+
+            if isinstance(result, PreparedJSON):
+                response = _make_prepared_json_response(result)
+
+            else:
+                response = _FlaskResponse(
+                    json.dumps(result),
+                    mimetype='application/json')
 
             if allow_cache:
                 _set_response_caching(response, cache_max_age, cache_private)
@@ -609,6 +625,36 @@ def send_json(
     return decorator
 
 
+def _make_prepared_json_response(prepared):
+    """
+    Prepare Flask response for a `PreparedJSON` tuple.
+    """
+
+    etag = prepared.etag
+
+    if prepared.data_gzip is None:
+        response = _FlaskResponse(prepared.data, mimetype='application/json')
+
+    else:
+        response = _FlaskResponse(mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+
+        if 'gzip' in _flask_request.accept_encodings:
+            response.set_data(prepared.data_gzip)
+            response.content_encoding = 'gzip'
+            if etag is not None:
+                etag += '-gzip'
+
+        else:
+            response.set_data(prepared.data)
+
+    if etag is not None:
+        response.set_etag(etag)
+        response.make_conditional(_flask_request)
+
+    return response
+
+
 def _set_response_caching(response, max_age, private):
     response.cache_control.max_age = max_age
     if private:
@@ -720,6 +766,29 @@ def _make_response(template, result, status=None):
     return resp
 
 
+def check_fixed_current_user():
+    """
+    Apply fixed log-in information from the WSGI environment.
+
+    If the request environment contains a
+    :class:`~hedwig.type.simple.CurrentUser` object under the key
+    `fixed_current_user_environ_key`, store it as the `current_user`
+    entry in the Flask `g` variable.
+
+    This is registered as a `before_request` function, in place of
+    :func:`check_current_user`, by the
+    :func:`~hedwig.web.app.create_web_app` function when the application
+    is created without authentication.  Since the information is carried
+    by each request, rather than by the application, separate requests
+    can be made with different identities concurrently.
+    """
+
+    current_user = _flask_request.environ.get(fixed_current_user_environ_key)
+
+    if current_user is not None:
+        flask_g.current_user = current_user
+
+
 def check_current_user(db):
     """
     Check the user's session for log in information.
@@ -79,10 +79,8 @@ class DBTestCase(DummyConfigTestCase):
         self.db = get_dummy_database(facility_spec=self.facility_spec)
 
         self.orig_auth_rounds = auth._rounds
-        self.orig_hash_delay = auth.password_hash_delay
 
         auth._rounds = 10
-        auth.password_hash_delay = 0
 
     def tearDown(self):
         super(DBTestCase, self).tearDown()
@@ -90,7 +88,6 @@ class DBTestCase(DummyConfigTestCase):
         del self.db
 
         auth._rounds = self.orig_auth_rounds
-        auth.password_hash_delay = self.orig_hash_delay
 
     def _create_test_call(
             self, semester_name='test', queue_name='test', facility_id=None,
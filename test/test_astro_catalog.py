@@ -18,11 +18,16 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from random import Random
+import warnings
+
 from astropy.coordinates import SkyCoord
+from astropy.utils.exceptions import AstropyWarning
 
 from hedwig.astro.catalog import parse_source_list, write_source_list
-from hedwig.astro.coord import CoordSystem
+from hedwig.astro.coord import CoordSystem, coord_to_dec_deg, parse_coord
 from hedwig.compat import byte_type
+from hedwig.error import UserError
 from hedwig.type.collection import TargetCollection
 from hedwig.type.simple import TargetFracTime, TargetObject
 
@@ -118,3 +123,140 @@ class AstroCatalogTest(TestCase):
             self.assertIsInstance(frac_time, TargetFracTime)
             self.assertIsInstance(frac_time.coord, SkyCoord)
             self.assertAlmostEqual(frac_time.frac_time, 0.25)
+
+    def test_catalog_bulk(self):
+        # Perform some randomly defined tests, comparing the result of
+        # parsing a whole catalog with parsing each target individually.
+        # Each catalog is generated from its own seed so that any failure
+        # can be reproduced.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', AstropyWarning)
+
+            for seed in range(0, 20):
+                # Make every other catalog potentially invalid.
+                invalid_fraction = 0.05 * (seed % 2)
+
+                try:
+                    self._check_catalog_bulk(Random(seed), invalid_fraction)
+
+                except AssertionError as e:
+                    raise AssertionError(
+                        'Catalog with seed {}: {}'.format(seed, e))
+
+    def _check_catalog_bulk(self, rng, invalid_fraction):
+        entries = [
+            _random_catalog_entry(
+                rng, 'T{}'.format(j),
+                valid=(rng.random() >= invalid_fraction))
+            for j in range(0, rng.randint(1, 200))]
+
+        catalog = '\n'.join(' '.join(x) for x in entries).encode('ascii')
+
+        expected = {}
+        for (j, (name, x, y, system_name)) in enumerate(entries, 1):
+            try:
+                expected[j] = parse_coord(
+                    _catalog_systems[system_name], x, y, name)
+            except UserError:
+                expected[j] = None
+
+        if any(x is None for x in expected.values()):
+            with self.assertRaises(UserError) as cm:
+                parse_source_list(catalog)
+
+            # All errors should be reported, with line numbers.
+            for (j, coord) in expected.items():
+                if coord is None:
+                    self.assertIn('Line {}: '.format(j), cm.exception.message)
+                else:
+                    self.assertNotIn(
+                        'Line {}: '.format(j), cm.exception.message)
+
+            return
+
+        result = parse_source_list(catalog)
+        self.assertEqual(list(result.keys()), list(expected.keys()))
+
+        for (j, coord) in expected.items():
+            self.assertEqual(
+                (result[j].x, result[j].y), coord_to_dec_deg(coord))
+
+        result = parse_source_list(catalog, as_object_list=True)
+        self.assertEqual(len(result), len(expected))
+
+        for (target, coord) in zip(result, expected.values()):
+            self.assertEqual(
+                coord_to_dec_deg(target.coord), coord_to_dec_deg(coord))
+
+    def test_catalog_errors(self):
+        catalog = b'''Good1 16:52:51 +56:52:40 ICRS
+NoSystem 16:52:51 +56:52:40
+Good2 3.75 -3.43 Galactic
+BadDec 12:18:50 +94:24:59 ICRS
+BadTime 12:34:56 +17:08:09 ICRS one
+'''
+
+        with self.assertRaises(UserError) as cm:
+            parse_source_list(catalog)
+
+        self.assertEqual(
+            cm.exception.message,
+            'The target list could not be read: '
+            'Line 2: No coordinate system given for "NoSystem". '
+            'Line 4: Could not parse coordinates for "BadDec": '
+            'Latitude angle(s) must be within -90 deg <= angle <= 90 deg, '
+            'got 94.41638888888889 deg (value error) '
+            'Line 5: Could not parse time for "BadTime".')
+
+
+_catalog_systems = {
+    'ICRS': CoordSystem.ICRS,
+    'Galactic': CoordSystem.GAL,
+}
+
+
+def _random_catalog_entry(rng, name, valid=True):
+    """
+    Generate a random catalog entry, using a variety of coordinate
+    formats.  If not `valid`, the values may be out of range.
+    """
+
+    system_name = rng.choice(list(_catalog_systems.keys()))
+    is_icrs = (system_name == 'ICRS')
+
+    x_max = (24 if is_icrs else 360) * (1 if valid else 2)
+    y_max = 90 * (1 if valid else 2)
+
+    return (
+        name,
+        _random_coordinate(rng, x_max, is_icrs),
+        _random_coordinate(rng, y_max, True),
+        system_name)
+
+
+def _random_coordinate(rng, max_, signed):
+    format_ = rng.randint(0, 5)
+    sign = rng.choice(('', '+', '-')) if signed else ''
+
+    if format_ == 0:
+        return '{}{}'.format(sign, rng.uniform(0, max_))
+
+    elif format_ == 1:
+        return '{}{}'.format(sign, rng.randint(0, max_))
+
+    elif format_ == 5:
+        return '{}{}d{}m{}s'.format(
+            sign, rng.randint(0, max_ - 1),
+            rng.randint(0, 59), rng.randint(0, 59))
+
+    d = rng.randint(0, max_ - 1)
+    m = rng.randint(0, 59)
+
+    if format_ == 2:
+        s = '{:02d}'.format(rng.randint(0, 60))
+    elif format_ == 3:
+        s = '{:05.2f}'.format(rng.uniform(0, 60))
+    else:
+        s = '{:.3e}'.format(rng.uniform(0, 60))
+
+    return '{}{:02d}:{:02d}:{}'.format(sign, d, m, s)
@@ -19,12 +19,22 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from collections import OrderedDict
+from datetime import datetime
+import warnings
 
-from astropy.coordinates import SkyCoord
+from astropy import units
+from astropy.coordinates import AltAz, SkyCoord
+from astropy.time import Time
+from astropy.utils.exceptions import AstropyWarning
+from numpy import arange, linspace, newaxis
 
 from hedwig.astro.coord import CoordSystem, CoordWithFmt, \
     parse_coord, format_coord, format_coord_all_systems, \
-    coord_to_dec_deg, coord_from_dec_deg
+    coord_to_dec_deg, coord_from_dec_deg, coord_from_dec_deg_array, \
+    ra_hour_bin, \
+    calculate_altitude_analytic, get_earth_location
+from hedwig.type.simple import FacilityObsInfo
+from hedwig.type.util import null_tuple
 from hedwig.compat import string_type
 from hedwig.error import UserError
 
@@ -115,6 +125,27 @@ class AstroCoordTest(TestCase):
         self.assertEqual(format_coord(CoordSystem.ICRS, cc)[0], '01:25:21.6')
         self.assertEqual(format_coord(CoordSystem.ICRS, cc)[1], '+55:53:24')
 
+    def test_dec_deg_array(self):
+        systems = [CoordSystem.ICRS, CoordSystem.GAL, CoordSystem.ICRS,
+                   CoordSystem.ICRS, CoordSystem.GAL]
+        xs = [21.34, 135.4653, 352.6, 0.0, 10.0]
+        ys = [55.89, -16.1967, -30.0, 60.0, 0.0]
+
+        cc = coord_from_dec_deg_array(systems, xs, ys)
+        self.assertEqual(cc.shape, (5,))
+
+        # Check against converting the positions individually.
+        for (c, system, x, y) in zip(cc, systems, xs, ys):
+            expect = coord_from_dec_deg(system, x, y).icrs
+            self.assertAlmostEqual(c.ra.degree, expect.ra.degree, places=9)
+            self.assertAlmostEqual(c.dec.degree, expect.dec.degree, places=9)
+
+        self.assertAlmostEqual(cc[1].ra.degree, 30.0, places=4)
+        self.assertAlmostEqual(cc[1].dec.degree, 45.0, places=4)
+
+        # RA hour bins should wrap around at 24 hours.
+        self.assertEqual(ra_hour_bin(cc).tolist(), [1, 2, 0, 0, 18])
+
     def test_format_all_systems(self):
         results = format_coord_all_systems(CoordSystem.ICRS, 30.0, 45.0)
         self.assertIsInstance(results, dict)
@@ -132,3 +163,30 @@ class AstroCoordTest(TestCase):
         self.assertAlmostEqual(result.y_deg, -16.1967, places=4)
         self.assertEqual(result.x, '135.465')
         self.assertEqual(result.y, '-16.197')
+
+    def test_altitude_analytic(self):
+        location = get_earth_location(null_tuple(FacilityObsInfo)._replace(
+            geo_x=-5464588.652191697,
+            geo_y=-2493003.0215722183,
+            geo_z=2150655.6609171447))
+
+        targets = SkyCoord(
+            linspace(0, 350, 36), linspace(-60, 80, 36),
+            unit=units.degree, frame='icrs')
+
+        times = (
+            Time(datetime(2025, 2, 1, 4, 0))
+            + arange(0, 366, 14)[:, newaxis] * units.day
+            + arange(0, 43201, 3600)[newaxis, :] * units.second)
+
+        alt = calculate_altitude_analytic(location, targets, times)
+
+        self.assertEqual(alt.shape, (27, 13, 36))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', AstropyWarning)
+
+            expect = targets[newaxis, newaxis, :].transform_to(AltAz(
+                location=location, obstime=times[:, :, newaxis])).alt.degree
+
+        self.assertLess(abs(alt - expect).max(), 0.02)
@@ -18,15 +18,27 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from threading import Event, Thread
+
 from hedwig import auth
+from hedwig.error import UserError
 
 from .compat import TestCase
 
 
 class AuthTest(TestCase):
     def setUp(self):
+        self.orig_rounds = auth._rounds
+        self.orig_concurrency = auth.password_hash_concurrency
+        self.orig_queue_limit = auth.password_hash_queue_limit
+
         auth._rounds = 10
 
+    def tearDown(self):
+        auth._rounds = self.orig_rounds
+        auth.password_hash_concurrency = self.orig_concurrency
+        auth.password_hash_queue_limit = self.orig_queue_limit
+
     def test_auth(self):
         (h, s) = auth.create_password_hash('monkey')
 
@@ -35,3 +47,67 @@ class AuthTest(TestCase):
 
         self.assertTrue(auth.check_password_hash('monkey', h, s))
         self.assertFalse(auth.check_password_hash('donkey', h, s))
+
+        # Simulated hashing should accept any password.
+        auth.simulate_password_hash('monkey')
+
+    def test_hash_limit(self):
+        auth.password_hash_concurrency = 2
+        auth.password_hash_queue_limit = 1
+
+        (h, s) = auth.create_password_hash('monkey')
+
+        # Occupy all of the hashing slots with other "requests".
+        started = [Event(), Event()]
+        release = Event()
+
+        def hold_slot(started):
+            with auth._hash_limiter():
+                started.set()
+                release.wait()
+
+        threads = [Thread(target=hold_slot, args=(x,)) for x in started]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            for event in started:
+                self.assertTrue(event.wait(10))
+
+            # A further request should be allowed to wait, and will
+            # complete once a slot is released.
+            result = []
+            waiting = Thread(target=lambda: result.append(
+                auth.check_password_hash('monkey', h, s)))
+            waiting.start()
+
+            while auth._hash_limiter.waiting < 1:
+                waiting.join(0.01)
+
+            # The queue is now full so further requests should be
+            # rejected immediately.
+            with self.assertRaisesRegex(UserError, 'currently busy'):
+                auth.check_password_hash('monkey', h, s)
+
+            with self.assertRaisesRegex(UserError, 'currently busy'):
+                auth.simulate_password_hash('monkey')
+
+            # Creating password hashes (e.g. for registration) should
+            # not be limited.
+            (h2, s2) = auth.create_password_hash('donkey')
+
+        finally:
+            release.set()
+
+            for thread in threads:
+                thread.join()
+
+        waiting.join()
+        self.assertEqual(result, [True])
+        self.assertTrue(auth.check_password_hash('donkey', h2, s2))
+
+        # With the slots released, hashing should work again.
+        self.assertTrue(auth.check_password_hash('monkey', h, s))
+        self.assertEqual(auth._hash_limiter.active, 0)
+        self.assertEqual(auth._hash_limiter.waiting, 0)
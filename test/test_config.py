@@ -194,3 +194,54 @@ class ConfigTestCase(DummyConfigTestCase):
         self.assertEqual(
             list(sorted(config.MemoCache.instances[-1].cache.keys())),
             [(1, 4), (2, 4)])
+
+    def test_memo_cache_limits(self):
+        calls = []
+
+        @config.MemoCache(max_size=2)
+        def func(x):
+            calls.append(x)
+            return [x * 2]
+
+        cache = func.memo_cache
+        self.assertIs(config.MemoCache.instances[-1], cache)
+
+        x1 = func(1)
+        func(2)
+        self.assertIs(func(1), x1)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(cache.get_stats(), (1, 2))
+
+        # The least recently used entry (2) should be discarded.
+        func(3)
+        self.assertEqual(list(cache.cache.keys()), [(1,), (3,)])
+        self.assertIs(func(1), x1)
+        func(2)
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(cache.get_stats(), (2, 4))
+
+        # Test invalidation of a single entry.
+        func.invalidate(1)
+        self.assertEqual(list(cache.cache.keys()), [(2,)])
+        self.assertIsNot(func(1), x1)
+        self.assertEqual(calls, [1, 2, 3, 2, 1])
+
+        cache.clear()
+        self.assertEqual(len(cache.cache), 0)
+
+        # Test expiry of entries.
+        for (ttl, expect_calls) in ((3600, [4]), (-1, [4, 4])):
+            del calls[:]
+
+            @config.MemoCache(ttl=ttl)
+            def func_ttl(x):
+                calls.append(x)
+                return [x * 2]
+
+            x4 = func_ttl(4)
+            x4b = func_ttl(4)
+            self.assertEqual(calls, expect_calls)
+            if ttl > 0:
+                self.assertIs(x4b, x4)
+            else:
+                self.assertIsNot(x4b, x4)
@@ -0,0 +1,124 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import shutil
+import tempfile
+
+from sqlalchemy import event
+
+from hedwig.config import _get_db_class
+from hedwig.db.engine import get_engine
+from hedwig.db.meta import metadata
+from hedwig.error import DatabaseError
+
+from .dummy_config import DummyConfigTestCase
+
+
+class DBEngineTestCase(DummyConfigTestCase):
+    def setUp(self):
+        super(DBEngineTestCase, self).setUp()
+
+        self.dir_ = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_)
+
+        super(DBEngineTestCase, self).tearDown()
+
+    def _get_database(self, ping_idle_time):
+        """
+        Create a file-based SQLite database, so that it survives
+        connections being dropped, and record the DB-API connections
+        made and the statements executed on them.
+        """
+
+        engine = get_engine(
+            'sqlite:///{}'.format(tempfile.mktemp(dir=self.dir_)),
+            ping_idle_time=ping_idle_time)
+
+        connections = []
+        statements = []
+
+        @event.listens_for(engine, 'connect')
+        def record_connection(dbapi_connection, connection_record):
+            connections.append(dbapi_connection)
+            dbapi_connection.set_trace_callback(statements.append)
+
+            # Avoid slow disk synchronization for each table created.
+            dbapi_connection.execute('PRAGMA synchronous=OFF')
+
+        metadata.create_all(engine)
+
+        db = _get_db_class('Generic')(engine)
+
+        # Make an initial connection and then clear the statement list.
+        db.add_person('Person One')
+        del statements[:]
+
+        return (db, connections, statements)
+
+    def test_ping_idle(self):
+        # With a long idle time, recently used connections are not checked.
+        (db, connections, statements) = self._get_database(3600)
+
+        for i in range(3):
+            self.assertEqual(len(db.search_person()), 1)
+
+        self.assertNotIn('SELECT 1', statements)
+        self.assertEqual(len(connections), 1)
+
+        # With a zero idle time, connections are checked every time.
+        (db, connections, statements) = self._get_database(0)
+
+        for i in range(3):
+            self.assertEqual(len(db.search_person()), 1)
+
+        self.assertEqual(statements.count('SELECT 1'), 3)
+        self.assertEqual(len(connections), 1)
+
+        # Simulate a dropped connection: the check should fail and
+        # the pool should make a new connection.
+        connections[0].close()
+
+        self.assertEqual(len(db.search_person()), 1)
+        self.assertEqual(len(connections), 2)
+
+    def test_retry_on_disconnect(self):
+        (db, connections, statements) = self._get_database(3600)
+
+        # Simulate a dropped connection.  Since the connection was
+        # used recently, it is not checked, but the read-only method
+        # should be retried.
+        connections[0].close()
+
+        with self.assertLogs('hedwig.db.util', level='WARNING') as cm:
+            self.assertEqual(len(db.search_person()), 1)
+
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn('search_person', cm.output[0])
+        self.assertEqual(len(connections), 2)
+
+        # Methods which write to the database should not be retried.
+        connections[1].close()
+
+        with self.assertRaises(DatabaseError):
+            db.add_person('Person Two')
+
+        self.assertEqual(len(connections), 2)
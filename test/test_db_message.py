@@ -241,6 +241,105 @@ class DBMessageTest(DBTestCase):
             MessageRecipient(message_34, person_4, '4@b', 'Person Four', False),
         )))
 
+    def test_add_messages(self):
+        person_1 = self.db.add_person('Person One')
+        person_2 = self.db.add_person('Person Two')
+
+        message_ids = self.db.add_messages([
+            {
+                'subject': 'test 1',
+                'body': 'test message 1',
+                'person_ids': [person_1],
+            },
+            {
+                'subject': 'test 2',
+                'body': 'test message 2',
+                'person_ids': [person_1, person_2],
+                'format_type': MessageFormatType.PLAIN_FLOWED,
+            },
+        ])
+
+        self.assertEqual(len(message_ids), 2)
+
+        messages = self.db.search_message(
+            oldest_first=True, with_recipients=True, with_body=True)
+        self.assertEqual(list(messages.keys()), message_ids)
+
+        self.assertEqual(
+            [(x.subject, x.body, x.format,
+              set(y.person_id for y in x.recipients.values()))
+             for x in messages.values()],
+            [
+                ('test 1', 'test message 1', MessageFormatType.PLAIN,
+                 set((person_1,))),
+                ('test 2', 'test message 2', MessageFormatType.PLAIN_FLOWED,
+                 set((person_1, person_2))),
+            ])
+
+        # If any message is invalid, none should be added.
+        with self.assertRaises(Error):
+            self.db.add_messages([
+                {
+                    'subject': 'test 3',
+                    'body': 'test message 3',
+                    'person_ids': [person_1],
+                },
+                {
+                    'subject': 'test 4',
+                    'body': 'test message 4',
+                    'person_ids': [person_2, person_2],
+                },
+            ])
+
+        self.assertEqual(
+            list(self.db.search_message(oldest_first=True).keys()),
+            message_ids)
+
+    def test_message_paging(self):
+        person_1 = self.db.add_person('Person One')
+        person_2 = self.db.add_person('Person Two')
+
+        message_ids = []
+        for i in range(7):
+            message_ids.append(self.db.add_message(
+                'test {}'.format(i), 'test message',
+                [person_1] if i % 2 else [person_2]))
+
+        # Test identifier-based paging in each direction.
+        messages = self.db.search_message(
+            message_id_gt=message_ids[2], oldest_first=True, limit=2)
+        self.assertEqual(list(messages.keys()), message_ids[3:5])
+
+        messages = self.db.search_message(
+            message_id_lt=message_ids[2], limit=2)
+        self.assertEqual(list(messages.keys()), message_ids[1::-1])
+
+        # Test counting messages.
+        self.assertEqual(self.db.search_message_count(), 7)
+        self.assertEqual(self.db.search_message_count(person_id=person_1), 3)
+        self.assertEqual(self.db.search_message_count(
+            state=MessageState.UNSENT), 7)
+        self.assertEqual(self.db.search_message_count(
+            state=MessageState.SENT), 0)
+
+        # Test date filtering.
+        self.assertEqual(self.db.search_message_count(
+            date_after=datetime(2000, 1, 1)), 7)
+        self.assertEqual(self.db.search_message_count(
+            date_before=datetime(2000, 1, 1)), 0)
+        self.assertEqual(len(self.db.search_message(
+            date_before=datetime(2000, 1, 1))), 0)
+
+        # Test iterating over messages in blocks.
+        self.assertEqual(
+            [x.id for x in self.db.search_message_iter(block_size=2)],
+            message_ids[::-1])
+
+        self.assertEqual(
+            [x.id for x in self.db.search_message_iter(
+                block_size=3, oldest_first=True, person_id=person_2)],
+            message_ids[0::2])
+
     def test_explicit_email(self):
         # Create some person records with multiple email addresses.
         person_1 = self.db.add_person('Person One')
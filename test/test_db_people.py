@@ -18,12 +18,15 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from timeit import default_timer
 
 from hedwig import auth
 from hedwig.compat import string_type
 from hedwig.db.compat import select
-from hedwig.db.meta import auth_failure, invitation, reset_token
+from hedwig.db.meta import auth_failure, auth_failure_addr, \
+    invitation, reset_token
 from hedwig.error import ConsistencyError, DatabaseIntegrityError, \
     Error, NoSuchRecord, UserError
 from hedwig.type.collection import EmailCollection, ResultCollection, \
@@ -34,7 +37,7 @@ from hedwig.type.enum import BaseAffiliationType, BaseCallType, BaseTextRole, \
 from hedwig.type.simple import Email, \
     Institution, InstitutionInfo, MemberInstitution, \
     OAuthCode, OAuthToken, Person, PersonLog, SiteGroupMember, UserInfo
-from .dummy_db import DBTestCase
+from .dummy_db import DBTestCase, get_dummy_database
 
 
 class DBPeopleTest(DBTestCase):
@@ -87,7 +90,6 @@ class DBPeopleTest(DBTestCase):
         self.assertEqual(self.db.authenticate_user('user1', 'pass1'), user_id)
 
         # Test unsuccessful authentication.
-        auth.password_hash_delay = 0
         self.assertIsNone(self.db.authenticate_user('user1', 'wrongpass'))
         self.assertIsNone(self.db.authenticate_user('user2', 'pass1'))
 
@@ -151,7 +153,6 @@ class DBPeopleTest(DBTestCase):
 
     def test_user_auth_failure(self):
         allowed_failures = 5
-        auth.password_hash_delay = 0
 
         user_id = self.db.add_user('user1', 'pass1')
 
@@ -176,6 +177,148 @@ class DBPeopleTest(DBTestCase):
 
         self.assertIsNone(self.db.authenticate_user('user1', 'wrongpass'))
 
+    def test_user_auth_failure_addr(self):
+        allowed_failures = 20
+        addr = '192.0.2.1'
+
+        user_id = self.db.add_user('user1', 'pass1')
+
+        # Failures with a known user name should not be counted for
+        # the address.
+        for i in range(0, 3):
+            self.assertIsNone(self.db.authenticate_user(
+                'user1', 'wrongpass', remote_addr=addr,
+                addr_failure_limit=allowed_failures))
+
+        with self.db._transaction() as conn:
+            self.assertIsNone(conn.execute(select([
+                auth_failure_addr.c.attempts
+            ])).scalar())
+
+        self.db._delete_auth_failure('user1')
+
+        # Failures for different (unknown) user names from the same
+        # address should be counted together.
+        for i in range(0, allowed_failures):
+            self.assertIsNone(self.db.authenticate_user(
+                'user{}'.format(i + 2), 'wrongpass', remote_addr=addr,
+                addr_failure_limit=allowed_failures))
+
+        with self.db._transaction() as conn:
+            self.assertEqual(conn.execute(select([
+                auth_failure_addr.c.attempts
+            ]).where(auth_failure_addr.c.remote_addr == addr)).scalar(),
+                allowed_failures)
+
+        # All further attempts from this address should now be rejected
+        # in the same way, whether or not the user name exists, without
+        # hashing the password: make hashing fail to check that it is
+        # not attempted.
+        orig_concurrency = auth.password_hash_concurrency
+        orig_queue_limit = auth.password_hash_queue_limit
+        auth.password_hash_concurrency = 0
+        auth.password_hash_queue_limit = 0
+
+        try:
+            for (name, password) in (
+                    ('userx', 'wrongpass'),
+                    ('user1', 'wrongpass'),
+                    ('user1', 'pass1')):
+                with self.assertRaisesRegex(
+                        UserError, 'attempts from this address'):
+                    self.db.authenticate_user(
+                        name, password, remote_addr=addr,
+                        addr_failure_limit=allowed_failures)
+
+            # Other addresses should still have their passwords hashed.
+            for name in ('userx', 'user1'):
+                with self.assertRaisesRegex(UserError, 'currently busy'):
+                    self.db.authenticate_user(
+                        name, 'wrongpass', remote_addr='192.0.2.2',
+                        addr_failure_limit=allowed_failures)
+
+            # As should the same address if the check is disabled.
+            with self.assertRaisesRegex(UserError, 'currently busy'):
+                self.db.authenticate_user(
+                    'userx', 'wrongpass', remote_addr=addr)
+
+        finally:
+            auth.password_hash_concurrency = orig_concurrency
+            auth.password_hash_queue_limit = orig_queue_limit
+
+        # Rejected attempts should not have been counted against the
+        # existing user name.
+        with self.db._transaction() as conn:
+            self.assertIsNone(conn.execute(select([
+                auth_failure.c.attempts
+            ]).where(auth_failure.c.user_name == 'user1')).scalar())
+
+        # Valid credentials from another address should still be accepted.
+        self.assertEqual(self.db.authenticate_user(
+            'user1', 'pass1', remote_addr='192.0.2.2',
+            addr_failure_limit=allowed_failures), user_id)
+
+    def test_user_auth_flood(self):
+        # Simulate a web server with a fixed number of request threads
+        # receiving a flood of log in attempts, and check that another
+        # request is still handled promptly.
+        n_server_threads = 8
+        n_flood = 40
+
+        db = get_dummy_database(
+            allow_multi_threaded=True, facility_spec=self.facility_spec)
+        user_id = db.add_user('user1', 'pass1')
+
+        orig_concurrency = auth.password_hash_concurrency
+        orig_queue_limit = auth.password_hash_queue_limit
+        auth.password_hash_concurrency = 2
+        auth.password_hash_queue_limit = 2
+
+        # Choose a number of rounds such that each hash takes a
+        # noticeable amount of time.
+        auth._rounds = 10000
+        start = default_timer()
+        auth.simulate_password_hash('pass')
+        auth._rounds = max(10, int(
+            auth._rounds * 0.1 / max(default_timer() - start, 1e-6)))
+
+        start = default_timer()
+        auth.simulate_password_hash('pass')
+        hash_time = default_timer() - start
+
+        def flood(i):
+            try:
+                return db.authenticate_user(
+                    'unknown{}'.format(i), 'wrongpass')
+            except UserError:
+                return 'rejected'
+
+        def other_request(submitted):
+            self.assertEqual(
+                list(db.search_user(user_id=user_id).keys()), [user_id])
+            return default_timer() - submitted
+
+        try:
+            with ThreadPoolExecutor(max_workers=n_server_threads) as pool:
+                flood_results = [
+                    pool.submit(flood, i) for i in range(n_flood)]
+
+                other_time = pool.submit(
+                    other_request, default_timer()).result()
+
+                flood_results = [x.result() for x in flood_results]
+
+        finally:
+            auth.password_hash_concurrency = orig_concurrency
+            auth.password_hash_queue_limit = orig_queue_limit
+
+        # Without the limit, the other request would have to wait for
+        # several rounds of hashing by all of the server threads.
+        self.assertLess(other_time, hash_time)
+
+        # Some attempts should have been processed and the rest rejected.
+        self.assertEqual(set(flood_results), set(('rejected', None)))
+
     def test_user_auth_token(self):
         user_id = self.db.add_user('user1', 'pass1')
 
@@ -41,7 +41,7 @@ from hedwig.type.simple import Affiliation, Annotation, \
     Member, MemberInfo, MemberInstitution, \
     PrevProposal, PrevProposalPub, \
     Proposal, ProposalCategory, ProposalFigureInfo, ProposalPDFInfo, \
-    ProposalText, RequestPropCopy, RequestPropPDF, Target
+    ProposalText, RequestCallPDF, RequestPropCopy, RequestPropPDF, Target
 from hedwig.type.util import null_tuple
 from .dummy_db import DBTestCase
 
@@ -225,6 +225,46 @@ class DBProposalTest(DBTestCase):
         with self.assertRaises(NoSuchRecord):
             self.db.get_semester(1999999, semester_id)
 
+    def test_semester_ra_inaccessible(self):
+        facility_id = self.db.ensure_facility('my_tel')
+        semester_id = self.db.add_semester(
+            facility_id, '99A', '99A',
+            datetime(2002, 2, 2), datetime(2002, 8, 1))
+
+        with self.assertRaises(NoSuchRecord):
+            self.db.get_semester_ra_inaccessible(semester_id, 30.0)
+
+        with self.assertRaisesRegex(ConsistencyError, 'semester does not ex'):
+            self.db.set_semester_ra_inaccessible(1999999, 30.0, [])
+
+        self.db.set_semester_ra_inaccessible(semester_id, 30.0, [[2, 5]])
+        self.db.set_semester_ra_inaccessible(semester_id, 40.0, [[1, 6]])
+
+        self.assertEqual(
+            self.db.get_semester_ra_inaccessible(semester_id, 30.0),
+            [[2, 5]])
+        self.assertEqual(
+            self.db.get_semester_ra_inaccessible(semester_id, 40.0),
+            [[1, 6]])
+
+        # Replace the stored value.
+        self.db.set_semester_ra_inaccessible(semester_id, 30.0, [[3, 4]])
+        self.assertEqual(
+            self.db.get_semester_ra_inaccessible(semester_id, 30.0),
+            [[3, 4]])
+
+        # Values should be retained unless the dates are changed.
+        self.db.update_semester(semester_id, name='99 (a)')
+        self.assertEqual(
+            self.db.get_semester_ra_inaccessible(semester_id, 30.0),
+            [[3, 4]])
+
+        self.db.update_semester(semester_id, date_end=datetime(2002, 8, 2))
+
+        for el_min in (30.0, 40.0):
+            with self.assertRaises(NoSuchRecord):
+                self.db.get_semester_ra_inaccessible(semester_id, el_min)
+
     def test_queue(self):
         # Test add_queue method.
         facility_id = self.db.ensure_facility('my_tel')
@@ -742,6 +782,21 @@ class DBProposalTest(DBTestCase):
                 self.assertEqual(proposal.title, title)
                 self.assertIsNone(proposal.members)
 
+                # Summary searches should omit only the call details.
+                result = self.db.search_proposal(
+                    proposal_id=proposal_id, summary=True)
+                summary = result[proposal_id]
+                self.assertIsNone(summary.abst_word_lim)
+                self.assertIsNone(summary.date_close)
+                self.assertEqual(summary, proposal._replace(**{
+                    x: None for x in (
+                        'call_separate', 'call_hidden',
+                        'abst_word_lim', 'tech_word_lim', 'tech_fig_lim',
+                        'tech_page_lim', 'sci_word_lim', 'sci_fig_lim',
+                        'sci_page_lim', 'capt_word_lim', 'expl_word_lim',
+                        'date_close', 'multi_semester', 'cnrq_word_lim',
+                        'cnrq_fig_lim', 'cnrq_page_lim')}))
+
         # The proposal must have a title.
         with self.assertRaisesRegex(UserError, 'blank'):
             self.db.add_proposal(call_id_1, person_id, affiliation_id_1, '')
@@ -2423,6 +2478,40 @@ class DBProposalTest(DBTestCase):
 
         self.assertEqual(request.id, request_id)
 
+    def test_request_call_pdf(self):
+        proposal_id = self._create_test_proposal()
+        call_id = self.db.get_proposal(None, proposal_id).call_id
+        person_id = self.db.add_person('Requester')
+
+        request_id = self.db.add_request_call_pdf(call_id, person_id)
+
+        request = self.db.search_request_call_pdf().get_single()
+        self.assertIsInstance(request, RequestCallPDF)
+        self.assertEqual(request.id, request_id)
+        self.assertEqual(request.call_id, call_id)
+        self.assertEqual(request.state, RequestState.NEW)
+        self.assertEqual(request.requester, person_id)
+
+        self.db.update_request_call_pdf(
+            request_id=request_id, state=RequestState.READY,
+            processed=datetime(2000, 1, 1),
+            state_prev=RequestState.NEW, state_is_system=True)
+
+        request = self.db.search_request_call_pdf(
+            call_id=call_id, with_requester_name=True).get_single()
+        self.assertEqual(request.state, RequestState.READY)
+        self.assertEqual(request.requester_name, 'Requester')
+
+        self.assertEqual(len(self.db.search_request_call_pdf(
+            call_id=1999999)), 0)
+
+        with self.assertRaisesRegex(ConsistencyError, '^call does not'):
+            self.db.add_request_call_pdf(1999999, person_id)
+
+        self.db.delete_request_call_pdf(request_id=request_id)
+
+        self.assertEqual(len(self.db.search_request_call_pdf()), 0)
+
     def test_request_prop_pdf(self):
         proposal_id = self._create_test_proposal()
         person_id = self.db.add_person('Requester')
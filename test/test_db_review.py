@@ -277,6 +277,42 @@ class DBReviewTest(DBTestCase):
         self.assertEqual(len(self.db.search_reviewer(
             proposal_id=proposal_id, thanked=False)), 4)
 
+        # Messages given with reviewer updates should only be added if
+        # the updates succeed.
+        n_message = len(self.db.search_message())
+
+        with self.assertRaisesRegex(ConsistencyError, 'reviewer does not'):
+            self.db.multiple_reviewer_update(
+                BaseReviewerRole,
+                update=[
+                    {'reviewer_id': reviewer_id_4, 'notified': True},
+                    {'reviewer_id': 1999999, 'notified': True},
+                ],
+                messages=[{
+                    'subject': 'Review request',
+                    'body': 'Please review',
+                    'person_ids': [person_id_4],
+                }])
+
+        self.assertEqual(len(self.db.search_message()), n_message)
+        result = self.db.search_reviewer(
+            reviewer_id=reviewer_id_4).get_single()
+        self.assertFalse(result.notified)
+
+        self.db.multiple_reviewer_update(
+            BaseReviewerRole,
+            update=[{'reviewer_id': reviewer_id_4, 'notified': True}],
+            messages=[{
+                'subject': 'Review request',
+                'body': 'Please review',
+                'person_ids': [person_id_4],
+            }])
+
+        self.assertEqual(len(self.db.search_message()), n_message + 1)
+        result = self.db.search_reviewer(
+            reviewer_id=reviewer_id_4).get_single()
+        self.assertTrue(result.notified)
+
         # Test call and queue query parameters.
         result = self.db.search_reviewer(call_id=1999999)
         self.assertEqual(len(result), 0)
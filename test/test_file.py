@@ -20,7 +20,9 @@ from __future__ import absolute_import, division, print_function, \
 
 from contextlib import closing
 from io import BytesIO
+import os
 from os.path import exists
+from tempfile import mkstemp
 
 from PIL import Image
 
@@ -31,7 +33,8 @@ from hedwig.file.image import create_thumbnail_and_preview, \
     _calculate_size
 from hedwig.file.info import determine_figure_type, \
     determine_pdf_page_count
-from hedwig.file.pdf import pdf_merge, pdf_to_png, pdf_to_svg, ps_to_png
+from hedwig.file.pdf import pdf_merge, pdf_merge_to_file, \
+    pdf_to_png, pdf_to_svg, ps_to_png
 from hedwig.type.enum import FigureType
 
 from .dummy_config import DummyConfigTestCase
@@ -77,6 +80,21 @@ class FileTest(DummyConfigTestCase):
 
         self.assertEqual(determine_pdf_page_count(merged), 2)
 
+        # Test merging from a file name into an output file.
+        (fd, filename) = mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(example_pdf)
+
+            output = BytesIO()
+            pdf_merge_to_file(
+                [filename, BytesIO(example_pdf), filename], output)
+
+            self.assertEqual(determine_pdf_page_count(output.getvalue()), 3)
+
+        finally:
+            os.unlink(filename)
+
     def test_pdf_to_png_ghostscript(self):
         if not exists(get_config().get('utilities', 'ghostscript')):
             self.skipTest('Ghostscript not available')
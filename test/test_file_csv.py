@@ -18,12 +18,28 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import tracemalloc
+
 from hedwig.compat import byte_type
 from hedwig.file.csv import CSVWriter
 
 from .compat import TestCase
 
 
+def _iter_proposal_rows(n):
+    """
+    Generate rows resembling those of the proposal tabulation.
+    """
+
+    for i in range(n):
+        yield [
+            '20A-X-{}'.format(i), 'Standard', 'Person {}'.format(i),
+            'Affiliation', 'Institution {}'.format(i), 3,
+            'Proposal title {}'.format(i), 'Submitted', True, False,
+            3.5, 1.25, 'Category',
+        ] + [0.1 * j for j in range(10)]
+
+
 class FileTest(TestCase):
     def test_create_csv(self):
         writer = CSVWriter()
@@ -35,3 +51,47 @@ class FileTest(TestCase):
         self.assertIsInstance(csv, byte_type)
 
         self.assertEqual(csv, b'1,"a"\n2,"b"\n')
+
+    def test_iter_csv(self):
+        writer = CSVWriter()
+        writer.add_row(['x', 'y'])
+
+        blocks = list(writer.iter_csv([[1, 'a'], [2, 'b']]))
+        self.assertEqual(blocks, [b'"x","y"\n1,"a"\n2,"b"\n'])
+
+        # Splitting into blocks should give the same file.
+        writer = CSVWriter()
+        for row in _iter_proposal_rows(1000):
+            writer.add_row(row)
+        expect = writer.get_csv()
+
+        blocks = list(CSVWriter().iter_csv(
+            _iter_proposal_rows(1000), block_size=1024))
+        self.assertGreater(len(blocks), 100)
+        for block in blocks:
+            self.assertIsInstance(block, byte_type)
+            self.assertLess(len(block), 2048)
+        self.assertEqual(b''.join(blocks), expect)
+
+        self.assertEqual(list(CSVWriter().iter_csv([])), [])
+
+    def test_iter_csv_memory(self):
+        def stream_csv(n):
+            tracemalloc.start()
+            try:
+                size = 0
+                for block in CSVWriter().iter_csv(_iter_proposal_rows(n)):
+                    size += len(block)
+
+                return (size, tracemalloc.get_traced_memory()[1])
+
+            finally:
+                tracemalloc.stop()
+
+        (size_small, peak_small) = stream_csv(500)
+        (size_large, peak_large) = stream_csv(5000)
+
+        # The peak memory used should not grow with the number of rows.
+        self.assertGreater(size_large, 9 * size_small)
+        self.assertLess(peak_large, 1.5 * peak_small)
+        self.assertLess(peak_large, size_large / 2)
@@ -57,3 +57,15 @@ class MarkdownFormatTest(TestCase):
             r'<h5>H1</h5>'
             r'\s*<h6>H2</h6>'
             r'\s*<h6>H3</h6>')
+
+        # Test that state (e.g. reference definitions) is not carried
+        # over to the next conversion.
+        self.assertRegex(
+            markdown_to_html(
+                'A [link][ref].\n\n[ref]: http://example.com/',
+                start_heading=3),
+            r'<a href="http://example.com/">link</a>')
+
+        self.assertNotRegex(
+            markdown_to_html('A [link][ref].', start_heading=3),
+            r'<a ')
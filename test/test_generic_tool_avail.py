@@ -0,0 +1,92 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from datetime import datetime, time, timedelta
+
+from hedwig.astro.coord import CoordSystem
+from hedwig.config import get_config
+from hedwig.error import FormattedError
+from hedwig.facility.generic.tool_avail import AvailabilityTool
+from hedwig.type.collection import TargetCollection
+from hedwig.type.simple import FacilityObsInfo, Target
+from hedwig.type.util import null_tuple
+
+from .dummy_config import DummyConfigTestCase
+
+
+class DummyFacility(object):
+    def get_observing_info(self):
+        return null_tuple(FacilityObsInfo)._replace(
+            geo_x=-5464588.652191697,
+            geo_y=-2493003.0215722183,
+            geo_z=2150655.6609171447,
+            time_start=time(4, 0),
+            time_duration=timedelta(hours=12),
+            el_min=30)
+
+
+class AvailabilityToolTestCase(DummyConfigTestCase):
+    def test_availability_search(self):
+        tool = AvailabilityTool(DummyFacility(), 1)
+
+        targets = TargetCollection()
+        for (i, (x, y)) in enumerate((
+                (10.0, 20.0), (83.8, -5.4), (201.4, -43.0),
+                (266.4, -29.0), (350.0, 60.0))):
+            targets[i] = null_tuple(Target)._replace(
+                id=i, name='T{}'.format(i), system=CoordSystem.ICRS,
+                x=x, y=y)
+
+        target_objects = targets.to_object_list()
+
+        def search(elevation_model):
+            return tool._do_availability_search(
+                target_objects, datetime(2025, 2, 1), datetime(2025, 7, 31),
+                elevation_model=elevation_model)
+
+        result = search('astropy')
+
+        self.assertEqual(len(result['avail_date']), 13)
+        self.assertEqual(len(result['avail_time']), 13)
+        self.assertEqual(result['avail_date_max'], 3)
+        self.assertEqual(list(result['avail_target'].keys()), [
+            'T0', 'T1', 'T2', 'T3', 'T4'])
+
+        # A target which never rises above the elevation limit.
+        self.assertEqual(result['avail_target']['T2'], 0.0)
+
+        # The analytic elevation model should agree (for targets which
+        # are not within its error of the elevation limit).
+        result_analytic = search('analytic')
+
+        self.assertEqual(result_analytic['avail_date'], result['avail_date'])
+        self.assertEqual(result_analytic['avail_time'], result['avail_time'])
+
+        for (name, value) in result['avail_target'].items():
+            self.assertAlmostEqual(
+                result_analytic['avail_target'][name], value)
+
+        # The model should be read from the configuration by default.
+        get_config().set('tool_avail', 'elevation_model', 'analytic')
+        self.assertEqual(search(None)['avail_date'], result['avail_date'])
+
+        get_config().set('tool_avail', 'elevation_model', 'other')
+        with self.assertRaisesRegex(FormattedError, 'Unknown elevation'):
+            search(None)
@@ -18,9 +18,12 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from threading import Event, Thread
+
+from hedwig.config import get_config
 from hedwig.error import NoSuchRecord, ParseError
 from hedwig.type.collection import ReviewerCollection
-from hedwig.type.enum import ReviewState
+from hedwig.type.enum import FormatType, ProposalState, ReviewState
 from hedwig.type.simple import Reviewer
 from hedwig.type.util import null_tuple
 
@@ -70,6 +73,128 @@ class GenericFacilityTestCase(FacilityTestCase):
         with self.assertRaises(NoSuchRecord):
             self.view.parse_proposal_code(self.db, '20A-X-9')
 
+    def test_call_snapshot(self):
+        types = self.view.get_call_types()
+
+        proposal_id = self._create_test_proposal('20A', 'X', types.STANDARD)
+        self.db.update_proposal(proposal_id, state=ProposalState.SUBMITTED)
+        proposal = self.db.get_proposal(self.facility_id, proposal_id)
+        call = self.db.get_call(self.facility_id, proposal.call_id)
+
+        n_prepared = [0]
+
+        def get_tabulation(key='test'):
+            def make_snapshot():
+                n_prepared[0] += 1
+                return self.view._prepare_proposal_tabulation(self.db, call)
+
+            return self.view._get_call_snapshot(
+                self.db, call, key, make_snapshot)
+
+        tabulation = get_tabulation()
+        self.assertEqual(n_prepared[0], 1)
+        self.assertEqual(
+            [x['code'] for x in tabulation['proposals']], ['20A-X-1'])
+        self.assertIsNone(tabulation['proposals'][0]['decision_accept'])
+
+        # The snapshot should be re-used while nothing changes.
+        self.assertIs(get_tabulation(), tabulation)
+        self.assertEqual(n_prepared[0], 1)
+
+        # Writing a decision should cause the snapshot to be regenerated,
+        # even though it has not expired.
+        version = self.db.get_review_version()
+        self.db.set_decision(
+            proposal_id, accept=True, exempt=False, ready=False,
+            note='', note_format=FormatType.PLAIN)
+        self.assertNotEqual(self.db.get_review_version(), version)
+
+        tabulation = get_tabulation()
+        self.assertEqual(n_prepared[0], 2)
+        self.assertTrue(tabulation['proposals'][0]['decision_accept'])
+
+        self.assertIs(get_tabulation(), tabulation)
+        self.assertEqual(n_prepared[0], 2)
+
+        # Separately, snapshots should be regenerated after they expire.
+        # Give a new snapshot a negative lifetime so that it is
+        # regenerated every time.
+        get_config().set('review', 'call_snapshot_expiry', '-1')
+
+        tabulation = get_tabulation('test_expiry')
+        self.assertEqual(n_prepared[0], 3)
+
+        self.assertIsNot(get_tabulation('test_expiry'), tabulation)
+        self.assertEqual(n_prepared[0], 4)
+
+        # Expired and outdated entries, and their locks, should be
+        # discarded when other snapshots are stored.
+        self.assertEqual(
+            sorted(x[2] for x in self.view._call_snapshot_cache.keys()),
+            ['test', 'test_expiry'])
+
+        get_config().set('review', 'call_snapshot_expiry', '60')
+        get_tabulation('test_other')
+
+        self.assertEqual(
+            sorted(x[2] for x in self.view._call_snapshot_cache.keys()),
+            ['test', 'test_other'])
+        self.assertEqual(
+            sorted(x[2] for x in self.view._call_snapshot_key_locks.keys()),
+            ['test', 'test_other'])
+
+        self.db.set_decision(
+            proposal_id, accept=False, exempt=False, ready=False,
+            note='', note_format=FormatType.PLAIN)
+
+        get_tabulation('test_other')
+        self.assertEqual(
+            sorted(x[2] for x in self.view._call_snapshot_cache.keys()),
+            ['test_other'])
+        self.assertEqual(
+            sorted(x[2] for x in self.view._call_snapshot_key_locks.keys()),
+            ['test_other'])
+
+    def test_call_snapshot_concurrent(self):
+        types = self.view.get_call_types()
+
+        proposal_id = self._create_test_proposal('20A', 'X', types.STANDARD)
+        proposal = self.db.get_proposal(self.facility_id, proposal_id)
+        call = self.db.get_call(self.facility_id, proposal.call_id)
+
+        n_prepared = [0]
+        started = Event()
+        release = Event()
+
+        def make_snapshot():
+            n_prepared[0] += 1
+            started.set()
+            release.wait(10)
+            return {'snapshot': n_prepared[0]}
+
+        results = []
+
+        def get_snapshot():
+            results.append(self.view._get_call_snapshot(
+                self.db, call, 'test', make_snapshot))
+
+        # While one thread is generating the snapshot, others should
+        # wait for it rather than generating it again.
+        threads = [Thread(target=get_snapshot) for i in range(4)]
+        threads[0].start()
+        self.assertTrue(started.wait(10))
+
+        for thread in threads[1:]:
+            thread.start()
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(n_prepared[0], 1)
+        self.assertEqual(results, [{'snapshot': 1}] * 4)
+
     def test_overall_rating(self):
         role_class = self.view.get_reviewer_roles()
 
@@ -18,19 +18,35 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+from contextlib import closing
+from io import BytesIO
+from itertools import chain
+import re
+from shutil import rmtree
+from tempfile import mkdtemp
+from zipfile import ZipFile
+
 from hedwig.compat import first_value
+from hedwig.error import NoSuchRecord
 from hedwig.facility.example.calculator_example import ExampleCalculator
 from hedwig.type.collection import CalculationCollection, \
     PrevProposalCollection, \
     ProposalCategoryCollection, ProposalTextCollection, \
     ResultCollection, TargetCollection
-from hedwig.type.enum import BaseTextRole, FigureType, FormatType
+from hedwig.pdf.request import get_call_filename
+from hedwig.type.enum import BaseTextRole, FigureType, FormatType, \
+    MessageState, ProposalState, RequestState, ReviewState
 from hedwig.type.misc import SectionedList
 from hedwig.type.simple import CalculatorInfo, Category, \
     PrevProposal, ProposalCategory, Target
 from hedwig.type.util import null_tuple
+from hedwig.view import lookup
+from hedwig.view.people import PeopleView
+from hedwig.web.util import HTTPForbidden, HTTPRedirect
 
 from .base_app import WebAppTestCase
+from .dummy_file import example_pdf
+from .util import count_queries
 
 
 class GenericFacilityWebAppTestCase(WebAppTestCase):
@@ -280,3 +296,450 @@ class GenericFacilityWebAppTestCase(WebAppTestCase):
         self.assertEqual(len(proposal_categories), 1)
         self.assertEqual(
             first_value(proposal_categories).category_id, category.id)
+
+    def test_call_pdf_download(self):
+        view = self._get_facility_view('generic')
+        group_class = view.get_group_types()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        person_id = self.db.add_person('Person 1')
+        proposal_1 = self.db.add_proposal(
+            call_id, person_id, affiliation_id, 'Proposal 1')
+        proposal_2 = self.db.add_proposal(
+            call_id, person_id, affiliation_id, 'Proposal 2')
+
+        for proposal_id in (proposal_1, proposal_2):
+            self.db.update_proposal(
+                proposal_id, state=ProposalState.SUBMITTED)
+
+        user_id = self.db.add_user('cttee', 'pass')
+        cttee_person_id = self.db.add_person('Committee', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.CTTEE, cttee_person_id)
+        current_user = self._current_user(cttee_person_id)
+
+        # Prepare a ready request with its bundle files.
+        request_id = self.db.add_request_call_pdf(call_id, cttee_person_id)
+        self.db.update_request_call_pdf(
+            request_id, state=RequestState.READY, state_is_system=True)
+        request = self.db.search_request_call_pdf(
+            request_id=request_id).get_single()
+
+        prop_dir = mkdtemp()
+        self.addCleanup(rmtree, prop_dir)
+        self.config.set('pdf_request', 'prop_dir', prop_dir)
+
+        codes = [
+            view.make_proposal_code(
+                self.db, self.db.get_proposal(view.id_, x))
+            for x in (proposal_1, proposal_2)]
+
+        with closing(ZipFile(get_call_filename(request), 'w')) as zip_:
+            for code in codes:
+                zip_.writestr('{}.pdf'.format(code), example_pdf)
+
+        with open(get_call_filename(request, merged=True), 'wb') as f:
+            f.write(example_pdf)
+
+        def get_names(data):
+            with closing(ZipFile(BytesIO(b''.join(data)))) as zip_:
+                return sorted(zip_.namelist())
+
+        # The committee member can view all of the proposals, so should
+        # receive the stored files.
+        (data, type_, filename) = view.view_review_call_pdf_download(
+            current_user, self.db, call_id, request_id)
+        self.assertEqual(type_, 'application/zip')
+        self.assertEqual(
+            get_names(data), ['{}.pdf'.format(x) for x in codes])
+
+        (data, type_, filename) = view.view_review_call_pdf_download(
+            current_user, self.db, call_id, request_id, merged=True)
+        self.assertEqual(b''.join(data), example_pdf)
+
+        # Withdraw a proposal: it should then be omitted from the archive,
+        # and the merged file should not be available.
+        self.db.update_proposal(proposal_2, state=ProposalState.WITHDRAWN)
+
+        (data, type_, filename) = view.view_review_call_pdf_download(
+            current_user, self.db, call_id, request_id)
+        self.assertEqual(get_names(data), ['{}.pdf'.format(codes[0])])
+
+        with self.assertRaises(HTTPForbidden):
+            view.view_review_call_pdf_download(
+                current_user, self.db, call_id, request_id, merged=True)
+
+    def test_review_page_queries(self):
+        view = self._get_facility_view('generic')
+        people_view = PeopleView()
+        group_class = view.get_group_types()
+        role_class = view.get_reviewer_roles()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        # Log in as a review coordinator.  Other people are unregistered
+        # so that their profile authorization involves database searches.
+        user_id = self.db.add_user('coord', 'pass')
+        coord_person_id = self.db.add_person('Coordinator', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.COORD, coord_person_id)
+        current_user = self._current_user(coord_person_id)
+
+        reviewer_person_id = self.db.add_person('Reviewer')
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.CTTEE, reviewer_person_id)
+        reviewer_person = self.db.get_person(reviewer_person_id)
+
+        proposal_ids = []
+
+        def add_proposals(n):
+            for i in range(n):
+                person_id = self.db.add_person('PI {}'.format(i))
+                proposal_id = self.db.add_proposal(
+                    call_id, person_id, affiliation_id, 'Proposal {}'.format(i))
+                proposal_ids.append(proposal_id)
+
+                for role in (role_class.CTTEE_PRIMARY, role_class.FEEDBACK):
+                    self.db.add_reviewer(
+                        role_class, proposal_id, reviewer_person_id, role)
+
+        def set_state(state):
+            for proposal_id in proposal_ids:
+                self.db.update_proposal(proposal_id, state=state)
+
+        def count_page_queries():
+            counts = {}
+
+            with self.app.test_request_context(path='/generic/'):
+                set_state(ProposalState.REVIEW)
+
+                for (page, function) in (
+                        ('call', lambda: view.view_review_call(
+                            current_user, self.db, call_id)),
+                        ('reviewers', lambda: view.view_review_call_reviewers(
+                            current_user, self.db, call_id, {})),
+                        ('grid', lambda: view.view_reviewer_grid(
+                            current_user, self.db, call_id,
+                            role_class.CTTEE_PRIMARY, None)),
+                        ('notify', lambda: view.view_reviewer_notify(
+                            current_user, self.db, call_id,
+                            role_class.CTTEE_PRIMARY, None))):
+                    with count_queries(self.db) as statements:
+                        function()
+                    counts[page] = len(statements)
+
+                set_state(ProposalState.FINAL_REVIEW)
+
+                with count_queries(self.db) as statements:
+                    result = people_view._person_reviews(
+                        current_user, self.db, reviewer_person_id,
+                        self.facilities, reviewer_person, as_admin=True)
+                counts['person_reviews'] = len(statements)
+
+                self.assertEqual(
+                    sum(len(x.proposals) for x in result['proposals']),
+                    len(proposal_ids))
+
+            return counts
+
+        add_proposals(2)
+        counts_few = count_page_queries()
+
+        add_proposals(4)
+        counts_many = count_page_queries()
+
+        self.assertEqual(counts_many, counts_few)
+
+    def test_request_lookup(self):
+        view = self._get_facility_view('generic')
+        group_class = view.get_group_types()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        user_id = self.db.add_user('coord', 'pass')
+        person_id = self.db.add_person('Coordinator', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.COORD, person_id)
+        current_user = self._current_user(person_id)
+
+        proposal_id = self.db.add_proposal(
+            call_id, self.db.add_person('PI'), affiliation_id, 'Proposal')
+        self.db.update_proposal(proposal_id, state=ProposalState.FINAL_REVIEW)
+
+        def count_call_queries(function):
+            with count_queries(self.db) as statements:
+                result = function()
+
+            return (
+                len([x for x in statements if re.search(r'FROM call\b', x)]),
+                result)
+
+        with self.app.test_request_context(path='/generic/'):
+            (n, result) = count_call_queries(lambda: view.view_review_call(
+                current_user, self.db, call_id))
+            self.assertEqual(n, 1)
+            self.assertFalse(result['call'].hidden)
+
+            # Subsequent pages (including their authorization checks)
+            # should use the call record already retrieved.
+            (n, result) = count_call_queries(
+                lambda: view.view_proposal_reviews(
+                    current_user, self.db, proposal_id))
+            self.assertEqual(n, 0)
+            self.assertTrue(result['can_edit_decision'])
+
+            (n, result) = count_call_queries(
+                lambda: view.view_proposal_decision(
+                    current_user, self.db, proposal_id, {}, None))
+            self.assertEqual(n, 0)
+
+            # Lookups should check the facility.
+            with self.assertRaises(NoSuchRecord):
+                lookup.get_call(self.db, view.id_ + 1, call_id)
+
+            # Updating the call should cause it to be retrieved again.
+            self.db.update_call(call_id, hidden=True)
+
+            (n, result) = count_call_queries(lambda: view.view_review_call(
+                current_user, self.db, call_id))
+            self.assertEqual(n, 1)
+            self.assertTrue(result['call'].hidden)
+
+        # A new request should not use the previous request's records.
+        with self.app.test_request_context(path='/generic/'):
+            (n, result) = count_call_queries(lambda: view.view_review_call(
+                current_user, self.db, call_id))
+            self.assertEqual(n, 1)
+
+    def test_review_csv_download(self):
+        view = self._get_facility_view('generic')
+        group_class = view.get_group_types()
+        role_class = view.get_reviewer_roles()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        user_id = self.db.add_user('coord', 'pass')
+        coord_person_id = self.db.add_person('Coordinator', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.COORD, coord_person_id)
+        current_user = self._current_user(coord_person_id)
+
+        reviewer_person_id = self.db.add_person('Reviewer')
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.CTTEE, reviewer_person_id)
+
+        for i in range(2):
+            proposal_id = self.db.add_proposal(
+                call_id, self.db.add_person('PI {}'.format(i)),
+                affiliation_id, 'Proposal "{}"'.format(i))
+            self.db.add_member(
+                proposal_id, self.db.add_person('CoI {}'.format(i)),
+                affiliation_id)
+            self.db.update_proposal(
+                proposal_id, state=ProposalState.FINAL_REVIEW)
+
+            reviewer_id = self.db.add_reviewer(
+                role_class, proposal_id, reviewer_person_id,
+                role_class.CTTEE_PRIMARY)
+            self.db.set_review(
+                role_class, reviewer_id,
+                text='Review', format_=FormatType.PLAIN,
+                assessment=None, rating=(50 + 10 * i), weight=(20 * i),
+                note='Note', note_format=FormatType.PLAIN, note_public=False,
+                state=ReviewState.DONE)
+
+        def get_download(function):
+            with self.app.test_request_context(path='/generic/'):
+                (data, mime_type, filename) = function()
+
+                # The file should be streamed rather than returned whole.
+                self.assertNotIsInstance(data, bytes)
+                self.assertEqual(mime_type, 'text/csv')
+
+                return (filename, b''.join(data).decode('utf-8'))
+
+        # The expected files are as produced before streaming was
+        # introduced.
+        tabulation_titles = (
+            '"Proposal","Type","PI name","PI affiliation","PI institution",'
+            '"Co-Investigators","Title","State","Decision","Exempt",'
+            '"Rating","Rating std. dev.","Categories","test aff/n",'
+            '"Unknown"')
+        tabulation_rows = [
+            ('"test-test-1","Std","PI 0","test aff/n","",1,'
+             '"Proposal ""0""","Final review","","","","","",1.0,""',
+             ',"CoI 0 (test aff/n)"'),
+            ('"test-test-2","Std","PI 1","test aff/n","",1,'
+             '"Proposal ""1""","Final review","","",60.0,0.0,"",1.0,""',
+             ',"CoI 1 (test aff/n)"'),
+        ]
+
+        self.assertEqual(
+            get_download(lambda: view.view_review_call_tabulation_download(
+                current_user, self.db, call_id)),
+            ('proposals-test-test-standard.csv', ''.join(
+                x + '\n' for x in chain(
+                    [tabulation_titles + ',"Co-Investigator names"'],
+                    (x + y for (x, y) in tabulation_rows)))))
+
+        self.assertEqual(
+            get_download(lambda: view.view_review_call_tabulation_download(
+                current_user, self.db, call_id, with_cois=False)),
+            ('proposals-test-test-standard.csv', ''.join(
+                x + '\n' for x in chain(
+                    [tabulation_titles], (x for (x, y) in tabulation_rows)))))
+
+        self.assertEqual(
+            get_download(lambda: view.view_review_call_stats_download(
+                current_user, self.db, call_id, {})),
+            ('review-stats-test-test-standard.csv',
+             '"Proposal","Reviewer","Weight"\n'
+             '"test-test-1",50,0.0\n'
+             '"test-test-2",60,0.2\n'))
+
+    def test_review_csv_download_blocks(self):
+        view = self._get_facility_view('generic')
+        group_class = view.get_group_types()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        user_id = self.db.add_user('coord', 'pass')
+        coord_person_id = self.db.add_person('Coordinator', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.COORD, coord_person_id)
+        current_user = self._current_user(coord_person_id)
+
+        for i in range(5):
+            proposal_id = self.db.add_proposal(
+                call_id, self.db.add_person('PI {}'.format(i)),
+                affiliation_id, 'Proposal {}'.format(i))
+            self.db.update_proposal(
+                proposal_id, state=ProposalState.FINAL_REVIEW)
+
+        # Record when the user's authorization is applied to each proposal
+        # and when its row is written, to check that the proposals are
+        # handled in blocks rather than all before the first row.
+        events = []
+
+        orig_entry = view._get_proposal_tabulation_entry
+        orig_rows = view._get_proposal_tabulation_rows
+
+        def get_entry(*args):
+            entry = orig_entry(*args)
+            events.append(('entry', entry['code']))
+            return entry
+
+        def get_rows(tabulation):
+            for (row, proposal) in zip(
+                    orig_rows(tabulation), tabulation['proposals']):
+                events.append(('row', proposal['code']))
+                yield row
+
+        view._get_proposal_tabulation_entry = get_entry
+        view._get_proposal_tabulation_rows = get_rows
+        orig_block_size = self.db.query_block_size
+        self.db.query_block_size = 2
+
+        try:
+            with self.app.test_request_context(path='/generic/'):
+                (data, mime_type, filename) = \
+                    view.view_review_call_tabulation_download(
+                        current_user, self.db, call_id, with_cois=False)
+
+                # Nothing should be done for the proposals until the
+                # file is read.
+                self.assertEqual(events, [])
+
+                lines = b''.join(data).decode('utf-8').splitlines()
+
+        finally:
+            del view._get_proposal_tabulation_entry
+            del view._get_proposal_tabulation_rows
+            self.db.query_block_size = orig_block_size
+
+        self.assertEqual(len(lines), 6)
+
+        codes = ['test-test-{}'.format(i + 1) for i in range(5)]
+        self.assertEqual(events, [
+            (event, codes[i])
+            for block in ((0, 1), (2, 3), (4,))
+            for event in ('entry', 'row')
+            for i in block])
+
+    def test_reviewer_notify(self):
+        view = self._get_facility_view('generic')
+        group_class = view.get_group_types()
+        role_class = view.get_reviewer_roles()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        user_id = self.db.add_user('coord', 'pass')
+        coord_person_id = self.db.add_person('Coordinator', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.COORD, coord_person_id)
+        current_user = self._current_user(coord_person_id)
+
+        # Assign a reviewer to each proposal, the first reviewer having
+        # two reviews.  Reviewers are unregistered so they will also
+        # be sent invitation tokens.
+        person_ids = []
+        for i in range(3):
+            person_id = self.db.add_person('Reviewer {}'.format(i))
+            self.db.add_group_member(
+                group_class, call.queue_id, group_class.CTTEE, person_id)
+            person_ids.append(person_id)
+
+        reviewer_ids = []
+        for (i, person_id) in enumerate([person_ids[0]] + person_ids):
+            proposal_id = self.db.add_proposal(
+                call_id, self.db.add_person('PI {}'.format(i)),
+                affiliation_id, 'Proposal {}'.format(i))
+            self.db.update_proposal(proposal_id, state=ProposalState.REVIEW)
+            reviewer_ids.append(self.db.add_reviewer(
+                role_class, proposal_id, person_id, role_class.CTTEE_PRIMARY))
+
+        # Notify all reviewers except the last.
+        form = {'submit_confirm': 'Send notifications'}
+        for reviewer_id in reviewer_ids[:-1]:
+            form['reviewer_{}'.format(reviewer_id)] = '1'
+
+        with self.app.test_request_context(path='/generic/'):
+            with self.assertRaises(HTTPRedirect):
+                view.view_reviewer_notify(
+                    current_user, self.db, call_id,
+                    role_class.CTTEE_PRIMARY, form)
+
+        messages = self.db.search_message(
+            state=MessageState.UNSENT, oldest_first=True,
+            with_recipients=True, with_body=True)
+
+        self.assertEqual(
+            [[y.person_id for y in x.recipients.values()]
+             for x in messages.values()],
+            [[person_ids[0]], [person_ids[1]]])
+
+        self.assertEqual(
+            [x.subject for x in messages.values()],
+            ['Assignment of committee primary reviews',
+             'Assignment of committee primary review'])
+
+        for message in messages.values():
+            self.assertIn('invitation', message.body)
+
+        reviewers = self.db.search_reviewer(call_id=call_id)
+        self.assertEqual(
+            [reviewers[x].notified for x in reviewer_ids],
+            [True, True, True, False])
@@ -29,6 +29,9 @@ from .compat import TestCase
 
 class JCMTAffiliationTestCase(TestCase):
     def test_affiliation_assignment(self):
+        self.member_collections = []
+        self.ref_assignments = []
+
         # Set up "constants" for test affiliation IDs.
         UNKNOWN = 0  # Returned by Hedwig.
         AFF_1 = 1
@@ -272,6 +275,21 @@ class JCMTAffiliationTestCase(TestCase):
              AFF_3: 0.5 * (20 / 90) +
                 0.5 * ((2 * (20 / 90) * 50) / 190)})
 
+        # Check that calculating the assignments for all of the above
+        # member collections together gives the same results.
+        assignments = JCMT(1).calculate_affiliation_assignments(
+            db=None, member_collections=self.member_collections,
+            affiliations=affiliations)
+
+        self.assertEqual(len(assignments), len(self.ref_assignments))
+
+        for (assignment, ref_assignment) in zip(
+                assignments, self.ref_assignments):
+            self.assertEqual(set(assignment.keys()), set(ref_assignment.keys()))
+
+            for (aff_id, aff_frac) in ref_assignment.items():
+                self.assertAlmostEqual(assignment[aff_id], aff_frac, places=5)
+
     def _test_affiliation_assignment(self, title, affiliations, pi, cois,
                                      ref_assignment):
         view = JCMT(1)
@@ -291,6 +309,9 @@ class JCMTAffiliationTestCase(TestCase):
             members[i] = null_tuple(Member)._replace(
                 id=i, affiliation_id=coi, pi=False)
 
+        self.member_collections.append(members)
+        self.ref_assignments.append(ref_assignment)
+
         # Compute assignment, make set of affiliations and check total.
         assignment = view.calculate_affiliation_assignment(
             db=None, members=members, affiliations=affiliations)
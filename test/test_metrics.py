@@ -0,0 +1,205 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from hedwig.metrics import Metrics, read_metrics_file
+from hedwig.type.enum import MessageState
+from hedwig.util import get_logger
+
+from .dummy_db import DBTestCase
+from .util import null_log
+
+
+class MetricsTestCase(DBTestCase):
+    def test_poll_task(self):
+        metrics = Metrics()
+        logger = get_logger('hedwig.test_metrics')
+
+        with null_log('hedwig.test_metrics'):
+            with metrics.poll_task('email') as task:
+                task.items = 3
+                logger.warning('Not an error')
+                logger.error('Failed to send message')
+
+        with self.assertRaises(ZeroDivisionError):
+            with metrics.poll_task('moc') as task:
+                1 / 0
+
+        with metrics.poll_task('email') as task:
+            task.items = 2
+
+        text = metrics.format_prometheus()
+
+        self.assertIn(
+            '# TYPE hedwig_poll_task_runs_total counter\n', text)
+        self.assertIn('hedwig_poll_task_runs_total{task="email"} 2\n', text)
+        self.assertIn('hedwig_poll_task_runs_total{task="moc"} 1\n', text)
+        self.assertIn('hedwig_poll_task_items_total{task="email"} 5\n', text)
+        self.assertIn('hedwig_poll_task_items_total{task="moc"} 0\n', text)
+        self.assertIn('hedwig_poll_task_errors_total{task="email"} 1\n', text)
+        self.assertIn('hedwig_poll_task_errors_total{task="moc"} 1\n', text)
+        self.assertRegex(
+            text,
+            r'hedwig_poll_task_duration_seconds_total{task="email"} [0-9.e-]+')
+
+        # Backlog is not included until it has been recorded.
+        self.assertNotIn('hedwig_poll_task_backlog', text)
+
+        summary = metrics.format_summary()
+        self.assertEqual(len(summary), 2)
+        self.assertTrue(summary[0].startswith('Poll task email: 2 run(s)'))
+        self.assertIn('5 item(s), 1 error(s)', summary[0])
+
+    def test_poll_backlog(self):
+        counts = self.db.search_pending_count()
+        self.assertIsInstance(counts, dict)
+        self.assertEqual(counts.get('message'), 0)
+        self.assertEqual(counts.get('request_call_pdf'), 0)
+        self.assertEqual(set(counts.values()), set((0,)))
+
+        (call_id, affiliation_id) = self._create_test_call()
+        person_id = self.db.add_person('Person One')
+
+        message_ids = [
+            self.db.add_message('Subject', 'Body', [person_id])
+            for i in range(3)]
+        self.db.add_request_call_pdf(call_id, person_id)
+
+        self.db.update_message(
+            message_ids[0], state=MessageState.SENT, state_is_system=True)
+
+        counts = self.db.search_pending_count()
+        self.assertEqual(counts['message'], 2)
+        self.assertEqual(counts['request_call_pdf'], 1)
+        self.assertEqual(counts['proposal_fig'], 0)
+
+        metrics = Metrics()
+        metrics.record_poll_backlog(
+            self.db, ['email', 'figure', 'reqcallpdf', 'close'])
+
+        text = metrics.format_prometheus()
+        self.assertIn('hedwig_poll_task_backlog{task="email"} 2\n', text)
+        self.assertIn('hedwig_poll_task_backlog{task="figure"} 0\n', text)
+        self.assertIn('hedwig_poll_task_backlog{task="reqcallpdf"} 1\n', text)
+        self.assertNotIn('task="close"', text)
+
+    def test_request(self):
+        metrics = Metrics()
+
+        metrics.record_request('home.home_page', 200, 0.2, 0.05, 4)
+        metrics.record_request('home.home_page', 200, 3.0, 0.15, 6)
+        metrics.record_request('home.home_page', 403, 0.01)
+        metrics.record_request('people.person_view', 200, 0.5, 0.1, 10)
+
+        text = metrics.format_prometheus()
+
+        self.assertIn(
+            'hedwig_http_requests_total'
+            '{endpoint="home.home_page",status="200"} 2\n', text)
+        self.assertIn(
+            'hedwig_http_requests_total'
+            '{endpoint="home.home_page",status="403"} 1\n', text)
+        self.assertIn(
+            '# TYPE hedwig_http_request_duration_seconds histogram\n', text)
+        self.assertIn(
+            'hedwig_http_request_duration_seconds_bucket'
+            '{endpoint="home.home_page",le="0.05"} 1\n', text)
+        self.assertIn(
+            'hedwig_http_request_duration_seconds_bucket'
+            '{endpoint="home.home_page",le="0.25"} 2\n', text)
+        self.assertIn(
+            'hedwig_http_request_duration_seconds_bucket'
+            '{endpoint="home.home_page",le="5.0"} 3\n', text)
+        self.assertIn(
+            'hedwig_http_request_duration_seconds_bucket'
+            '{endpoint="home.home_page",le="+Inf"} 3\n', text)
+        self.assertIn(
+            'hedwig_http_request_duration_seconds_count'
+            '{endpoint="home.home_page"} 3\n', text)
+        self.assertIn(
+            'hedwig_http_request_db_queries_total'
+            '{endpoint="home.home_page"} 10\n', text)
+        self.assertIn(
+            'hedwig_http_request_db_queries_total'
+            '{endpoint="people.person_view"} 10\n', text)
+
+        summary = metrics.format_summary()
+        self.assertEqual(summary, [
+            'Endpoint home.home_page: 3 request(s), mean 1.070 s '
+            '(database 0.067 s, 3.3 queries)',
+            'Endpoint people.person_view: 1 request(s), mean 0.500 s '
+            '(database 0.100 s, 10.0 queries)',
+        ])
+
+    def test_cache(self):
+        metrics = Metrics()
+        self.assertNotIn('cache', metrics.format_prometheus())
+        self.assertEqual(metrics.format_summary(), [])
+
+        stats = [(0, 0)]
+        metrics.add_cache('format', lambda: stats[0])
+        metrics.add_cache('pdf_section', lambda: (1, 3))
+
+        summary = metrics.format_summary()
+        self.assertEqual(summary, [
+            'Cache format: 0 hit(s), 0 miss(es) (0% hits)',
+            'Cache pdf_section: 1 hit(s), 3 miss(es) (25% hits)',
+        ])
+
+        # Statistics should be read each time the metrics are formatted.
+        stats[0] = (9, 1)
+        text = metrics.format_prometheus()
+
+        self.assertIn('# TYPE hedwig_cache_hits_total counter\n', text)
+        self.assertIn('hedwig_cache_hits_total{cache="format"} 9\n', text)
+        self.assertIn('hedwig_cache_misses_total{cache="format"} 1\n', text)
+        self.assertIn(
+            'hedwig_cache_hits_total{cache="pdf_section"} 1\n', text)
+        self.assertIn(
+            'hedwig_cache_misses_total{cache="pdf_section"} 3\n', text)
+
+        # The process name should be included in the metric names.
+        metrics = Metrics(process='poll')
+        metrics.add_cache('format', lambda: (2, 5))
+        self.assertIn(
+            'hedwig_poll_cache_misses_total{cache="format"} 5\n',
+            metrics.format_prometheus())
+
+    def test_file(self):
+        dir_ = mkdtemp()
+
+        try:
+            filename = os.path.join(dir_, 'poll.prom')
+
+            self.assertEqual(read_metrics_file(filename), '')
+
+            metrics = Metrics()
+            metrics.record_poll_task('pdf', 1.5, items=2)
+            metrics.write_file(filename)
+
+            self.assertEqual(os.listdir(dir_), ['poll.prom'])
+            self.assertEqual(
+                read_metrics_file(filename), metrics.format_prometheus())
+
+        finally:
+            rmtree(dir_)
@@ -0,0 +1,96 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import skipIf
+
+try:
+    from hedwig.pdf import weasyprint as pdf_weasyprint
+except ImportError:
+    pdf_weasyprint = None
+
+from .compat import TestCase
+
+
+class StubHTML(object):
+    """
+    Stand-in for WeasyPrint's `HTML` class which records the sections
+    rendered.
+    """
+
+    rendered = []
+
+    def __init__(self, string, base_url, url_fetcher):
+        self.string = string
+
+    def write_pdf(self, stylesheets):
+        self.rendered.append(self.string)
+        return 'PDF {}'.format(self.string).encode('utf-8')
+
+
+@skipIf(pdf_weasyprint is None, 'WeasyPrint not available')
+class PDFWriterWeasyPrintTestCase(TestCase):
+    def setUp(self):
+        self.cache_dir = mkdtemp()
+
+        self.orig_html = pdf_weasyprint.WP_HTML
+        pdf_weasyprint.WP_HTML = StubHTML
+        StubHTML.rendered = []
+
+    def tearDown(self):
+        pdf_weasyprint.WP_HTML = self.orig_html
+
+        rmtree(self.cache_dir)
+
+    def _get_writer(self, cache_dir):
+        return pdf_weasyprint.PDFWriterWeasyPrint(
+            db=None, app=None, base_url='http://localhost/',
+            page_size='letter', cache_dir=cache_dir)
+
+    def test_html_section_cache(self):
+        writer = self._get_writer(self.cache_dir)
+
+        for i in range(2):
+            self.assertEqual(
+                writer._write_html_section(
+                    '<p>A</p>', 'http://base/', None, []),
+                b'PDF <p>A</p>')
+
+        self.assertEqual(StubHTML.rendered, ['<p>A</p>'])
+        self.assertEqual(writer.get_cache_stats(), (1, 1))
+
+        # A changed section should be rendered again.
+        self.assertEqual(
+            writer._write_html_section(
+                '<p>B</p>', 'http://base/', None, []),
+            b'PDF <p>B</p>')
+
+        self.assertEqual(StubHTML.rendered, ['<p>A</p>', '<p>B</p>'])
+        self.assertEqual(writer.get_cache_stats(), (1, 2))
+
+    def test_html_section_no_cache(self):
+        writer = self._get_writer(None)
+
+        for i in range(2):
+            writer._write_html_section('<p>A</p>', 'http://base/', None, [])
+
+        self.assertEqual(StubHTML.rendered, ['<p>A</p>', '<p>A</p>'])
+        self.assertEqual(writer.get_cache_stats(), (0, 0))
@@ -0,0 +1,173 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+from hedwig.config import get_config
+from hedwig.pdf import write as pdf_write
+from hedwig.pdf.poll import process_pdf_cache_expiry
+from hedwig.pdf.write import PDFWriter, prune_cache_dir
+
+from .dummy_config import DummyConfigTestCase
+
+
+class PDFWriterCacheTestCase(DummyConfigTestCase):
+    def setUp(self):
+        super(PDFWriterCacheTestCase, self).setUp()
+
+        self.cache_dir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.cache_dir)
+
+        super(PDFWriterCacheTestCase, self).tearDown()
+
+    def _get_writer(self, page_size='letter'):
+        return PDFWriter(
+            db=None, app=None, base_url='http://localhost/',
+            page_size=page_size, cache_dir=self.cache_dir)
+
+    def _list_cache(self):
+        return sorted(
+            x for (dirpath, dirnames, filenames) in os.walk(self.cache_dir)
+            for x in filenames)
+
+    def test_cache(self):
+        writer = self._get_writer()
+
+        # Initial miss then a hit for the same section.
+        self.assertIsNone(writer._read_cache('http://base/', '<p>A</p>'))
+        self.assertEqual(writer.get_cache_stats(), (0, 1))
+
+        writer._write_cache(b'PDF A', 'http://base/', '<p>A</p>')
+
+        self.assertEqual(
+            writer._read_cache('http://base/', '<p>A</p>'), b'PDF A')
+        self.assertEqual(writer.get_cache_stats(), (1, 1))
+
+        # Only the renamed entry should remain, not the temporary file.
+        entries = self._list_cache()
+        self.assertEqual(len(entries), 1)
+        self.assertRegex(entries[0], r'^[0-9a-f]{64}\.pdf$')
+
+        # The key should change with the HTML, base URL, page size
+        # and software version.
+        self.assertIsNone(writer._read_cache('http://base/', '<p>B</p>'))
+        self.assertIsNone(writer._read_cache('http://other/', '<p>A</p>'))
+        self.assertIsNone(
+            self._get_writer(page_size='A4')._read_cache(
+                'http://base/', '<p>A</p>'))
+
+        orig_version = pdf_write.version
+        pdf_write.version = orig_version + '-test'
+        try:
+            self.assertIsNone(
+                writer._read_cache('http://base/', '<p>A</p>'))
+        finally:
+            pdf_write.version = orig_version
+
+        self.assertEqual(writer.get_cache_stats(), (1, 4))
+
+        # A new writer (e.g. in another worker) should find the entry.
+        writer = self._get_writer()
+        self.assertEqual(
+            writer._read_cache('http://base/', '<p>A</p>'), b'PDF A')
+        self.assertEqual(writer.get_cache_stats(), (1, 0))
+
+    def test_cache_write_interrupted(self):
+        writer = self._get_writer()
+
+        # If the write fails before the rename, no entry should be visible.
+        orig_rename = pdf_write.os.rename
+
+        def failing_rename(src, dst):
+            raise OSError('rename failed')
+
+        pdf_write.os.rename = failing_rename
+        try:
+            with self.assertRaises(OSError):
+                writer._write_cache(b'PDF A', 'http://base/', '<p>A</p>')
+        finally:
+            pdf_write.os.rename = orig_rename
+
+        self.assertIsNone(writer._read_cache('http://base/', '<p>A</p>'))
+
+        entries = self._list_cache()
+        self.assertEqual(len(entries), 1)
+        self.assertTrue(entries[0].endswith('.tmp'))
+
+    def test_prune(self):
+        writer = self._get_writer()
+
+        writer._write_cache(b'PDF A', 'http://base/', '<p>A</p>')
+        writer._write_cache(b'PDF B', 'http://base/', '<p>B</p>')
+
+        # Make all entries old, then use one of them, which should
+        # update its modification time.
+        old = time() - 3600
+        for (dirpath, dirnames, filenames) in os.walk(self.cache_dir):
+            for filename in filenames:
+                os.utime(os.path.join(dirpath, filename), (old, old))
+
+        self.assertEqual(
+            writer._read_cache('http://base/', '<p>A</p>'), b'PDF A')
+
+        self.assertEqual(
+            prune_cache_dir(self.cache_dir, 1800, dry_run=True), 1)
+        self.assertEqual(len(self._list_cache()), 2)
+
+        self.assertEqual(prune_cache_dir(self.cache_dir, 1800), 1)
+        self.assertEqual(len(self._list_cache()), 1)
+
+        self.assertEqual(
+            writer._read_cache('http://base/', '<p>A</p>'), b'PDF A')
+        self.assertIsNone(writer._read_cache('http://base/', '<p>B</p>'))
+
+    def test_poll_expiry(self):
+        config = get_config()
+
+        # Without a cache directory configured, there is nothing to do.
+        self.assertEqual(process_pdf_cache_expiry(), 0)
+
+        config.set('pdf_write', 'cache_dir', self.cache_dir)
+
+        writer = self._get_writer()
+        writer._write_cache(b'PDF A', 'http://base/', '<p>A</p>')
+        writer._write_cache(b'PDF B', 'http://base/', '<p>B</p>')
+
+        self.assertEqual(process_pdf_cache_expiry(), 0)
+
+        old = time() - 40 * 24 * 3600
+        for (dirpath, dirnames, filenames) in os.walk(self.cache_dir):
+            for filename in filenames:
+                os.utime(os.path.join(dirpath, filename), (old, old))
+
+        config.set('pdf_write', 'cache_max_age', '0')
+        self.assertEqual(process_pdf_cache_expiry(), 0)
+
+        config.set('pdf_write', 'cache_max_age', '30')
+        self.assertEqual(process_pdf_cache_expiry(dry_run=True), 2)
+        self.assertEqual(len(self._list_cache()), 2)
+
+        self.assertEqual(process_pdf_cache_expiry(), 2)
+        self.assertEqual(self._list_cache(), [])
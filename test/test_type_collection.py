@@ -20,7 +20,7 @@ from __future__ import absolute_import, division, print_function, \
 
 from collections import namedtuple, OrderedDict
 
-from hedwig.astro.coord import CoordSystem
+from hedwig.astro.coord import CoordSystem, coord_from_dec_deg
 from hedwig.compat import string_type
 from hedwig.error import MultipleRecords, MultipleValues, \
     NoSuchRecord, NoSuchValue, UserError
@@ -44,7 +44,8 @@ from hedwig.type.simple import \
     PrevProposal, \
     Proposal, ProposalFigureInfo, \
     RequestPropPDF, Reviewer, ReviewDeadline, \
-    SiteGroupMember, Target, TargetFracTime, TargetObject
+    SiteGroupMember, Target, TargetFracTime, TargetFracTimeColumns, \
+    TargetObject
 from hedwig.type.util import null_tuple
 
 from .compat import TestCase
@@ -1003,3 +1004,42 @@ class CollectionTypeTestCase(TestCase):
 
         self.assertIsInstance(fl[0], TargetFracTime)
         self.assertIsInstance(fl[1], TargetFracTime)
+
+        # Test "to_frac_time_columns" method.
+        fc = c.to_frac_time_columns()
+        self.assertIsInstance(fc, TargetFracTimeColumns)
+        self.assertEqual(fc.system, [CoordSystem.ICRS, CoordSystem.ICRS])
+        self.assertEqual(fc.x, [15.0, 45.0])
+        self.assertEqual(fc.y, [45.0, 15.0])
+        self.assertEqual(fc.frac_time, [x.frac_time for x in fl])
+
+        # Add targets in another system, without coordinates and without
+        # a time and check the object list is still in order.
+        c[3] = null_tuple(Target)._replace(
+            name='Target 3', system=CoordSystem.GAL, x=135.0, y=-16.0,
+            time=2.0)
+        c[4] = null_tuple(Target)._replace(name='Target 4', time=3.0)
+        c[5] = null_tuple(Target)._replace(
+            name='Target 5', system=CoordSystem.ICRS, x=60.0, y=-5.0)
+
+        ol = c.to_object_list()
+        self.assertEqual(
+            [x.name for x in ol],
+            ['Target 1', 'Target 2', 'Target 3', 'Target 5'])
+
+        for (o, v) in zip(ol, (c[1], c[2], c[3], c[5])):
+            self.assertEqual(o.system, v.system)
+            self.assertEqual(o.time, v.time)
+            self.assertAlmostEqual(
+                o.coord.separation(
+                    coord_from_dec_deg(v.system, v.x, v.y)).degree,
+                0.0)
+
+        fl = c.to_frac_time_list()
+        self.assertEqual(len(fl), 3)
+        self.assertEqual(
+            [x.frac_time for x in fl], [4.5 / 15.0, 5.5 / 15.0, 2.0 / 15.0])
+
+        fc = c.to_frac_time_columns()
+        self.assertEqual(fc.x, [15.0, 45.0, 135.0])
+        self.assertEqual(fc.frac_time, [x.frac_time for x in fl])
@@ -101,6 +101,9 @@ class TypeUtilTestCase(TestCase):
             self.assertEqual(t_x.x, 1)
             self.assertEqual(t_x.y, 2)
 
+        # The extended tuple type should be re-used.
+        self.assertIs(type(t_t), type(t_f))
+
     def test_with_can_view_edit(self):
         TestTuple = namedtuple('TestTuple', ('x', 'y'))
 
@@ -0,0 +1,50 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from datetime import timedelta
+
+from hedwig.view.admin import AdminView
+
+from .base_app import WebAppTestCase
+
+
+class AdminViewTestCase(WebAppTestCase):
+    def test_message_list_date(self):
+        view = AdminView()
+
+        person_id = self.db.add_person('Person One')
+        message_id = self.db.add_message('Subject', 'Body', [person_id])
+        date = self.db.get_message(message_id).date
+
+        def search(date_after, date_before):
+            with self.app.test_request_context(path='/admin/message'):
+                return list(view.message_list(None, self.db, {
+                    'date_after': date_after.strftime('%Y-%m-%d'),
+                    'date_before': date_before.strftime('%Y-%m-%d'),
+                }, None)['messages'].keys())
+
+        # The "until" date should be inclusive.
+        self.assertEqual(search(date, date), [message_id])
+        self.assertEqual(
+            search(date - timedelta(days=1), date), [message_id])
+        self.assertEqual(
+            search(date - timedelta(days=2), date - timedelta(days=1)), [])
+        self.assertEqual(
+            search(date + timedelta(days=1), date + timedelta(days=1)), [])
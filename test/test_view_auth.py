@@ -61,6 +61,89 @@ class WebAppAuthTestCase(WebAppTestCase):
             auth.can_be_admin(
                 self._current_user(None, user_id=unreg), self.db)
 
+    def test_find_addable_reviews(self):
+        view = first_value(self.facilities).view
+        group_class = view.get_group_types()
+        role_class = view.get_reviewer_roles()
+        type_class = view.get_call_types()
+
+        (call_id, affiliation_id) = self._create_test_call(
+            facility_id=view.id_)
+        call = self.db.get_call(view.id_, call_id)
+
+        user_id = self.db.add_user('cttee', 'pass')
+        person_id = self.db.add_person('Committee', user_id=user_id)
+        self.db.add_group_member(
+            group_class, call.queue_id, group_class.CTTEE, person_id)
+        current_user = self._current_user(person_id)
+
+        other_person_id = self.db.add_person('Other')
+
+        def add_proposal(state, member=False, roles=(), other_roles=()):
+            proposal_id = self.db.add_proposal(
+                call_id, other_person_id, affiliation_id, 'Proposal')
+            if member:
+                self.db.add_member(
+                    proposal_id, person_id, affiliation_id,
+                    False, False, False)
+            for role in roles:
+                self.db.add_reviewer(
+                    role_class, proposal_id, person_id, role)
+            for role in other_roles:
+                self.db.add_reviewer(
+                    role_class, proposal_id, other_person_id, role)
+            self.db.update_proposal(proposal_id, state=state)
+            return proposal_id
+
+        expect = {
+            # Committee "other" review can be added.
+            add_proposal(ProposalState.REVIEW): [role_class.CTTEE_OTHER],
+            # Already a committee reviewer, but can add feedback.
+            add_proposal(
+                ProposalState.FINAL_REVIEW,
+                roles=[role_class.CTTEE_PRIMARY]): [role_class.FEEDBACK],
+            # Committee "other" review also available in final review.
+            add_proposal(
+                ProposalState.FINAL_REVIEW,
+                other_roles=[role_class.CTTEE_PRIMARY]): [
+                    role_class.CTTEE_OTHER],
+        }
+
+        # Proposals for which no reviews can be added.
+        add_proposal(ProposalState.REVIEW, member=True)
+        add_proposal(ProposalState.REVIEW, roles=[role_class.CTTEE_SECONDARY])
+        add_proposal(
+            ProposalState.FINAL_REVIEW,
+            roles=[role_class.CTTEE_PRIMARY],
+            other_roles=[role_class.FEEDBACK])
+        add_proposal(ProposalState.SUBMITTED)
+        add_proposal(ProposalState.ACCEPTED, roles=[role_class.CTTEE_PRIMARY])
+
+        # Compare to the result of checking every proposal individually.
+        reference = {}
+        for proposal in self.db.search_proposal(
+                with_members=True, with_reviewers=True).values():
+            roles = auth.can_add_review_roles(
+                group_class, type_class, role_class, current_user, self.db,
+                proposal, include_indirect=False, auth_cache={})
+            if roles:
+                reference[proposal.id] = roles
+
+        self.assertEqual(reference, expect)
+
+        result = auth.find_addable_reviews(
+            current_user, self.db, self.facilities, auth_cache={})
+
+        self.assertEqual(
+            {k: [x.role for x in v.reviewers.values()]
+             for (k, v) in result.items()},
+            expect)
+
+        for proposal in result.values():
+            self.assertEqual(proposal.member.person_id, other_person_id)
+            self.assertEqual(proposal.member.person_name, 'Other')
+            self.assertEqual(proposal.queue_id, call.queue_id)
+
     def test_view_auth(self):
         # Display default assert method failure messages as well as our
         # identifiers.
@@ -999,6 +1082,14 @@ class WebAppAuthTestCase(WebAppTestCase):
                         expect, 'auth review case {} state {}'.format(
                             case_number, state_name))
 
+                    self.assertEqual(
+                        auth.for_review_many(
+                            group_class, role_class, current_user, self.db,
+                            {reviewer.id: reviewer}, {proposal.id: proposal}),
+                        {reviewer.id: expect},
+                        'auth review many case {} state {}'.format(
+                            case_number, state_name))
+
     def _test_auth_add_review(
             self, group_class, type_class, role_class, auth_cache,
             case_number, person_id, is_admin,
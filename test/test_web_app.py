@@ -19,9 +19,23 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 from datetime import datetime, timedelta
+import gzip
+from hashlib import md5
+from io import BytesIO
+import json
+import logging
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
 
 from hedwig.db.compat import select
+from hedwig.db.instrument import get_query_stats
 from hedwig.db.meta import auth_token
+from hedwig.metrics import Metrics
+from hedwig.type.simple import CurrentUser, UserInfo
+from hedwig.type.util import null_tuple
+from hedwig.web.app import create_web_app
+from hedwig.web.util import fixed_current_user_environ_key
 
 from .base_app import WebAppTestCase
 
@@ -138,3 +152,232 @@ class BasicWebAppTestCase(WebAppTestCase):
         # Database entry for token should have been cleared.
         expiry = _get_expiry()
         self.assertIsNone(expiry)
+
+    def test_query_institution_list(self):
+        self.db.add_institution('Institution One', '', '', '', 'GB')
+
+        rv = self.client.get('/query/institutions')
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.mimetype, 'application/json')
+        data = json.loads(rv.data)
+        self.assertEqual(
+            [x['text_full'] for x in data],
+            ['Institution One United Kingdom'])
+
+        # The ETag should depend only on the content, so that it is the
+        # same for all application processes.
+        etag = rv.headers['ETag']
+        self.assertEqual(etag, '"{}"'.format(md5(rv.data).hexdigest()))
+
+        # A conditional request should give "not modified".
+        rv = self.client.get(
+            '/query/institutions', headers={'If-None-Match': etag})
+        self.assertEqual(rv.status_code, 304)
+
+        # Check the compressed version.
+        rv = self.client.get(
+            '/query/institutions', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.headers['Content-Encoding'], 'gzip')
+        self.assertNotEqual(rv.headers['ETag'], etag)
+        with gzip.GzipFile(fileobj=BytesIO(rv.data)) as f:
+            self.assertEqual(json.loads(f.read().decode('utf-8')), data)
+
+        # Adding an institution should invalidate the cached list.
+        self.db.add_institution('Institution Two', '', '', '', 'FR')
+
+        rv = self.client.get(
+            '/query/institutions', headers={'If-None-Match': etag})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers['ETag'], etag)
+        self.assertEqual(len(json.loads(rv.data)), 2)
+
+        # Test searching.
+        rv = self.client.get('/query/institutions?q=inst+fr')
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(
+            [x['text_full'] for x in json.loads(rv.data)],
+            ['Institution Two France'])
+
+        rv = self.client.get('/query/institutions?q=inst&limit=1')
+        self.assertEqual(len(json.loads(rv.data)), 1)
+
+        rv = self.client.get('/query/institutions?q=two+one')
+        self.assertEqual(json.loads(rv.data), [])
+
+    def test_fixed_current_user(self):
+        app = create_web_app(
+            db=self.db, facility_spec=self.facility_spec,
+            without_auth=True)
+        app.config['TESTING'] = True
+        client = app.test_client()
+
+        user_id = self.db.add_user('user1', 'pass1')
+        person_id = self.db.add_person('Person One', user_id=user_id)
+        person = self.db.get_person(person_id)
+
+        current_user = CurrentUser(
+            user=null_tuple(UserInfo)._replace(id=user_id),
+            person=person, is_admin=False, auth_token_id=None, options={})
+
+        # The fixed log in information should be applied to requests
+        # for which it is present in the environment.
+        rv = client.get('/', environ_overrides={
+            fixed_current_user_environ_key: current_user})
+        self.assertEqual(rv.status_code, 200)
+        self.assertInEncoded('Person One', rv.data)
+
+    def test_query_stats(self):
+        self.config.set('query_stats', 'enable', 'yes')
+        self.config.set('query_stats', 'response_header', 'yes')
+        self.config.set('query_stats', 'slow_query_time', '0.0')
+
+        app = create_web_app(
+            db=self.db, facility_spec=self.facility_spec,
+            without_logger=True)
+        app.config['TESTING'] = True
+        client = app.test_client()
+
+        self.db.add_user('user1', 'pass1')
+
+        with self.assertLogs(app.logger, level='WARNING') as log:
+            rv = client.post(
+                '/user/log_in',
+                data={'user_name': 'user1', 'password': 'pass1'})
+
+        header = rv.headers.get('X-Hedwig-Query-Stats')
+        self.assertIsNotNone(header)
+        self.assertRegex(header, r'^count=[1-9]\d*; db=[0-9.]+ms; lock=')
+
+        self.assertTrue(any('Slow query' in x for x in log.output))
+
+        # Statistics should not be left active after the request.
+        self.assertIsNone(get_query_stats())
+
+    def test_log_files(self):
+        dir_ = mkdtemp()
+        loggers = [logging.getLogger(x) for x in (
+            'hedwig.slow_query', 'hedwig.metrics')]
+
+        try:
+            slow_query_log = os.path.join(dir_, 'slow_query.log')
+            metrics_log = os.path.join(dir_, 'metrics.log')
+
+            self.config.set('query_stats', 'enable', 'yes')
+            self.config.set('query_stats', 'slow_query_time', '0.0')
+            self.config.set('query_stats', 'slow_query_log', slow_query_log)
+            self.config.set('metrics', 'enable', 'yes')
+            self.config.set('metrics', 'log_interval', '0.000001')
+            self.config.set('metrics', 'log_file', metrics_log)
+
+            # Creating several applications should not add further
+            # handlers to the (process-wide) loggers.
+            for i in range(3):
+                app = create_web_app(
+                    db=self.db, facility_spec=self.facility_spec,
+                    without_logger=True)
+
+            for logger in loggers:
+                self.assertEqual(len(logger.handlers), 1)
+
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            self.db.add_user('user1', 'pass1')
+            rv = client.post(
+                '/user/log_in',
+                data={'user_name': 'user1', 'password': 'pass1'})
+            self.assertEqual(rv.status_code, 303)
+
+            for handler in (x for y in loggers for x in y.handlers):
+                handler.flush()
+
+            with open(slow_query_log) as f:
+                self.assertIn('Slow query', f.read())
+
+            # Each summary line should have been written only once.
+            with open(metrics_log) as f:
+                lines = [x.split(' ', 1)[1] for x in f]
+
+            self.assertTrue(lines)
+            self.assertEqual(len(lines), len(set(lines)))
+
+        finally:
+            for logger in loggers:
+                for handler in list(logger.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+
+            rmtree(dir_)
+
+    def test_metrics(self):
+        dir_ = mkdtemp()
+
+        try:
+            poll_file = os.path.join(dir_, 'poll.prom')
+
+            poll_metrics = Metrics(process='poll')
+            poll_metrics.record_poll_task('email', 0.5, items=3)
+            poll_metrics.add_cache('pdf_section', lambda: (4, 1))
+            poll_metrics.write_file(poll_file)
+
+            self.config.set('metrics', 'enable', 'yes')
+            self.config.set('metrics', 'poll_file', poll_file)
+
+            app = create_web_app(
+                db=self.db, facility_spec=self.facility_spec,
+                without_logger=True)
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            for i in range(2):
+                rv = client.get('/')
+                self.assertEqual(rv.status_code, 200)
+
+            rv = client.get('/no_such_page')
+            self.assertEqual(rv.status_code, 404)
+
+            self.db.add_user('user1', 'pass1')
+            rv = client.post(
+                '/user/log_in',
+                data={'user_name': 'user1', 'password': 'pass1'})
+            self.assertEqual(rv.status_code, 303)
+
+            rv = client.get('/metrics')
+            self.assertEqual(rv.status_code, 200)
+            self.assertTrue(rv.content_type.startswith('text/plain'))
+            text = rv.get_data(as_text=True)
+
+            self.assertIn(
+                'hedwig_http_requests_total'
+                '{endpoint="home.home_page",status="200"} 2\n', text)
+            self.assertIn(
+                'hedwig_http_requests_total'
+                '{endpoint="none",status="404"} 1\n', text)
+            self.assertRegex(
+                text,
+                r'hedwig_http_request_db_queries_total'
+                r'{endpoint="people.log_in"} [1-9]\d*\n')
+
+            # The formatted text cache statistics should be included.
+            self.assertRegex(
+                text, r'hedwig_web_cache_hits_total{cache="format"} \d+\n')
+            self.assertRegex(
+                text, r'hedwig_web_cache_misses_total{cache="format"} \d+\n')
+
+            # The poller's metrics should also be included.
+            self.assertIn(
+                'hedwig_poll_task_items_total{task="email"} 3\n', text)
+            self.assertIn(
+                'hedwig_poll_cache_hits_total{cache="pdf_section"} 4\n', text)
+
+            # Statistics should not be left active after the request.
+            self.assertIsNone(get_query_stats())
+
+            # Access should only be allowed from the configured addresses.
+            rv = client.get('/metrics', environ_overrides={
+                'REMOTE_ADDR': '192.0.2.1'})
+            self.assertEqual(rv.status_code, 403)
+
+        finally:
+            rmtree(dir_)
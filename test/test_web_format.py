@@ -22,7 +22,7 @@ from markupsafe import Markup
 
 from hedwig.type.enum import FormatType, MessageFormatType
 from hedwig.type.simple import Message, ProposalText
-from hedwig.web.format import format_message_text, format_text, \
+from hedwig.web.format import format_cache, format_message_text, format_text, \
     format_text_plain, format_text_plain_inline, format_title_markup
 from hedwig.web.util import HTTPError
 from hedwig.type.util import null_tuple
@@ -59,6 +59,21 @@ class TextFormatTest(TestCase):
         self.assertIsInstance(result, Markup)
         self.assertRegex(result, r'<h3>Head MD</h3>')
 
+    def test_format_cache(self):
+        # Check that repeated formatting is served from the cache.
+        (hits, misses) = format_cache.get_stats()
+        for i in range(3):
+            result = format_text('# Cached MD\n\n', FormatType.MD)
+            self.assertIsInstance(result, Markup)
+            self.assertRegex(result, r'<h3>Cached MD</h3>')
+
+        (hits_end, misses_end) = format_cache.get_stats()
+        self.assertGreaterEqual(hits_end - hits, 2)
+
+        # The cache should be keyed by a digest rather than the text itself.
+        for key in format_cache.cache.keys():
+            self.assertNotIn('# Cached MD\n\n', key)
+
     def test_format_message(self):
         with self.assertRaises(HTTPError):
             format_message_text(null_tuple(Message)._replace(
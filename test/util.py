@@ -21,6 +21,8 @@ from __future__ import absolute_import, division, print_function, \
 from contextlib import contextmanager
 import logging
 
+from sqlalchemy import event
+
 
 @contextmanager
 def temporary_dict(dictionary, values):
@@ -46,3 +48,27 @@ def null_log(logger_name):
         yield
     finally:
         logger.removeHandler(handler)
+
+
+@contextmanager
+def count_queries(db):
+    """
+    Context manager which counts the SQL statements executed
+    by the given database object.
+
+    Yields a list to which each statement is appended.
+    """
+
+    statements = []
+
+    def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db._engine, 'before_cursor_execute', before_cursor_execute)
+
+    try:
+        yield statements
+    finally:
+        event.remove(
+            db._engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,143 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+hb - Hedwig benchmark suite
+
+Usage:
+    hb [--proposals <n>] [--repeat <n>] [--seed <n>]
+        [--output <file>] [--compare <file>] [<pattern>...]
+    hb --list
+
+Options:
+    --help, -h            Show usage information.
+    --list                List the available benchmarks.
+    --proposals <n>       Number of proposals to generate [default: 2000].
+    --repeat <n>          Number of timed iterations [default: 5].
+    --seed <n>            Random number generator seed [default: 1].
+    --output <file>       Write results to the given JSON file.
+    --compare <file>      Compare with results from a previous run.
+
+Benchmarks are selected by the given patterns, if any, which
+match the start of the benchmark name.  The suite is run via:
+
+    PYTHONPATH=lib:util/benchmark python -m hb
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from datetime import datetime
+from io import open
+import json
+import logging
+import platform
+from timeit import default_timer
+
+from docopt import docopt
+
+from hedwig.version import version
+
+from .data import create_benchmark_data
+from .suite import benchmarks, run_benchmark
+
+
+def main():
+    args = docopt(__doc__)
+
+    if args['--list']:
+        for name in benchmarks.keys():
+            print(name)
+        return
+
+    # Poll tasks log warnings about the synthetic data, e.g. proposals
+    # in unexpected states, which we do not want to see.
+    logging.basicConfig(level=logging.ERROR)
+
+    patterns = args['<pattern>']
+    selected = [
+        bm for bm in benchmarks.values()
+        if (not patterns) or any(bm.name.startswith(x) for x in patterns)]
+
+    if not selected:
+        raise Exception('no benchmarks matched the given patterns')
+
+    n_proposals = int(args['--proposals'])
+    repeat = int(args['--repeat'])
+    seed = int(args['--seed'])
+
+    baseline = None
+    if args['--compare']:
+        with open(args['--compare'], 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    start = default_timer()
+    data = create_benchmark_data(n_proposals=n_proposals, seed=seed)
+    print('Generated data for {} proposals in {:.1f} s'.format(
+        n_proposals, default_timer() - start))
+    print()
+
+    print('{:32} {:>10} {:>10} {:>8}{}'.format(
+        'Benchmark', 'Best/ms', 'Median/ms', 'Queries',
+        '' if baseline is None else ' {:>10} {:>8}'.format(
+            'Base/ms', 'Change')))
+
+    results = {}
+
+    for bm in selected:
+        try:
+            result = run_benchmark(bm, data, repeat=repeat)
+
+        except Exception as e:
+            # Report the failure but continue with the other benchmarks.
+            print('{:32} failed: {}: {}'.format(
+                bm.name, type(e).__name__, e))
+            continue
+
+        results[bm.name] = result._asdict()
+
+        comparison = ''
+        if baseline is not None:
+            base = baseline.get(bm.name)
+            if base is None:
+                comparison = ' {:>10} {:>8}'.format('-', '-')
+            else:
+                comparison = ' {:10.1f} {:+7.1f}%'.format(
+                    1000.0 * base['best'],
+                    100.0 * (result.best - base['best']) / base['best'])
+
+        print('{:32} {:10.1f} {:10.1f} {:8d}{}'.format(
+            bm.name, 1000.0 * result.best, 1000.0 * result.median,
+            result.queries, comparison))
+
+    if args['--output']:
+        with open(args['--output'], 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'date': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
+                'hedwig_version': version,
+                'python_version': platform.python_version(),
+                'parameters': {
+                    'proposals': n_proposals,
+                    'repeat': repeat,
+                    'seed': seed,
+                },
+                'results': results,
+            }, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
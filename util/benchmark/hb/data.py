@@ -0,0 +1,404 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+Synthetic data generator for the benchmark suite.
+
+Calls, semesters and other small items are created via the usual database
+methods, but the bulk of the data (people, proposals, members, reviewers,
+reviews, targets and messages) is inserted directly into the tables
+since adding thousands of proposals one by one would dominate the
+run time of the suite.
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from collections import namedtuple
+from datetime import datetime
+from random import Random
+
+from astropy.coordinates import SkyCoord
+from pymoc import MOC
+from pymoc.util.catalog import catalog_to_cells
+
+from hedwig import config
+from hedwig.astro.coord import CoordSystem
+from hedwig.compat import first_value
+from hedwig.db.compat import select
+from hedwig.db.meta import decision, email, member, message, \
+    message_recipient, person, proposal, review, reviewer, target
+from hedwig.type.enum import FormatType, MessageFormatType, MessageState, \
+    ProposalState, ReviewState
+from hedwig.type.simple import CurrentUser, UserInfo
+from hedwig.type.util import null_tuple
+from hedwig.web.app import create_web_app
+
+from test.dummy_db import get_dummy_database
+
+BenchmarkData = namedtuple(
+    'BenchmarkData',
+    ('db', 'app', 'facilities', 'view', 'call_id', 'close_call_id', 'queue_id',
+     'proposal_ids', 'person_ids', 'admin', 'committee', 'moc_id'))
+
+
+def configure():
+    """
+    Set up the configuration system to use the template configuration file,
+    in the same way as the test suite.
+    """
+
+    config.MemoCache.clear_all()
+
+    if not config.config_file[-1].endswith('.template'):
+        config.config_file = config.config_file[:-1] + (
+            config.config_file[-1] + '.template',)
+
+    # Email messages can not be prepared without a sender address.
+    config.get_config().set('email', 'from', 'Hedwig <hedwig@example.org>')
+
+
+def create_benchmark_data(n_proposals=2000, seed=1):
+    """
+    Create an in-memory database and populate it with synthetic data.
+
+    :param n_proposals: number of proposals in the main (review) call
+    :param seed: random number generator seed
+
+    :return: a `BenchmarkData` tuple
+    """
+
+    configure()
+
+    rng = Random(seed)
+
+    db = get_dummy_database(randomize_ids=False, facility_spec='Generic')
+    facilities = config.get_facilities(db=db, facility_spec='Generic')
+    view = first_value(facilities).view
+
+    role_class = view.get_reviewer_roles()
+    group_class = view.get_group_types()
+
+    semester_id = db.add_semester(
+        view.id_, 'Benchmark', 'BM',
+        datetime(2021, 2, 1), datetime(2021, 7, 31))
+
+    queue_id = db.add_queue(view.id_, 'Benchmark', 'BM')
+    close_queue_id = db.add_queue(view.id_, 'Closing', 'CL')
+
+    call_id = _add_call(db, view, semester_id, queue_id)
+    close_call_id = _add_call(db, view, semester_id, close_queue_id)
+
+    affiliation_ids = [
+        db.add_affiliation(
+            view.get_affiliation_types(), queue_id, 'Affiliation {}'.format(i))
+        for i in range(5)]
+
+    close_affiliation_id = db.add_affiliation(
+        view.get_affiliation_types(), close_queue_id, 'Affiliation')
+
+    # Create people: the administrator and committee members are created
+    # individually, everyone else in bulk.
+    admin_id = db.add_person('Administrator')
+    db.update_person(admin_id, admin=True, _test_skip_check=True)
+    admin = _current_user(db, admin_id, is_admin=True)
+
+    committee_ids = [
+        db.add_person('Committee Member {}'.format(i)) for i in range(12)]
+
+    for person_id in committee_ids:
+        db.add_group_member(group_class, queue_id, group_class.CTTEE, person_id)
+
+    with db._transaction() as conn:
+        person_ids = _insert_people(conn, max(50, n_proposals // 2))
+
+        proposal_ids = _insert_proposals(
+            conn, call_id, n_proposals,
+            lambda i: (ProposalState.REVIEW if i % 2
+                       else ProposalState.FINAL_REVIEW))
+
+        _insert_members(
+            conn, rng, proposal_ids, person_ids, affiliation_ids, 3, 6)
+
+        _insert_reviewers(
+            conn, rng, role_class, proposal_ids, person_ids, committee_ids)
+
+        _insert_decisions(conn, rng, proposal_ids)
+
+        centers = _insert_targets(conn, rng, proposal_ids)
+
+        _insert_messages(conn, rng, person_ids, n_proposals)
+
+        close_proposal_ids = _insert_proposals(
+            conn, close_call_id, max(10, n_proposals // 4),
+            lambda i: (ProposalState.PREPARATION if i % 4
+                       else ProposalState.SUBMITTED))
+
+        _insert_members(
+            conn, rng, close_proposal_ids, person_ids,
+            [close_affiliation_id], 1, 3)
+
+    moc_id = _add_moc(db, view, rng, centers)
+
+    app = create_web_app(
+        db=db, facility_spec='Generic', without_logger=True)
+
+    return BenchmarkData(
+        db=db, app=app, facilities=facilities, view=view,
+        call_id=call_id, close_call_id=close_call_id, queue_id=queue_id,
+        proposal_ids=proposal_ids, person_ids=person_ids,
+        admin=admin, committee=_current_user(db, committee_ids[0]),
+        moc_id=moc_id)
+
+
+def _add_call(db, view, semester_id, queue_id):
+    # Note: the call has already closed, so that the closure poll task
+    # can process it.
+    return db.add_call(
+        view.get_call_types(), semester_id, queue_id,
+        view.get_call_types().STANDARD,
+        datetime(2020, 9, 1), datetime(2020, 9, 30),
+        300, 1000, 1, 1, 2000, 4, 3, 100, 100,
+        '', '', '', FormatType.PLAIN, False, False, None, None, False,
+        False, '', 500, 4, 1, 366)
+
+
+def _current_user(db, person_id, is_admin=False):
+    person = db.search_person(person_id=person_id).get_single()
+
+    return CurrentUser(
+        user=null_tuple(UserInfo)._replace(id=person.user_id),
+        person=person, is_admin=is_admin, auth_token_id=None, options={})
+
+
+def _insert_people(conn, n):
+    start = _next_id(conn, person)
+
+    conn.execute(person.insert(), [
+        {
+            person.c.name.name: 'Person {}'.format(i),
+            person.c.public.name: True,
+        } for i in range(n)])
+
+    person_ids = _ids_since(conn, person, start)
+
+    conn.execute(email.insert(), [
+        {
+            email.c.person_id.name: person_id,
+            email.c.address.name: 'person{}@example.org'.format(person_id),
+            email.c.primary.name: True,
+            email.c.verified.name: True,
+        } for person_id in person_ids])
+
+    return person_ids
+
+
+def _insert_proposals(conn, call_id, n, state_function):
+    start = _next_id(conn, proposal)
+
+    conn.execute(proposal.insert(), [
+        {
+            proposal.c.call_id.name: call_id,
+            proposal.c.number.name: i + 1,
+            proposal.c.state.name: state_function(i),
+            proposal.c.title.name: 'Proposal {}'.format(i + 1),
+            proposal.c.type.name: 1,
+        } for i in range(n)])
+
+    return _ids_since(conn, proposal, start)
+
+
+def _insert_members(
+        conn, rng, proposal_ids, person_ids, affiliation_ids,
+        n_min, n_max):
+    rows = []
+
+    for proposal_id in proposal_ids:
+        for (i, person_id) in enumerate(rng.sample(
+                person_ids, rng.randint(n_min, n_max))):
+            rows.append({
+                member.c.proposal_id.name: proposal_id,
+                member.c.sort_order.name: i,
+                member.c.person_id.name: person_id,
+                member.c.pi.name: (i == 0),
+                member.c.editor.name: (i == 0),
+                member.c.observer.name: (i == 1),
+                member.c.reviewer.name: (i == 0),
+                member.c.affiliation_id.name: rng.choice(affiliation_ids),
+            })
+
+    conn.execute(member.insert(), rows)
+
+
+def _insert_reviewers(
+        conn, rng, role_class, proposal_ids, person_ids, committee_ids):
+    start = _next_id(conn, reviewer)
+
+    rows = []
+
+    for (i, proposal_id) in enumerate(proposal_ids):
+        roles = [
+            (role_class.TECH, rng.choice(person_ids)),
+            (role_class.EXTERNAL, rng.choice(person_ids)),
+        ]
+
+        # Give the first committee member a primary review for one
+        # proposal in ten, and leave some proposals without a primary
+        # reviewer so that they can be added.
+        cttee = rng.sample(committee_ids[1:], 2)
+        if i % 10 == 0:
+            roles.append((role_class.CTTEE_PRIMARY, committee_ids[0]))
+        elif i % 10 != 5:
+            roles.append((role_class.CTTEE_PRIMARY, cttee[0]))
+        roles.append((role_class.CTTEE_SECONDARY, cttee[1]))
+
+        if i % 2 == 0:
+            roles.append((role_class.FEEDBACK, committee_ids[0]))
+
+        for (role, person_id) in roles:
+            rows.append({
+                reviewer.c.proposal_id.name: proposal_id,
+                reviewer.c.person_id.name: person_id,
+                reviewer.c.role.name: role,
+                reviewer.c.accepted.name: True,
+            })
+
+    conn.execute(reviewer.insert(), rows)
+
+    # Add completed reviews for most of the reviewers.
+    review_rows = []
+
+    for row in conn.execute(select([reviewer.c.id]).where(
+            reviewer.c.id >= start)):
+        if rng.random() < 0.2:
+            continue
+
+        review_rows.append({
+            review.c.reviewer_id.name: row.id,
+            review.c.text.name: 'Review text.\n\n' * rng.randint(1, 10),
+            review.c.format.name: FormatType.PLAIN,
+            review.c.assessment.name: None,
+            review.c.rating.name: rng.randint(0, 100),
+            review.c.weight.name: rng.randint(0, 100),
+            review.c.edited.name: datetime(2020, 10, 1),
+            review.c.note.name: None,
+            review.c.note_format.name: None,
+            review.c.note_public.name: False,
+            review.c.state.name: ReviewState.DONE,
+        })
+
+    conn.execute(review.insert(), review_rows)
+
+
+def _insert_decisions(conn, rng, proposal_ids):
+    conn.execute(decision.insert(), [
+        {
+            decision.c.proposal_id.name: proposal_id,
+            decision.c.accept.name: (rng.random() < 0.3),
+            decision.c.exempt.name: False,
+            decision.c.ready.name: True,
+            decision.c.note.name: 'Decision note.',
+            decision.c.note_format.name: FormatType.PLAIN,
+        } for proposal_id in proposal_ids[::2]])
+
+
+def _insert_targets(conn, rng, proposal_ids, n_centers=200):
+    # Cluster targets around a number of field centers so that the
+    # clash searches find some results.
+    centers = [
+        (rng.uniform(0.0, 360.0), rng.uniform(-30.0, 60.0))
+        for i in range(n_centers)]
+
+    rows = []
+
+    for proposal_id in proposal_ids:
+        for i in range(rng.randint(1, 5)):
+            (x, y) = rng.choice(centers)
+            rows.append({
+                target.c.proposal_id.name: proposal_id,
+                target.c.sort_order.name: i,
+                target.c.name.name: 'Target {}'.format(i + 1),
+                target.c.system.name: CoordSystem.ICRS,
+                target.c.x.name: (x + rng.gauss(0.0, 0.05)) % 360.0,
+                target.c.y.name: y + rng.gauss(0.0, 0.05),
+                target.c.time.name: rng.uniform(0.5, 20.0),
+                target.c.priority.name: rng.randint(1, 5),
+                target.c.note.name: None,
+            })
+
+    conn.execute(target.insert(), rows)
+
+    return centers
+
+
+def _insert_messages(conn, rng, person_ids, n):
+    start = _next_id(conn, message)
+
+    conn.execute(message.insert(), [
+        {
+            message.c.date.name: datetime(2020, 10, 1),
+            message.c.subject.name: 'Message {}'.format(i),
+            message.c.body.name: 'Message text.\n\n' * rng.randint(1, 20),
+            message.c.state.name: MessageState.UNSENT,
+            message.c.format.name: MessageFormatType.PLAIN_FLOWED,
+        } for i in range(n)])
+
+    conn.execute(message_recipient.insert(), [
+        {
+            message_recipient.c.message_id.name: message_id,
+            message_recipient.c.person_id.name: person_id,
+        }
+        for message_id in _ids_since(conn, message, start)
+        for person_id in rng.sample(person_ids, rng.randint(1, 5))])
+
+
+def _add_moc(db, view, rng, centers):
+    """
+    Add a coverage map including about a quarter of the target
+    field centers.
+    """
+
+    order = view.get_moc_order()
+
+    coords = SkyCoord(
+        [x for (x, y) in centers[::4]], [y for (x, y) in centers[::4]],
+        unit='deg', frame='icrs')
+
+    moc_object = MOC(order, catalog_to_cells(
+        coords, radius=300.0, order=order, inclusive=True))
+
+    moc_id = db.add_moc(
+        view.id_, 'Benchmark coverage', '', FormatType.PLAIN, True,
+        moc_object)
+
+    db.update_moc_cell(moc_id, moc_object, block_pause=0)
+
+    return moc_id
+
+
+def _next_id(conn, table):
+    max_id = conn.execute(select([table.c.id]).order_by(
+        table.c.id.desc()).limit(1)).scalar()
+
+    return 1 if max_id is None else max_id + 1
+
+
+def _ids_since(conn, table, start):
+    return [
+        row.id for row in conn.execute(
+            select([table.c.id]).where(
+                table.c.id >= start).order_by(table.c.id))]
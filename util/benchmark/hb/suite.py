@@ -0,0 +1,569 @@
+# Copyright (C) 2026 East Asian Observatory
+# All Rights Reserved.
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful,but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,51 Franklin
+# Street, Fifth Floor, Boston, MA  02110-1301, USA
+
+"""
+Benchmark definitions.
+
+Each benchmark is a function which takes a `BenchmarkData` tuple
+(and the value yielded by its setup context manager, if any)
+and performs one iteration of the operation being timed.
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import partial
+import os
+from random import Random
+import shutil
+import tempfile
+from timeit import default_timer
+
+from hedwig.admin.poll import close_completed_call, send_proposal_feedback
+from hedwig.config import get_config
+from hedwig.db.instrument import instrument_engine, \
+    start_query_stats, stop_query_stats
+from hedwig.email.poll import send_queued_messages
+from hedwig.file.pdf import pdf_merge_to_file
+from hedwig.pdf.poll import _map_workers, _process_request_prop_pdf_single
+from hedwig.type.collection import AffiliationCollection, \
+    MemberCollection, TargetCollection
+from hedwig.type.enum import FormatType, MessageState
+from hedwig.type.simple import Affiliation, Member, Note, \
+    RequestPropPDF, Target
+from hedwig.type.util import null_tuple
+from hedwig.view.auth import find_addable_reviews
+from hedwig.web.format import format_cache
+
+Benchmark = namedtuple('Benchmark', ('name', 'function', 'setup'))
+
+BenchmarkResult = namedtuple(
+    'BenchmarkResult', ('best', 'median', 'queries'))
+
+benchmarks = OrderedDict()
+
+
+def benchmark(name, setup=None):
+    """
+    Decorator to register a benchmark function.
+
+    :param name: benchmark name
+    :param setup: optional context manager function, taking the
+        `BenchmarkData` tuple, which yields an additional argument
+        for the benchmark function
+    """
+
+    def decorator(f):
+        benchmarks[name] = Benchmark(name, f, setup)
+        return f
+
+    return decorator
+
+
+def run_benchmark(bm, data, repeat=5):
+    """
+    Run a benchmark.
+
+    The benchmark function is called once to warm up (e.g. to fill
+    template caches) and then `repeat` more times.
+
+    :return: a `BenchmarkResult` tuple with times in seconds
+        and the number of queries performed in one iteration
+    """
+
+    instrument_engine(data.db._engine)
+
+    setup = bm.setup if bm.setup is not None else _no_setup
+
+    with setup(data) as extra:
+        args = (data,) if extra is None else (data, extra)
+
+        stats = start_query_stats(n_slowest=0)
+        try:
+            bm.function(*args)
+        finally:
+            stop_query_stats()
+
+        times = []
+        for i in range(repeat):
+            start = default_timer()
+            bm.function(*args)
+            times.append(default_timer() - start)
+
+    times.sort()
+
+    return BenchmarkResult(
+        best=times[0], median=times[len(times) // 2], queries=stats.count)
+
+
+@contextmanager
+def _no_setup(data):
+    yield None
+
+
+@benchmark('db.search_proposal.call')
+def bench_search_proposal_call(data):
+    data.db.search_proposal(call_id=data.call_id, with_members=True)
+
+
+@benchmark('db.search_proposal.summary')
+def bench_search_proposal_summary(data):
+    data.db.search_proposal(call_id=data.call_id, summary=True)
+
+
+@benchmark('db.search_proposal.review')
+def bench_search_proposal_review(data):
+    data.db.search_proposal(
+        call_id=data.call_id, with_members=True, with_reviewers=True,
+        with_review_info=True, with_decision=True)
+
+
+@benchmark('db.search_member')
+def bench_search_member(data):
+    data.db.search_member(proposal_id=data.proposal_ids)
+
+
+@benchmark('db.search_reviewer')
+def bench_search_reviewer(data):
+    data.db.search_reviewer(call_id=data.call_id, with_review=True)
+
+
+@benchmark('db.search_target')
+def bench_search_target(data):
+    for proposal_id in data.proposal_ids[:100]:
+        data.db.search_target(proposal_id=proposal_id)
+
+
+@benchmark('db.search_message')
+def bench_search_message(data):
+    data.db.search_message(
+        state=MessageState.UNSENT, with_recipients=True,
+        with_recipients_resolved=True, with_body=True)
+
+
+@contextmanager
+def _setup_sync_target(data):
+    proposal_id = data.proposal_ids[0]
+
+    record_sets = [
+        TargetCollection(
+            (i, Target(
+                None, proposal_id, None, 'Target {}'.format(i), 1,
+                (i * step) % 360.0, (i % 60) - 30.0, 1.0, 1, None))
+            for i in range(50))
+        for step in (7.0, 11.0)]
+
+    # Use a mutable counter to alternate between the record sets so that
+    # each iteration updates every record.
+    yield (proposal_id, record_sets, [0])
+
+
+@benchmark('db.sync_proposal_target', setup=_setup_sync_target)
+def bench_sync_proposal_target(data, extra):
+    (proposal_id, record_sets, counter) = extra
+
+    records = data.db.search_target(proposal_id=proposal_id)
+    new_records = record_sets[counter[0] % 2]
+    counter[0] += 1
+
+    # Re-use the existing identifiers so that records are updated.
+    ids = list(records.keys())
+    data.db.sync_proposal_target(proposal_id, TargetCollection(
+        (i, x._replace(id=(ids[i] if i < len(ids) else None)))
+        for (i, x) in new_records.items()))
+
+
+@benchmark('view.find_addable_reviews')
+def bench_find_addable_reviews(data):
+    find_addable_reviews(
+        data.committee, data.db, data.facilities, auth_cache={})
+
+
+@contextmanager
+def _setup_request_context(data):
+    with data.app.test_request_context():
+        yield None
+
+
+@benchmark('view.review_call_tabulation', setup=_setup_request_context)
+def bench_review_call_tabulation(data):
+    # Discard the cached call snapshot so that the tabulation is
+    # prepared from the database each time.
+    data.view._call_snapshot_cache.clear()
+
+    data.view.view_review_call_tabulation(data.admin, data.db, data.call_id)
+
+
+@contextmanager
+def _setup_call_snapshot(data):
+    # Prepare the cached call snapshot in advance, so that only cache hits
+    # are measured, including in the count of queries.
+    with data.app.test_request_context():
+        data.view.view_review_call_tabulation(
+            data.admin, data.db, data.call_id)
+
+        yield None
+
+
+@benchmark(
+    'view.review_call_tabulation.cached', setup=_setup_call_snapshot)
+def bench_review_call_tabulation_cached(data):
+    data.view.view_review_call_tabulation(data.admin, data.db, data.call_id)
+
+
+@benchmark('view.review_call_allocation', setup=_setup_request_context)
+def bench_review_call_allocation(data):
+    data.view.view_review_call_allocation(data.admin, data.db, data.call_id)
+
+
+@benchmark('view.review_call_clash', setup=_setup_request_context)
+def bench_review_call_clash(data):
+    data.view.view_review_call_clash(
+        data.admin, data.db, data.call_id,
+        args={}, form={'radius': str(_get_clash_tool(data).radius_options[0])})
+
+
+@contextmanager
+def _setup_format_reviews(data, n_review=30):
+    """
+    Prepare a template like a page of reviews, with alternating
+    RST and Markdown review texts.
+    """
+
+    template = data.app.jinja_env.from_string(
+        '{% for review in reviews %}'
+        '<div class="review">{{ review | format_text }}</div>'
+        '{% endfor %}')
+
+    reviews = []
+    for i in range(n_review):
+        if i % 2:
+            text = _review_text_rst.format(i)
+            format_ = FormatType.RST
+        else:
+            text = _review_text_markdown.format(i)
+            format_ = FormatType.MD
+
+        reviews.append(Note(text=text, format=format_))
+
+    with data.app.app_context():
+        yield (template, reviews)
+
+
+@benchmark('web.format_reviews', setup=_setup_format_reviews)
+def bench_format_reviews(data, extra):
+    (template, reviews) = extra
+
+    template.render(reviews=reviews)
+
+
+@benchmark('web.format_reviews.uncached', setup=_setup_format_reviews)
+def bench_format_reviews_uncached(data, extra):
+    (template, reviews) = extra
+
+    # Discard cached formatted text so that each review is rendered.
+    format_cache.clear()
+
+    template.render(reviews=reviews)
+
+
+@contextmanager
+def _setup_affiliation_assignment(
+        data, facility_class=None, n_proposal=1000, n_member=20, seed=1):
+    """
+    Prepare a synthetic call's worth of member collections and
+    affiliations for the given facility (or the benchmark data's facility).
+    """
+
+    view = data.view if facility_class is None else facility_class(1)
+    affiliation_type_class = view.get_affiliation_types()
+
+    rng = Random(seed)
+
+    affiliations = AffiliationCollection()
+    for i in range(1, 16):
+        if i < 12:
+            (type_, weight) = (affiliation_type_class.STANDARD, 10 * i)
+        elif i < 14:
+            (type_, weight) = (affiliation_type_class.SHARED, None)
+        else:
+            (type_, weight) = (affiliation_type_class.EXCLUDED, None)
+
+        affiliations[i] = Affiliation(
+            i, None, 'Affiliation {}'.format(i),
+            hidden=False, type=type_, weight=weight)
+
+    member_collections = []
+    for i in range(n_proposal):
+        members = MemberCollection()
+        for j in range(n_member):
+            members[j] = null_tuple(Member)._replace(
+                id=j, pi=(j == 0),
+                affiliation_id=rng.choice(list(affiliations.keys())))
+
+        member_collections.append(members)
+
+    yield (view, member_collections, affiliations)
+
+
+@contextmanager
+def _setup_affiliation_assignment_jcmt(data):
+    # Import here as the JCMT facility requires additional packages.
+    from hedwig.facility.jcmt.view import JCMT
+
+    with _setup_affiliation_assignment(data, JCMT) as extra:
+        yield extra
+
+
+@benchmark('view.affiliation.jcmt', setup=_setup_affiliation_assignment_jcmt)
+@benchmark('view.affiliation.generic', setup=_setup_affiliation_assignment)
+def bench_affiliation_assignment(data, extra):
+    (view, member_collections, affiliations) = extra
+
+    view.calculate_affiliation_assignments(
+        data.db, member_collections, affiliations)
+
+
+@contextmanager
+def _setup_clash_targets(data):
+    targets = []
+    for proposal_id in data.proposal_ids[:200]:
+        targets.extend(data.db.search_target(
+            proposal_id=proposal_id).to_object_list())
+
+    yield (_get_clash_tool(data), targets)
+
+
+@benchmark('tool.clash_moc_search', setup=_setup_clash_targets)
+def bench_clash_moc_search(data, extra):
+    (tool, targets) = extra
+
+    tool._do_moc_search(data.db, targets, None, tool.radius_options[-1])
+
+
+@benchmark('poll.close_completed_call')
+def bench_close_completed_call(data):
+    close_completed_call(data.db, dry_run=True)
+
+
+@benchmark('poll.send_proposal_feedback')
+def bench_send_proposal_feedback(data):
+    send_proposal_feedback(data.db, dry_run=True)
+
+
+@benchmark('poll.send_queued_messages')
+def bench_send_queued_messages(data):
+    send_queued_messages(data.db, dry_run=True)
+
+
+@contextmanager
+def _setup_pdf_files(data, n_file=4, size=(5 * 1024 * 1024)):
+    dir_ = tempfile.mkdtemp()
+
+    try:
+        filenames = []
+        for i in range(n_file):
+            filename = os.path.join(dir_, 'input_{}.pdf'.format(i))
+            _write_dummy_pdf(filename, size)
+            filenames.append(filename)
+
+        yield (filenames, os.path.join(dir_, 'output.pdf'))
+
+    finally:
+        shutil.rmtree(dir_)
+
+
+@benchmark('pdf.merge_to_file', setup=_setup_pdf_files)
+def bench_pdf_merge_to_file(data, extra):
+    (filenames, output) = extra
+
+    pdf_merge_to_file(filenames, output)
+
+
+class _StubPDFWriter(object):
+    """
+    Stand-in for a PDF writer which performs a fixed amount of pure Python
+    computation to "render" each proposal.  Like WeasyPrint, this is
+    CPU-bound and holds the GIL, so (unlike an external renderer) it can
+    only run in parallel with process workers.
+    """
+
+    def __init__(self, render_time):
+        # Calibrate the number of iterations to take about render_time.
+        self.render_iterations = 1000000
+        start = default_timer()
+        self._render()
+        self.render_iterations = max(1, int(
+            self.render_iterations * render_time /
+            max(default_timer() - start, 1e-6)))
+
+    def _render(self):
+        total = 0
+        for i in range(self.render_iterations):
+            total += i * i
+        return total
+
+    def proposal_to_file(self, proposal_id, filename):
+        self._render()
+
+        with open(filename, 'wb') as f:
+            f.write(b'%PDF-1.4\n')
+
+    def get_cache_stats(self):
+        return (0, 0)
+
+
+@contextmanager
+def _setup_request_prop_pdf(
+        data, workers, worker_type='thread', n_request=100, render_time=0.01):
+    """
+    Prepare requests for PDF versions of the first proposals of the call.
+
+    The requests are processed in dry run mode, so they are not updated
+    in the database and can be processed again in each iteration.
+    This also means that forked worker processes do not need to access
+    the (in-memory) benchmark database.
+    """
+
+    config = get_config()
+    orig_prop_dir = config.get('pdf_request', 'prop_dir')
+    dir_ = tempfile.mkdtemp()
+
+    requests = [
+        null_tuple(RequestPropPDF)._replace(id=(i + 1), proposal_id=x)
+        for (i, x) in enumerate(data.proposal_ids[:n_request])]
+
+    try:
+        config.set('pdf_request', 'prop_dir', dir_)
+
+        yield (requests, workers, worker_type, _StubPDFWriter(render_time))
+
+    finally:
+        config.set('pdf_request', 'prop_dir', orig_prop_dir)
+        shutil.rmtree(dir_)
+
+
+@benchmark(
+    'pdf.request_prop_pdf.process.4',
+    setup=partial(_setup_request_prop_pdf, workers=4, worker_type='process'))
+@benchmark(
+    'pdf.request_prop_pdf.process.2',
+    setup=partial(_setup_request_prop_pdf, workers=2, worker_type='process'))
+@benchmark(
+    'pdf.request_prop_pdf.thread.4',
+    setup=partial(_setup_request_prop_pdf, workers=4, worker_type='thread'))
+@benchmark(
+    'pdf.request_prop_pdf.thread.2',
+    setup=partial(_setup_request_prop_pdf, workers=2, worker_type='thread'))
+@benchmark(
+    'pdf.request_prop_pdf.1',
+    setup=partial(_setup_request_prop_pdf, workers=1))
+def bench_request_prop_pdf(data, extra):
+    (requests, workers, worker_type, pdf_writer) = extra
+
+    n_processed = sum(_map_workers(
+        data.db, pdf_writer,
+        partial(_process_request_prop_pdf_single, dry_run=True),
+        requests, workers, worker_type))
+
+    if n_processed != len(requests):
+        raise Exception('only {} of {} requests processed'.format(
+            n_processed, len(requests)))
+
+
+_review_text_rst = """
+Review {}
+=========
+
+This proposal addresses an *interesting* question, but the
+**technical justification** could be improved:
+
+* The sensitivity calculation assumes "median" weather.
+* The requested time does not include overheads.
+
+.. note::
+
+    The targets overlap with an existing survey field.
+
+"""
+
+_review_text_markdown = """
+# Review {}
+
+This proposal addresses an *interesting* question, but the
+**technical justification** could be improved:
+
+* The sensitivity calculation assumes "median" weather.
+* The requested time does not include overheads --- see the
+  [documentation](https://example.org/overheads).
+
+> The targets overlap with an existing survey field.
+
+"""
+
+
+def _get_clash_tool(data):
+    for tool_info in data.view.target_tools.values():
+        if tool_info.code == 'clash':
+            return tool_info.tool
+
+    raise Exception('clash tool not found')
+
+
+def _write_dummy_pdf(filename, size):
+    """
+    Write a single page PDF file containing an image stream of
+    (incompressible) random data of the given size.
+    """
+
+    image = os.urandom(size)
+    contents = b'q 100 0 0 100 0 0 cm /Im1 Do Q'
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]'
+        b' /Resources << /XObject << /Im1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /XObject /Subtype /Image /Width 1 /Height 1'
+        b' /ColorSpace /DeviceGray /BitsPerComponent 8 /Length ' +
+        str(len(image)).encode('ascii') +
+        b' >>\nstream\n' + image + b'\nendstream',
+        b'<< /Length ' + str(len(contents)).encode('ascii') +
+        b' >>\nstream\n' + contents + b'\nendstream',
+    ]
+
+    with open(filename, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+
+        offsets = []
+        for (i, obj) in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write('{} 0 obj\n'.format(i).encode('ascii'))
+            f.write(obj)
+            f.write(b'\nendobj\n')
+
+        xref = f.tell()
+        f.write('xref\n0 {}\n0000000000 65535 f \n'.format(
+            len(objects) + 1).encode('ascii'))
+        for offset in offsets:
+            f.write('{:010d} 00000 n \n'.format(offset).encode('ascii'))
+
+        f.write('trailer\n<< /Size {} /Root 1 0 R >>\nstartxref\n{}\n'.format(
+            len(objects) + 1, xref).encode('ascii'))
+        f.write(b'%%EOF\n')